@@ -4,6 +4,8 @@ if TYPE_CHECKING:
     from weconnect_id.tools.updater import WeConnectUpdater
     from weconnect_id.vehicle import WeConnectVehicle
     from display.lcd_scene_controller import LCDSceneController
+    from electricity_price.cheapest_window import CheapestWindows
+    from weconnect_id.tools.charging_sessions import ChargingSessionTracker
 from display.lcd_scene import LCDScene
 from display.lcd_item import LCDItem
 from display.weconnect_lcd_item import WeConnectLCDItem
@@ -12,7 +14,6 @@ from display.custom_scenes.climate_controller_temperature_scene import (
     ClimateControllerTemperatureScene,
 )
 from electricity_price.spot_price_provider import SpotPriceProvider
-from weconnect.domain import Domain
 import logging
 
 
@@ -26,6 +27,8 @@ class SceneBuilder:
         weconnect_updater: WeConnectUpdater,
         lcd_scene_controller: LCDSceneController,
         spot_price_provider: SpotPriceProvider,
+        cheapest_windows: CheapestWindows = None,
+        charging_session_tracker: ChargingSessionTracker = None,
     ) -> None:
         '''
         Builds the scenes used in the user interface.
@@ -35,6 +38,8 @@ class SceneBuilder:
             weconnect_updater (WeConnectUpdater): Needed to initialize WeConnectLCDItems.
             lcd_scene_controller (LCDSceneController): Needed to initialize LCDScenes.
             spot_price_provider (SpotPriceProvider): Provides data to the electricity price items.
+            cheapest_windows (CheapestWindows, optional): Provides the cheapest windows item. Defaults to None.
+            charging_session_tracker (ChargingSessionTracker, optional): Provides the charging session item. Defaults to None.
         '''
         
         self.__config = config
@@ -43,6 +48,8 @@ class SceneBuilder:
         self.__weconnect_updater = weconnect_updater
         self.__lcd_scene_controller = lcd_scene_controller
         self.__spot_price_provider = spot_price_provider
+        self.__cheapest_windows = cheapest_windows
+        self.__charging_session_tracker = charging_session_tracker
 
     def load_scenes(self, weconnect_vehicle: WeConnectVehicle) -> dict:
         '''
@@ -79,10 +86,15 @@ class SceneBuilder:
                 title="Päivitä nyt",
                 id="ITEM_WECONNECT_UPDATE",
                 target=self.__weconnect_updater.update,
-                target_args=[[Domain.CHARGING, Domain.CLIMATISATION, Domain.READINESS]],
+                target_args=[self.__weconnect_updater.domains],
             ),
             "ITEM_SPOT_PRICE_NOW": self.__spot_price_provider.price_now_item,
+            "ITEM_SPOT_PRICE_GRAPH": self.__spot_price_provider.graph_item,
         }
+        if self.__cheapest_windows is not None:
+            custom_items["ITEM_CHEAPEST_WINDOWS"] = self.__cheapest_windows.item
+        if self.__charging_session_tracker is not None:
+            custom_items["ITEM_CHARGING_SESSION"] = self.__charging_session_tracker.item
 
         scenes = {}
         items = {}
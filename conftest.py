@@ -0,0 +1 @@
+# Makes the packages of the repository root importable in the tests
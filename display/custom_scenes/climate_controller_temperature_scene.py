@@ -13,6 +13,7 @@ LOG = logging.getLogger("lcd_scene")
 class ClimateControllerTemperatureScene(LCDScene):
 
     TEMPERATURES = list(numpy.arange(15.5, 30.5, 0.5))
+    DATA_PROPERTY_IDS = ("climateControllerTargetTemperature",)
 
     def __init__(
         self, id, lcd_scene_controller, weconnect_vehicle: WeConnectVehicle
@@ -29,7 +30,7 @@ class ClimateControllerTemperatureScene(LCDScene):
         super().__init__(id=id, lcd_scene_controller=lcd_scene_controller)
         self.__weconnect_vehicle = weconnect_vehicle
         self.__current_temperature = self.__weconnect_vehicle.get_data_property(
-            "climate controller target temperature"
+            "climateControllerTargetTemperature"
         ).value
         self.__selected_temperature = self.__current_temperature
         self.__index = self.TEMPERATURES.index(self.__selected_temperature)
@@ -42,7 +43,7 @@ class ClimateControllerTemperatureScene(LCDScene):
     def load(self) -> None:
         LOG.debug(f"Loading LCDScene (ID: {self._id})")
         self.__current_temperature = self.__weconnect_vehicle.get_data_property(
-            "climate controller target temperature"
+            "climateControllerTargetTemperature"
         ).value
         self.__selected_temperature = self.__current_temperature
         self.update()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from display.lcd_scene_controller import LCDSceneController
+from display.lcd_scene import LCDScene
+from electricity_price.price_model import SpotPriceModel, local_midnight
+from datetime import date, datetime, timedelta
+import logging
+import numpy
+
+
+LOG = logging.getLogger("lcd_scene")
+
+
+class SpotPriceGraphScene(LCDScene):
+    # Bar glyphs "\x00" - "\x07" are filled from the bottom with 1 - 8 pixel rows
+    BAR_CHARACTERS = tuple(
+        tuple([0x00] * (7 - level) + [0x1F] * (level + 1)) for level in range(8)
+    )
+    BAR_ROWS = 3
+    HOURS_PER_PAGE = 12
+    STATISTICS_WIDTH = 7
+
+    def __init__(self, id: str, lcd_scene_controller: LCDSceneController) -> None:
+        '''
+        Displays the hourly spot prices of today and tomorrow as a bar graph drawn with custom characters,
+        12 hours per page with the minimum, maximum and average price of the day.
+
+        Frames of all pages are precomputed when the prices change, so scrolling only writes the next frame on the LCD screen.
+
+        Args:
+            id (str): ID for the LCDScene.
+            lcd_scene_controller (LCDSceneController): Used to control the LCDScene.
+        '''
+
+        LOG.debug(f"Initializing SpotPriceGraphScene (ID: {id})")
+        super().__init__(id=id, lcd_scene_controller=lcd_scene_controller, items_selectable=False)
+        self.__frames = [self.__create_empty_frame()]
+        self.__page_hours = [None]
+        self.__page = 0
+        LOG.debug(f"Successfully initialized SpotPriceGraphScene (ID: {self._id})")
+
+    @property
+    def content(self) -> list:
+        return list(self.__frames[self.__page])
+
+    @property
+    def custom_characters(self) -> tuple:
+        return self.BAR_CHARACTERS
+
+    @property
+    def next(self):
+        return None
+
+    def set_prices(self, model: SpotPriceModel, today: date) -> None:
+        '''
+        Precomputes the frames of the pages from new prices.
+
+        Args:
+            model (SpotPriceModel): Prices of today and tomorrow.
+            today (date): Local date of today.
+        '''
+
+        frames = []
+        page_hours = []
+        pages = []
+        for day, label in ((today, "Tänään"), (today + timedelta(days=1), "Huomenna")):
+            start = local_midnight(day)
+            end = local_midnight(day + timedelta(days=1))
+            statistics = model.statistics(start, end)
+            if statistics is None:
+                continue
+            hourly = model.hourly(start, end)
+            # Days with 25 hours get one more bar on the second page
+            split = min(self.HOURS_PER_PAGE, len(hourly) // 2)
+            pages.append((label, hourly[:split], statistics))
+            pages.append((label, hourly[split:], statistics))
+
+        for page, (label, hourly, statistics) in enumerate(pages):
+            frames.append(self.__create_frame(label, hourly, statistics, page, len(pages)))
+            page_hours.append((hourly[0][0], hourly[-1][0] + timedelta(hours=1)))
+
+        if not frames:
+            frames = [self.__create_empty_frame()]
+            page_hours = [None]
+        self.__frames = frames
+        self.__page_hours = page_hours
+        self.__page = min(self.__page, len(frames) - 1)
+        LOG.debug(f"Precomputed {len(frames)} SpotPriceGraphScene frames (ID: {self._id})")
+        self.update()
+
+    def __create_empty_frame(self) -> list:
+        return ["Hintakäyrä", "", "Ei hintatietoja", ""]
+
+    def __format_value(self, value: float) -> str:
+        text = f"{value:.1f}"
+        if len(text) > 4:
+            text = f"{value:.0f}"
+        return f"{text:>4}"
+
+    def __create_frame(self, label: str, hourly: list, statistics: tuple, page: int, pages: int) -> list:
+        minimum, maximum, average = statistics
+        levels = self.BAR_ROWS * 8
+        floor = min(minimum, 0)
+        scale = (maximum - floor) or 1
+
+        prices = numpy.array([numpy.nan if price is None else price for _, price in hourly])
+        known = ~numpy.isnan(prices)
+        heights = numpy.zeros(len(prices), dtype=int)
+        heights[known] = numpy.clip(
+            numpy.round((prices[known] - floor) / scale * levels), 1, levels
+        ).astype(int)
+
+        title = f"{label} {hourly[0][0]:%H}-{hourly[-1][0]:%H}"
+        page_text = f"{page + 1}/{pages}"
+        lines = [f"{title}{page_text:>{20 - len(title)}}"]
+
+        statistics_lines = (
+            f"Max{self.__format_value(maximum)}",
+            f"Ka{self.__format_value(average):>5}",
+            f"Min{self.__format_value(minimum)}",
+        )
+        padding = " " * (20 - len(hourly) - self.STATISTICS_WIDTH)
+        for row, statistics_line in zip(range(self.BAR_ROWS - 1, -1, -1), statistics_lines):
+            cells = numpy.clip(heights - row * 8, 0, 8)
+            bars = "".join(" " if cell == 0 else chr(cell - 1) for cell in cells)
+            lines.append(f"{bars}{padding}{statistics_line}")
+        return lines
+
+    def load(self) -> None:
+        LOG.debug(f"Loading LCDScene (ID: {self._id})")
+        now = datetime.now().astimezone()
+        for page, hours in enumerate(self.__page_hours):
+            if hours is not None and hours[0] <= now < hours[1]:
+                self.__page = page
+                break
+        self.update()
+
+    def scroll(self, way: str) -> None:
+        if way == "up":
+            self.__page = (self.__page - 1) % len(self.__frames)
+        elif way == "down":
+            self.__page = (self.__page + 1) % len(self.__frames)
+        self.update()
+
+    def exit(self) -> None:
+        LOG.debug(f"Exiting LCDScene (ID: {self._id})")
@@ -9,7 +9,20 @@ LOG = logging.getLogger("lcd_controller")
 
 
 class LCDController:
-    
+    STATUS_BAR_CHARACTERS = (
+        # Battery empty, 20%, 50% and 80%
+        (0x0E, 0x1B, 0x11, 0x11, 0x11, 0x11, 0x11, 0x1F),
+        (0x0E, 0x1B, 0x11, 0x11, 0x11, 0x11, 0x1F, 0x1F),
+        (0x0E, 0x1B, 0x11, 0x11, 0x1F, 0x1F, 0x1F, 0x1F),
+        (0x0E, 0x1F, 0x1F, 0x1F, 0x1F, 0x1F, 0x1F, 0x1F),
+        # Charging, plug connected and charge complete
+        (0x0A, 0x0A, 0x1F, 0x1F, 0x0E, 0x04, 0x04, 0x04),
+        (0x04, 0x04, 0x04, 0x0E, 0x1F, 0x1F, 0x0A, 0x0A),
+        (0x00, 0x01, 0x03, 0x16, 0x1C, 0x08, 0x00, 0x00),
+        # Climate
+        (0x04, 0x0A, 0x0A, 0x0E, 0x0E, 0x1F, 0x1F, 0x0E),
+    )
+
     def __init__(self, lcd_scene_controller) -> None:
         '''
         Used to control the LCD screen.
@@ -24,10 +37,11 @@ class LCDController:
 
         self.__backlight_timer = Timer(30, self.backlight_off)
 
-        self.__load_custom_characters()
-
         self.__print_lock = Lock()
 
+        self.__custom_characters = None
+        self.set_custom_characters()
+
         self.__message_timer = None
         self.__message_on_screen = False
         self.__message_queue = Queue()
@@ -109,23 +123,27 @@ class LCDController:
         )
         self.__backlight_timer.start()
 
-    def __load_custom_characters(self) -> None:
-        battery_empty = [0x0E, 0x1B, 0x11, 0x11, 0x11, 0x11, 0x11, 0x1F]
-        battery_20 = [0x0E, 0x1B, 0x11, 0x11, 0x11, 0x11, 0x1F, 0x1F]
-        battery_50 = [0x0E, 0x1B, 0x11, 0x11, 0x1F, 0x1F, 0x1F, 0x1F]
-        battery_80 = [0x0E, 0x1F, 0x1F, 0x1F, 0x1F, 0x1F, 0x1F, 0x1F]
-        charging = [0x0A, 0x0A, 0x1F, 0x1F, 0x0E, 0x04, 0x04, 0x04]
-        plug_connected = [0x04, 0x04, 0x04, 0x0E, 0x1F, 0x1F, 0x0A, 0x0A]
-        charge_complete = [0x00, 0x01, 0x03, 0x16, 0x1C, 0x08, 0x00, 0x00]
-        climate = [0x04, 0x0A, 0x0A, 0x0E, 0x0E, 0x1F, 0x1F, 0x0E]
-        self.__lcd.create_char(0, battery_empty)
-        self.__lcd.create_char(1, battery_20)
-        self.__lcd.create_char(2, battery_50)
-        self.__lcd.create_char(3, battery_80)
-        self.__lcd.create_char(4, charging)
-        self.__lcd.create_char(5, plug_connected)
-        self.__lcd.create_char(6, charge_complete)
-        self.__lcd.create_char(7, climate)
+    def set_custom_characters(self, characters: tuple = None) -> None:
+        """
+        Loads custom characters into the CGRAM of the LCD screen, so they can be displayed with characters "\\x00" - "\\x07".
+        Nothing is written if the same characters are already loaded.
+
+        Args:
+            characters (tuple, optional): Up to 8 characters as tuples of 8 row bitmaps.
+                Defaults to None, which loads the status bar icons.
+        """
+
+        if characters is None:
+            characters = self.STATUS_BAR_CHARACTERS
+        if characters is self.__custom_characters:
+            return
+        with self.__print_lock:
+            try:
+                for location, character in enumerate(characters):
+                    self.__lcd.create_char(location, list(character))
+                self.__custom_characters = characters
+            except Exception as e:
+                LOG.exception(e)
 
     def clear_message(self) -> None:
         """
@@ -93,6 +93,10 @@ class LCDItem:
         
         self._scenes.append(scene)
 
+    def remove_scene(self, scene: LCDScene) -> None:
+        if scene in self._scenes:
+            self._scenes.remove(scene)
+
     @property
     def content(self) -> str:
         return self._content
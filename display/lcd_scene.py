@@ -62,6 +62,14 @@ class LCDScene:
     def has_title(self) -> bool:
         return self.__title is not None
 
+    @property
+    def custom_characters(self) -> tuple:
+        '''
+        Custom characters the LCDScene displays. None means the status bar icons.
+        '''
+
+        return None
+
     def set_lcd_scene_controller(self, lcd_scene_controller) -> None:
         self._lcd_scene_controller = lcd_scene_controller
 
@@ -69,6 +77,28 @@ class LCDScene:
         self._items.append(lcd_item)
         lcd_item.add_scene(self)
 
+    def set_items(self, lcd_items: list) -> None:
+        '''
+        Replaces all LCDItems of the LCDScene and scrolls back to the first LCDItem.
+
+        Args:
+            lcd_items (list): New LCDItems for the LCDScene.
+        '''
+
+        if self.__items_selectable and self._items:
+            self.__unselect_item()
+        for lcd_item in self._items:
+            lcd_item.remove_scene(self)
+        self._items = []
+        for lcd_item in lcd_items:
+            self.add_item(lcd_item)
+        self._selected_index = 0
+        self.__startpoint = 0
+        self.__endpoint = 4 if self.__title is None else 3
+        if self.__items_selectable and self._items:
+            self.__select_item()
+        self.update()
+
     def load(self) -> None:
         LOG.debug(f"Loading LCDScene (ID: {self._id})")
         if self.__items_selectable:
@@ -67,7 +67,10 @@ class LCDSceneController:
             self.refresh(self.__selected_scene)
 
     def refresh(self, scene) -> None:
+        if self.__selected_scene is None:
+            return
         if self.__selected_scene.id == scene.id:
+            self.__lcd_controller.set_custom_characters(scene.custom_characters)
             if scene.has_title:
                 scene_content = scene.content
                 icons = ""
@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from weconnect_id.vehicle import WeConnectVehicle
     from display.lcd_scene_controller import LCDSceneController
+    from weconnect_id.data_providers.vehicle_snapshot import WeConnectVehicleSnapshot
 from weconnect.elements.plug_status import PlugStatus
 from weconnect.elements.charging_status import ChargingStatus
 from weconnect.elements.climatization_status import ClimatizationStatus
@@ -13,6 +14,20 @@ LOG = logging.getLogger("lcd_status_bar")
 
 
 class LCDStatusBar:
+    DATA_PROPERTY_IDS = (
+        "batteryLevel",
+        "chargeState",
+        "targetBatteryLevel",
+        "chargingPlugConnectionStatus",
+        "climateControllerState",
+    )
+    CHARGING_ICON_DATA_PROPERTY_IDS = (
+        "batteryLevel",
+        "chargeState",
+        "targetBatteryLevel",
+        "chargingPlugConnectionStatus",
+    )
+
     def __init__(
         self,
         weconnect_vehicle: WeConnectVehicle,
@@ -20,6 +35,8 @@ class LCDStatusBar:
     ) -> None:
         '''
         Displays icons on top of the LCD screen when LCDScene with title is displayed.
+        Icons are updated from the snapshots published by the WeConnectVehicle,
+        so the values used for one icon always come from the same update cycle.
 
         Args:
             weconnect_vehicle (WeConnectVehicle): Provides data about the selected vehicle for the LCDStatusBar.
@@ -49,25 +66,15 @@ class LCDStatusBar:
             ClimatizationStatus.ClimatizationState.VENTILATION,
         ]
 
-        self.__weconnect_vehicle.get_data_property(
-            "battery level"
-        ).add_callback_function(id="STATUS_BAR_BATTERY_LEVEL", function=self.__update_battery_icon)
-        self.__weconnect_vehicle.get_data_property(
-            "charge state"
-        ).add_callback_function(id="STATUS_BAR_CHARGE_STATE", function=self.__update_charging_icon)
-        self.__weconnect_vehicle.get_data_property(
-            "target battery level"
-        ).add_callback_function(id="STATUS_BAR_TARGET_BATTERY_LEVEL", function=self.__update_charging_icon)
-        self.__weconnect_vehicle.get_data_property(
-            "charging plug connection status"
-        ).add_callback_function(id="STATUS_BAR_CHARGING_PLUG", function=self.__update_charging_icon)
-        self.__weconnect_vehicle.get_data_property(
-            "climate controller state"
-        ).add_callback_function(id="STATUS_BAR_CLIMATE", function=self.__update_climate_icon)
-
-        self.__update_battery_icon()
-        self.__update_charging_icon()
-        self.__update_climate_icon()
+        self.__weconnect_vehicle.add_snapshot_callback(
+            id="STATUS_BAR", function=self.__on_snapshot
+        )
+
+        snapshot = self.__weconnect_vehicle.snapshot
+        self.__update_battery_icon(snapshot)
+        self.__update_charging_icon(snapshot)
+        self.__update_climate_icon(snapshot)
+        self.__lcd_scene_controller.update_status_bar()
         LOG.debug("Successfully initialized LCDStatusBar")
 
     @property
@@ -80,8 +87,20 @@ class LCDStatusBar:
         icons_string += self.__battery_icon
         return icons_string
 
-    def __update_battery_icon(self) -> None:
-        battery = self.__weconnect_vehicle.get_data_property("battery level").value
+    def __on_snapshot(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        changed_ids = snapshot.changed_ids
+        if changed_ids.isdisjoint(self.DATA_PROPERTY_IDS):
+            return
+        if "batteryLevel" in changed_ids:
+            self.__update_battery_icon(snapshot)
+        if not changed_ids.isdisjoint(self.CHARGING_ICON_DATA_PROPERTY_IDS):
+            self.__update_charging_icon(snapshot)
+        if "climateControllerState" in changed_ids:
+            self.__update_climate_icon(snapshot)
+        self.__lcd_scene_controller.update_status_bar()
+
+    def __update_battery_icon(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        battery = snapshot["batteryLevel"]
         if battery >= 80:
             self.__battery_icon = self.__battery_80
         elif battery >= 50:
@@ -90,51 +109,28 @@ class LCDStatusBar:
             self.__battery_icon = self.__battery_20
         else:
             self.__battery_icon = self.__battery_empty
-        self.__lcd_scene_controller.update_status_bar()
         LOG.debug(f"Updated the battery icon of the LCDStatusBar to (Icon: {self.__battery_icon})")
 
-    def __update_charging_icon(self) -> None:
-        charging_status = self.__weconnect_vehicle.get_data_property(
-            "charge state"
-        ).value
-        
+    def __update_charging_icon(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        charging_status = snapshot["chargeState"]
+        plug_status = snapshot["chargingPlugConnectionStatus"]
+        target_battery_level = snapshot["targetBatteryLevel"]
+        battery_level = snapshot["batteryLevel"]
+
         if charging_status == ChargingStatus.ChargingState.CHARGING:
             self.__charging_icon = self.__charging
-            self.__lcd_scene_controller.update_status_bar()
-            LOG.debug(f"Updated the charging icon of the LCDStatusBar to (Icon: {self.__charging_icon})")
-            return
-
-        plug_status = self.__weconnect_vehicle.get_data_property(
-            "charging plug connection status"
-        ).value
-        target_battery_level = self.__weconnect_vehicle.get_data_property(
-            "target battery level"
-        ).value
-        battery_level = self.__weconnect_vehicle.get_data_property("battery level").value
-        
-        if battery_level >= target_battery_level and plug_status == PlugStatus.PlugConnectionState.CONNECTED:
+        elif battery_level >= target_battery_level and plug_status == PlugStatus.PlugConnectionState.CONNECTED:
             self.__charging_icon = self.__charge_complete
-            self.__lcd_scene_controller.update_status_bar()
-            LOG.debug(f"Updated the charging icon of the LCDStatusBar to (Icon: {self.__charging_icon})")
-            return
-
-        if plug_status == PlugStatus.PlugConnectionState.CONNECTED:
+        elif plug_status == PlugStatus.PlugConnectionState.CONNECTED:
             self.__charging_icon = self.__plug_connected
-            self.__lcd_scene_controller.update_status_bar()
-            LOG.debug(f"Updated the charging icon of the LCDStatusBar to (Icon: {self.__charging_icon})")
-            return
-
-        self.__charging_icon = None
-        self.__lcd_scene_controller.update_status_bar()
+        else:
+            self.__charging_icon = None
         LOG.debug(f"Updated the charging icon of the LCDStatusBar to (Icon: {self.__charging_icon})")
 
-    def __update_climate_icon(self) -> None:
-        climate_state = self.__weconnect_vehicle.get_data_property(
-            "climate controller state"
-        ).value
+    def __update_climate_icon(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        climate_state = snapshot["climateControllerState"]
         if climate_state in self.__climate_on_states:
             self.__climate_icon = self.__climate_on
         else:
             self.__climate_icon = None
-        self.__lcd_scene_controller.update_status_bar()
         LOG.debug(f"Updated the climate icon of the LCDStatusBar to (Icon: {self.__climate_icon})")
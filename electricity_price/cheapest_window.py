@@ -0,0 +1,308 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple
+if TYPE_CHECKING:
+    from display.lcd_scene_controller import LCDSceneController
+    from electricity_price.spot_price_provider import SpotPriceProvider
+    from weconnect_id.vehicle import WeConnectVehicle
+from electricity_price.price_model import SpotPriceModel
+from display.lcd_scene import LCDScene
+from display.lcd_item import LCDItem
+from weconnect_id.data_providers.vehicle_data_property import ExternalDataProperty
+from datetime import datetime, time, timedelta
+from threading import Lock
+import math
+import logging
+import numpy
+
+
+LOG = logging.getLogger("cheapest_window")
+
+
+class CheapestWindow(NamedTuple):
+    start: datetime
+    end: datetime
+    average_price: float
+    slots: tuple
+
+    def contains(self, moment: datetime) -> bool:
+        '''
+        Checks if the moment is inside one of the slots of the window.
+        '''
+
+        resolution = (self.end - self.slots[-1]).total_seconds()
+        return any(
+            0 <= (moment - slot).total_seconds() < resolution for slot in self.slots
+        )
+
+
+def find_cheapest_window(
+    model: SpotPriceModel,
+    duration: timedelta,
+    deadline: datetime,
+    start: datetime,
+    contiguous: bool = True,
+) -> CheapestWindow:
+    '''
+    Finds the cheapest slots with the total length of the duration between start and deadline.
+    Only the slots from the slot containing start to the deadline are scanned.
+
+    Contiguous windows are found from sliding window sums calculated from the cumulative sum of the prices.
+    Non-contiguous windows are the cheapest slots selected with partial sorting.
+
+    Args:
+        model (SpotPriceModel): Prices to search from.
+        duration (timedelta): Total length of the window.
+        deadline (datetime): Window has to end before this.
+        start (datetime): Window can't start before the slot containing this moment.
+        contiguous (bool, optional): If the slots of the window have to be consecutive. Defaults to True.
+
+    Returns:
+        CheapestWindow: None if the prices until the deadline are not known or there are not enough slots.
+    '''
+
+    if len(model) == 0 or model.end < deadline:
+        return None
+
+    first, last = model.bounds(start, deadline)
+    slots = int(math.ceil(duration.total_seconds() / model.resolution))
+    if slots <= 0 or last - first < slots:
+        return None
+
+    prices = model.prices[first:last]
+    known = ~numpy.isnan(prices)
+    if contiguous:
+        cumulative = numpy.concatenate(([0.0], numpy.cumsum(numpy.where(known, prices, 0))))
+        unknown = numpy.concatenate(([0], numpy.cumsum(~known)))
+        sums = cumulative[slots:] - cumulative[:-slots]
+        sums[(unknown[slots:] - unknown[:-slots]) > 0] = numpy.inf
+        best = int(numpy.argmin(sums))
+        if math.isinf(sums[best]):
+            return None
+        indices = numpy.arange(best, best + slots)
+    else:
+        if numpy.count_nonzero(known) < slots:
+            return None
+        candidates = numpy.where(known, prices, numpy.inf)
+        indices = numpy.sort(numpy.argpartition(candidates, slots - 1)[:slots])
+
+    slot_starts = tuple(model.slot_start(first + int(index)) for index in indices)
+    return CheapestWindow(
+        start=slot_starts[0],
+        end=slot_starts[-1] + timedelta(seconds=model.resolution),
+        average_price=round(float(prices[indices].mean()), 2),
+        slots=slot_starts,
+    )
+
+
+def next_deadline(now: datetime, deadline_time: time) -> datetime:
+    '''
+    Gets the next occurrence of the time of the day after the moment as aware datetime.
+    '''
+
+    deadline = datetime.combine(now.date(), deadline_time).astimezone()
+    if deadline <= now:
+        deadline = datetime.combine(now.date() + timedelta(days=1), deadline_time).astimezone()
+    return deadline
+
+
+class CheapestWindowTracker:
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        duration: timedelta,
+        deadline_time: time,
+        contiguous: bool = True,
+    ) -> None:
+        '''
+        Keeps the cheapest window before the next deadline up to date as prices arrive and time passes.
+        The window is searched again only when the prices change or the deadline moves forward, and a window
+        which has already started is kept until it ends.
+
+        Provides two ExternalDataProperties: <id> is True while the current time is inside the window,
+        and <id>Start is the start time of the window in "%H:%M" format ("-" if not known).
+
+        Args:
+            id (str): ID of the tracker and the data properties.
+            title (str): Title displayed on the LCD screen.
+            duration (timedelta): Total length of the window.
+            deadline_time (time): Time of the day the window has to end before.
+            contiguous (bool, optional): If the slots of the window have to be consecutive. Defaults to True.
+        '''
+
+        self.__id = id
+        self.__duration = duration
+        self.__deadline_time = deadline_time
+        self.__contiguous = contiguous
+        self.__lock = Lock()
+        self.__model = None
+        self.__deadline = None
+        self.__window = None
+        self.__active = ExternalDataProperty(
+            id=id,
+            category="electricity",
+            value=False,
+            desc=f"True while inside the cheapest window ({title})",
+        )
+        self.__start = ExternalDataProperty(
+            id=f"{id}Start",
+            category="electricity",
+            value="-",
+            desc=f"Start time of the cheapest window ({title})",
+        )
+        self.__title_item = LCDItem(id=f"ITEM_{id.upper()}_TITLE", title=title)
+        self.__window_item = LCDItem(
+            id=f"ITEM_{id.upper()}", title="-", content_centering=False, second_title=" "
+        )
+
+    def update(self, model: SpotPriceModel, now: datetime) -> None:
+        '''
+        Updates the window with the latest prices.
+
+        Args:
+            model (SpotPriceModel): Latest prices.
+            now (datetime): Current time as aware datetime.
+        '''
+
+        with self.__lock:
+            deadline = next_deadline(now, self.__deadline_time)
+            window = self.__window
+            running = window is not None and window.start <= now < window.end
+            if not running and (model is not self.__model or deadline != self.__deadline):
+                window = find_cheapest_window(
+                    model=model,
+                    duration=self.__duration,
+                    deadline=deadline,
+                    start=now,
+                    contiguous=self.__contiguous,
+                )
+                self.__model = model
+                self.__deadline = deadline
+                if window != self.__window:
+                    LOG.info(f"Cheapest window (ID: {self.__id}) (Window: {window})")
+            self.__window = window
+
+        self.__active.update_value(window is not None and window.contains(now))
+        self.__start.update_value("-" if window is None else f"{window.start:%H:%M}")
+        if window is None:
+            self.__window_item.update_content(title="-", second_title=" ")
+        else:
+            self.__window_item.update_content(
+                title=f"{window.start:%H:%M}-{window.end:%H:%M}",
+                second_title=f"{window.average_price}C",
+            )
+
+    @property
+    def id(self) -> str:
+        return self.__id
+
+    @property
+    def window(self) -> CheapestWindow:
+        return self.__window
+
+    @property
+    def data_properties(self) -> list:
+        return [self.__active, self.__start]
+
+    @property
+    def items(self) -> list:
+        return [self.__title_item, self.__window_item]
+
+
+class CheapestWindows:
+    def __init__(
+        self,
+        spot_price_provider: SpotPriceProvider,
+        lcd_scene_controller: LCDSceneController,
+        trackers: list,
+    ) -> None:
+        '''
+        Runs the configured CheapestWindowTrackers whenever new prices arrive or the price period changes,
+        and displays the windows in SCENE_CHEAPEST_WINDOWS.
+
+        Args:
+            spot_price_provider (SpotPriceProvider): Provides the prices.
+            lcd_scene_controller (LCDSceneController): Used to display the windows on the LCD screen.
+            trackers (list): CheapestWindowTrackers to run.
+        '''
+
+        LOG.debug("Initializing CheapestWindows")
+        self.__spot_price_provider = spot_price_provider
+        self.__trackers = trackers
+        self.__scene = LCDScene(
+            id="SCENE_CHEAPEST_WINDOWS",
+            items_selectable=False,
+            lcd_scene_controller=lcd_scene_controller,
+        )
+        for tracker in trackers:
+            for item in tracker.items:
+                self.__scene.add_item(item)
+        self.__item = LCDItem(
+            title="Halvimmat",
+            id="ITEM_CHEAPEST_WINDOWS",
+            target=self.__scene,
+        )
+        self.update()
+        spot_price_provider.add_update_callback(id="CHEAPEST_WINDOWS", function=self.update)
+        LOG.debug("Successfully initialized CheapestWindows")
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict,
+        spot_price_provider: SpotPriceProvider,
+        lcd_scene_controller: LCDSceneController,
+    ):
+        '''
+        Creates CheapestWindows from the optional "cheapest windows" config, e.g.
+        [{"id": "cheapestChargeWindow", "title": "Lataus 3h", "duration": 180, "deadline": "07:00", "contiguous": true}].
+        Duration is in minutes.
+
+        Returns:
+            CheapestWindows: None if no windows are configured.
+        '''
+
+        window_configs = config.get("cheapest windows", [])
+        if not window_configs:
+            return None
+        trackers = [
+            CheapestWindowTracker(
+                id=window_config["id"],
+                title=window_config.get("title", window_config["id"]),
+                duration=timedelta(minutes=window_config["duration"]),
+                deadline_time=time.fromisoformat(window_config["deadline"]),
+                contiguous=window_config.get("contiguous", True),
+            )
+            for window_config in window_configs
+        ]
+        return cls(spot_price_provider, lcd_scene_controller, trackers)
+
+    def update(self) -> None:
+        model = self.__spot_price_provider.model
+        now = datetime.now().astimezone()
+        for tracker in self.__trackers:
+            try:
+                tracker.update(model, now)
+            except Exception as e:
+                LOG.exception(e)
+
+    def add_data_properties(self, weconnect_vehicle: WeConnectVehicle) -> None:
+        '''
+        Adds the data properties of the trackers to the vehicle, so they can be used in the vehicle based items and rules.
+        '''
+
+        for tracker in self.__trackers:
+            for data_property in tracker.data_properties:
+                weconnect_vehicle.add_external_data_property(data_property)
+
+    @property
+    def trackers(self) -> list:
+        return list(self.__trackers)
+
+    @property
+    def scene(self) -> LCDScene:
+        return self.__scene
+
+    @property
+    def item(self) -> LCDItem:
+        return self.__item
@@ -0,0 +1,262 @@
+from datetime import datetime, date, time, timedelta
+import math
+import numpy
+
+
+def parse_price_time(time_string: str) -> datetime:
+    return datetime.strptime(time_string, "%Y-%m-%dT%H:%M:%S%z")
+
+
+def local_midnight(day: date) -> datetime:
+    '''
+    Start of the local day as aware datetime. Correct on the days when the clocks are turned.
+    '''
+
+    return datetime.combine(day, time(0)).astimezone()
+
+
+def infer_resolution(timestamps: list) -> int:
+    '''
+    Infers the length of the market time unit from the gaps between the price periods.
+
+    Returns:
+        int: Length of the price periods in seconds. Defaults to one hour.
+    '''
+
+    gaps = [later - earlier for earlier, later in zip(timestamps, timestamps[1:]) if later > earlier]
+    return int(min(gaps)) if gaps else 3600
+
+
+class SpotPriceModel:
+    def __init__(self, start: float, resolution: int, prices, prices_no_tax=None) -> None:
+        '''
+        Spot prices of contiguous time slots stored in arrays. Slot of a moment is found by arithmetic
+        from the POSIX timestamp, so lookups are O(1) and time ranges are array slices. Indexing by timestamps
+        keeps the days with 23 or 25 hours correct. Slots without price are NaN.
+
+        Args:
+            start (float): Start of the first slot as POSIX timestamp.
+            resolution (int): Length of the slots in seconds, 900 for 15 minute market time units or 3600 for hourly prices.
+            prices: Prices with tax in c/kWh for each slot.
+            prices_no_tax (optional): Prices without tax in c/kWh for each slot. Defaults to NaN.
+        '''
+
+        self.__start = float(start)
+        self.__resolution = int(resolution)
+        self.__prices = numpy.asarray(prices, dtype="<f8")
+        self.__prices.flags.writeable = False
+        if prices_no_tax is None:
+            prices_no_tax = numpy.full(len(self.__prices), numpy.nan)
+        self.__prices_no_tax = numpy.asarray(prices_no_tax, dtype="<f8")
+        self.__prices_no_tax.flags.writeable = False
+
+    @classmethod
+    def from_entries(cls, entries: list, resolution: int = None):
+        '''
+        Creates SpotPriceModel from price entries in the spot-hinta.fi format, e.g. today and tomorrow combined.
+        Entries with longer period than the resolution (hourly prices mixed with 15 minute prices) fill all their slots.
+
+        Args:
+            entries (list): Dicts with "DateTime", "PriceWithTax" and "PriceNoTax" keys. Prices in c/kWh.
+            resolution (int, optional): Length of the slots in seconds. Defaults to the shortest period in the entries.
+
+        Returns:
+            SpotPriceModel
+        '''
+
+        if not entries:
+            return cls.empty()
+
+        rows = sorted(
+            (parse_price_time(entry["DateTime"]).timestamp(), entry["PriceWithTax"], entry["PriceNoTax"])
+            for entry in entries
+        )
+        timestamps = [row[0] for row in rows]
+        if resolution is None:
+            resolution = infer_resolution(timestamps)
+
+        start = timestamps[0]
+        durations = []
+        for position, timestamp in enumerate(timestamps):
+            gap = timestamps[position + 1] - timestamp if position + 1 < len(timestamps) else None
+            # Price periods are either the resolution or an hour, any other gap means missing entries
+            if gap in (resolution, 3600):
+                durations.append(gap)
+            else:
+                duration = durations[-1] if durations else resolution
+                durations.append(duration if gap is None else min(duration, gap))
+        slots = int(math.ceil((timestamps[-1] + durations[-1] - start) / resolution))
+
+        prices = numpy.full(slots, numpy.nan)
+        prices_no_tax = numpy.full(slots, numpy.nan)
+        for (timestamp, price, price_no_tax), duration in zip(rows, durations):
+            first = int((timestamp - start) // resolution)
+            last = first + max(int(duration // resolution), 1)
+            prices[first:last] = price
+            prices_no_tax[first:last] = price_no_tax
+        return cls(start, resolution, prices, prices_no_tax)
+
+    @classmethod
+    def empty(cls):
+        return cls(0, 3600, [])
+
+    def __len__(self) -> int:
+        return len(self.__prices)
+
+    @property
+    def resolution(self) -> int:
+        return self.__resolution
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromtimestamp(self.__start).astimezone()
+
+    @property
+    def end(self) -> datetime:
+        return datetime.fromtimestamp(self.__start + len(self) * self.__resolution).astimezone()
+
+    @property
+    def prices(self):
+        return self.__prices
+
+    @property
+    def prices_no_tax(self):
+        return self.__prices_no_tax
+
+    @property
+    def timestamps(self):
+        return self.__start + numpy.arange(len(self)) * self.__resolution
+
+    def index(self, moment: datetime) -> int:
+        '''
+        Gets the slot containing the moment.
+
+        Args:
+            moment (datetime): Aware datetime.
+
+        Returns:
+            int: Index of the slot or None if the moment is outside the model.
+        '''
+
+        index = int((moment.timestamp() - self.__start) // self.__resolution)
+        if 0 <= index < len(self):
+            return index
+        return None
+
+    def slot_start(self, index: int) -> datetime:
+        return datetime.fromtimestamp(self.__start + index * self.__resolution).astimezone()
+
+    def price_at(self, moment: datetime) -> float:
+        '''
+        Gets the price with tax of the slot containing the moment.
+
+        Returns:
+            float: Price in c/kWh or None if the price is not known.
+        '''
+
+        index = self.index(moment)
+        if index is None or math.isnan(self.__prices[index]):
+            return None
+        return float(self.__prices[index])
+
+    def bounds(self, start: datetime = None, end: datetime = None) -> tuple:
+        '''
+        Gets the slot indices of the time range. Partially covered slots are included.
+
+        Args:
+            start (datetime, optional): Start of the range. Defaults to the start of the model.
+            end (datetime, optional): End of the range (exclusive). Defaults to the end of the model.
+
+        Returns:
+            tuple: First and last (exclusive) index.
+        '''
+
+        first = 0
+        last = len(self)
+        if start is not None:
+            first = min(max(int((start.timestamp() - self.__start) // self.__resolution), 0), len(self))
+        if end is not None:
+            last = min(max(int(math.ceil((end.timestamp() - self.__start) / self.__resolution)), first), len(self))
+        return first, last
+
+    def slice(self, start: datetime = None, end: datetime = None) -> tuple:
+        '''
+        Gets the prices of the time range without copying them.
+
+        Returns:
+            tuple: Array of slot start timestamps and array view of the prices with tax.
+        '''
+
+        first, last = self.bounds(start, end)
+        return self.__start + numpy.arange(first, last) * self.__resolution, self.__prices[first:last]
+
+    def next_boundary(self, moment: datetime) -> datetime:
+        '''
+        Gets the start of the next slot after the moment. Outside the model hour boundaries are used.
+        '''
+
+        timestamp = moment.timestamp()
+        if self.__start <= timestamp < self.__start + len(self) * self.__resolution:
+            index = int((timestamp - self.__start) // self.__resolution)
+            return datetime.fromtimestamp(self.__start + (index + 1) * self.__resolution).astimezone()
+        return moment.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+    def hourly(self, start: datetime = None, end: datetime = None) -> list:
+        '''
+        Averages the slots into hours.
+
+        Returns:
+            list: (hour start as aware datetime, mean price with tax or None) tuples ordered by time.
+        '''
+
+        first, last = self.bounds(start, end)
+        timestamps = self.__start + numpy.arange(first, last) * self.__resolution
+        if len(timestamps) == 0:
+            return []
+
+        hours = numpy.floor(timestamps / 3600) * 3600
+        hour_starts, positions = numpy.unique(hours, return_index=True)
+        prices = self.__prices[first:last]
+        hourly = []
+        for hour_start, position, next_position in zip(
+            hour_starts, positions, list(positions[1:]) + [len(prices)]
+        ):
+            values = prices[position:next_position]
+            values = values[~numpy.isnan(values)]
+            hourly.append(
+                (
+                    datetime.fromtimestamp(hour_start).astimezone(),
+                    round(float(values.mean()), 2) if len(values) else None,
+                )
+            )
+        return hourly
+
+    def statistics(self, start: datetime = None, end: datetime = None) -> tuple:
+        '''
+        Calculates the minimum, maximum and average price with tax of the time range.
+
+        Returns:
+            tuple: Minimum, maximum and average in c/kWh. None if no prices are known in the range.
+        '''
+
+        first, last = self.bounds(start, end)
+        prices = self.__prices[first:last]
+        prices = prices[~numpy.isnan(prices)]
+        if len(prices) == 0:
+            return None
+        return (
+            round(float(prices.min()), 2),
+            round(float(prices.max()), 2),
+            round(float(prices.mean()), 2),
+        )
+
+    def is_complete(self, day: date) -> bool:
+        '''
+        Checks that the model has prices for all slots of the local day.
+        '''
+
+        first, last = self.bounds(local_midnight(day), local_midnight(day + timedelta(days=1)))
+        expected = (
+            local_midnight(day + timedelta(days=1)).timestamp() - local_midnight(day).timestamp()
+        ) / self.__resolution
+        return last - first == expected and not numpy.isnan(self.__prices[first:last]).any()
@@ -0,0 +1,211 @@
+from electricity_price.price_model import parse_price_time, local_midnight
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from pathlib import Path
+import urllib.request
+import json
+import random
+import logging
+
+
+LOG = logging.getLogger("spot_price_provider")
+
+
+class PriceSourceError(Exception):
+    pass
+
+
+class RetryPolicy(NamedTuple):
+    initial_delay: float = 60
+    multiplier: float = 2
+    maximum_delay: float = 1800
+    jitter: float = 0.1
+
+    @classmethod
+    def from_config(cls, config: dict):
+        '''
+        Creates RetryPolicy from the optional "retry" config of the "spot price source" config, e.g.
+        {"initial delay": 60, "multiplier": 2, "maximum delay": 1800, "jitter": 0.1}.
+        '''
+
+        retry_config = config.get("spot price source", {}).get("retry", {})
+        defaults = cls()
+        return cls(
+            initial_delay=retry_config.get("initial delay", defaults.initial_delay),
+            multiplier=retry_config.get("multiplier", defaults.multiplier),
+            maximum_delay=retry_config.get("maximum delay", defaults.maximum_delay),
+            jitter=retry_config.get("jitter", defaults.jitter),
+        )
+
+    def get_delay(self, attempt: int) -> float:
+        '''
+        Gets the delay before the retry after failed attempts. Delay grows exponentially and is randomized
+        with the jitter, so devices which failed at the same time don't retry at the same time.
+
+        Args:
+            attempt (int): Amount of failed attempts in a row, starting from 1.
+
+        Returns:
+            float: Delay in seconds.
+        '''
+
+        delay = min(self.initial_delay * self.multiplier ** max(attempt - 1, 0), self.maximum_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def convert_spot_hinta_entries(data: list) -> list:
+    '''
+    Converts price entries in the spot-hinta.fi format from €/kWh to c/kWh.
+
+    Args:
+        data (list): Dicts with "DateTime", "PriceWithTax" and "PriceNoTax" keys.
+
+    Returns:
+        list: Converted copies of the entries.
+    '''
+
+    try:
+        return [
+            {
+                **item,
+                "PriceWithTax": round(item["PriceWithTax"] * 100, 2),
+                "PriceNoTax": round(item["PriceNoTax"] * 100, 2),
+            }
+            for item in data
+        ]
+    except (KeyError, TypeError) as e:
+        raise PriceSourceError(f"Unexpected price data (Error: {e})") from e
+
+
+class PriceSource:
+    '''
+    Provides price entries for SpotPriceProvider. Entries are dicts with "DateTime" in "%Y-%m-%dT%H:%M:%S%z" format,
+    "PriceWithTax" and "PriceNoTax" in c/kWh, so SpotPriceProvider doesn't depend on the format of the backend.
+    '''
+
+    def fetch(self) -> list:
+        '''
+        Fetches the latest price entries. Called on a background thread.
+
+        Raises:
+            PriceSourceError: Raised if the prices can't be fetched.
+        '''
+
+        raise NotImplementedError
+
+
+class SpotHintaPriceSource(PriceSource):
+    API_URL = "https://api.spot-hinta.fi/TodayAndDayForward?priceResolution=15"
+
+    def __init__(self, url: str = None, timeout: float = 30) -> None:
+        '''
+        Fetches prices of today and tomorrow from the spot-hinta.fi API, or from any server
+        with the same JSON format like the local stub server.
+
+        Args:
+            url (str, optional): URL of the API. Defaults to API_URL.
+            timeout (float, optional): Timeout of the request in seconds. Defaults to 30.
+        '''
+
+        self.__url = self.API_URL if url is None else url
+        self.__timeout = timeout
+
+    def fetch(self) -> list:
+        try:
+            with urllib.request.urlopen(self.__url, timeout=self.__timeout) as url:
+                data = json.loads(url.read().decode())
+        except Exception as e:
+            raise PriceSourceError(f"Failed to fetch prices from {self.__url} (Error: {e})") from e
+        return convert_spot_hinta_entries(data)
+
+    def __str__(self) -> str:
+        return f"SpotHintaPriceSource ({self.__url})"
+
+
+class FilePriceSource(PriceSource):
+    def __init__(self, path: str, shift_to_today: bool = False) -> None:
+        '''
+        Reads prices from a JSON file in the spot-hinta.fi format, e.g. a recorded API response.
+
+        Args:
+            path (str): Path of the JSON file.
+            shift_to_today (bool, optional): If the prices are moved by whole days so the first day is today.
+                Used to replay recorded prices offline. Defaults to False.
+        '''
+
+        self.__path = Path(path)
+        self.__shift_to_today = shift_to_today
+
+    def fetch(self) -> list:
+        try:
+            with open(self.__path, "r") as price_file:
+                entries = convert_spot_hinta_entries(json.load(price_file))
+        except (OSError, ValueError) as e:
+            raise PriceSourceError(f"Failed to read prices from {self.__path} (Error: {e})") from e
+        if not self.__shift_to_today or not entries:
+            return entries
+
+        first_day = min(parse_price_time(entry["DateTime"]).astimezone().date() for entry in entries)
+        shift = datetime.now().date() - first_day
+        for entry in entries:
+            moment = parse_price_time(entry["DateTime"]).astimezone()
+            # Shifted in local time, so the prices stay at the same hours over daylight saving time changes
+            shifted = datetime.combine(moment.date() + shift, moment.time()).astimezone()
+            entry["DateTime"] = shifted.strftime("%Y-%m-%dT%H:%M:%S%z")
+        return entries
+
+    def __str__(self) -> str:
+        return f"FilePriceSource ({self.__path})"
+
+
+def create_price_source(config: dict) -> PriceSource:
+    '''
+    Creates PriceSource from the optional "spot price source" config, e.g.
+    {"type": "spot-hinta", "url": "http://localhost:8080/TodayAndDayForward", "timeout": 30}
+    or {"type": "file", "path": "prices.json", "shift to today": true}.
+
+    Returns:
+        PriceSource: SpotHintaPriceSource with the default URL if the source is not configured.
+
+    Raises:
+        ValueError: Raised if the type of the source is unknown.
+    '''
+
+    source_config = config.get("spot price source", {})
+    source_type = source_config.get("type", "spot-hinta")
+    if source_type == "spot-hinta":
+        return SpotHintaPriceSource(
+            url=source_config.get("url"),
+            timeout=source_config.get("timeout", 30),
+        )
+    if source_type == "file":
+        return FilePriceSource(
+            path=source_config["path"],
+            shift_to_today=source_config.get("shift to today", False),
+        )
+    raise ValueError(f"Unknown spot price source type: {source_type}")
+
+
+def create_stub_entries(days: int = 2, resolution: int = 900, seed: int = None) -> list:
+    '''
+    Creates synthetic price entries in the spot-hinta.fi format starting from today.
+    '''
+
+    generator = random.Random(seed)
+    start = local_midnight(datetime.now().date())
+    end = local_midnight(datetime.now().date() + timedelta(days=days))
+    entries = []
+    timestamp = start.timestamp()
+    while timestamp < end.timestamp():
+        moment = datetime.fromtimestamp(timestamp).astimezone()
+        price = max(0.0, 0.08 + 0.05 * ((moment.hour - 3) % 24) / 24 + generator.gauss(0, 0.02))
+        entries.append(
+            {
+                "Rank": 0,
+                "DateTime": moment.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "PriceNoTax": round(price / 1.255, 5),
+                "PriceWithTax": round(price, 5),
+            }
+        )
+        timestamp += resolution
+    return entries
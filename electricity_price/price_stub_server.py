@@ -0,0 +1,89 @@
+from electricity_price.price_sources import create_stub_entries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import time
+import logging
+
+
+LOG = logging.getLogger("spot_price_provider")
+
+
+class PriceStubServer(ThreadingHTTPServer):
+    def __init__(
+        self,
+        address: tuple,
+        path: str = None,
+        delay: float = 0,
+        failure_rate: float = 0,
+    ) -> None:
+        '''
+        Local HTTP server answering every GET request like the spot-hinta.fi TodayAndDayForward API.
+        Used with SpotHintaPriceSource to test the price pipeline and its scene updates offline.
+
+        Args:
+            address (tuple): Host and port to listen.
+            path (str, optional): JSON file in the spot-hinta.fi format to serve.
+                Defaults to None, which serves synthetic prices of today and tomorrow.
+            delay (float, optional): Seconds to wait before answering, for testing the timeouts. Defaults to 0.
+            failure_rate (float, optional): Share of requests answered with HTTP 503, for testing the retries. Defaults to 0.
+        '''
+
+        super().__init__(address, PriceStubRequestHandler)
+        self.prices_path = path
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.requests = 0
+
+    def get_body(self) -> bytes:
+        if self.prices_path is None:
+            return json.dumps(create_stub_entries()).encode()
+        with open(self.prices_path, "rb") as price_file:
+            return price_file.read()
+
+
+class PriceStubRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if random.random() < self.server.failure_rate:
+            self.send_error(503)
+            return
+        body = self.server.get_body()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        LOG.debug(f"Price stub server: {format % args}")
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve spot prices locally in the spot-hinta.fi format")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen")
+    parser.add_argument("--prices", help="JSON file to serve. Synthetic prices of today and tomorrow are served if not given")
+    parser.add_argument("--delay", type=float, default=0, help="Seconds to wait before answering")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Share of requests answered with HTTP 503")
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG)
+    server = PriceStubServer(
+        address=(arguments.host, arguments.port),
+        path=arguments.prices,
+        delay=arguments.delay,
+        failure_rate=arguments.failure_rate,
+    )
+    print(f"Serving spot prices at http://{arguments.host}:{arguments.port}/TodayAndDayForward")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
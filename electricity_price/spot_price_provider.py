@@ -4,99 +4,353 @@ if TYPE_CHECKING:
     from display.lcd_scene_controller import LCDSceneController
 from display.lcd_scene import LCDScene
 from display.lcd_item import LCDItem
-import urllib.request
+from display.custom_scenes.spot_price_graph_scene import SpotPriceGraphScene
+from pathlib import Path
+from threading import Timer, Thread, Lock
+from electricity_price.price_model import SpotPriceModel, parse_price_time, local_midnight
+from weconnect_id.data_providers.vehicle_data_property import ExternalDataProperty
+from electricity_price.price_sources import PriceSource, PriceSourceError, RetryPolicy, SpotHintaPriceSource
 import json
-from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
+import os
+from datetime import datetime, date, time, timedelta
 import logging
 
 
 LOG = logging.getLogger("spot_price_provider")
 
 
+class SpotPriceCache:
+    def __init__(self, path: str) -> None:
+        '''
+        Stores spot prices on disk as one JSON file per delivery date, so prices are available
+        at boot and after network outages without fetching them again.
+
+        Args:
+            path (str): Path of the cache folder.
+        '''
+
+        self.__path = Path(path)
+
+    def __get_file(self, delivery_date: date) -> Path:
+        return self.__path / f"{delivery_date.isoformat()}.json"
+
+    def get(self, delivery_date: date) -> list:
+        '''
+        Reads prices of a delivery date.
+
+        Args:
+            delivery_date (date): Local delivery date.
+
+        Returns:
+            list: Price entries in the spot-hinta.fi format ordered by time. None if the date isn't cached.
+        '''
+
+        try:
+            with open(self.__get_file(delivery_date), "r") as cache_file:
+                return json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            LOG.exception(e)
+            return None
+
+    def put(self, delivery_date: date, entries: list) -> None:
+        self.__path.mkdir(parents=True, exist_ok=True)
+        path = self.__get_file(delivery_date)
+        temporary_path = path.with_suffix(".tmp")
+        try:
+            with open(temporary_path, "w") as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            LOG.exception(e)
+
+    def remove_older_than(self, delivery_date: date) -> None:
+        for path in self.__path.glob("*.json"):
+            try:
+                if date.fromisoformat(path.stem) < delivery_date:
+                    path.unlink()
+            except ValueError:
+                continue
+
+
 class SpotPriceProvider:
-    def __init__(self, lcd_scene_controller: LCDSceneController) -> None:
+    # Day-ahead prices are published around 14:00 Finnish time
+    PUBLICATION_TIME = time(14, 15)
+
+    def __init__(
+        self,
+        lcd_scene_controller: LCDSceneController,
+        cache_path: str = None,
+        price_source: PriceSource = None,
+        retry_policy: RetryPolicy = None,
+    ) -> None:
         '''
-        Gets current electricity prices in Finland.
+        Gets electricity prices in Finland for today and tomorrow.
+
+        Prices are read from the on-disk cache at startup and fetched in the background only when today
+        is missing or incomplete in the cache, or when tomorrow is missing after the day-ahead prices are published.
+        Current price is moved forward locally by a timer aligned to the next price period boundary.
+        Failed fetches are retried with the delays of the retry policy.
+
+        Current and next price and the minimum, average and maximum price of today are published as
+        ExternalDataProperties (spotPriceNow, spotPriceNext, spotPriceTodayMin, spotPriceTodayAverage, spotPriceTodayMax),
+        so they can be observed and logged like the vehicle data.
 
         Args:
             lcd_scene_controller (LCDSceneController): Used to display electricity prices on the LCD screen.
+            cache_path (str, optional): Path of the spot price cache folder. If None, prices are not cached. Defaults to None.
+            price_source (PriceSource, optional): Provides the prices. Defaults to SpotHintaPriceSource.
+            retry_policy (RetryPolicy, optional): Delays of the retries after failed fetches. Defaults to RetryPolicy().
         '''
-        
+
         LOG.debug("Initializing SpotPriceProvider")
-        self.__prices = {}
+        self.__lock = Lock()
+        self.__timer_lock = Lock()
+        self.__cache = SpotPriceCache(cache_path) if cache_path is not None else None
+        self.__price_source = SpotHintaPriceSource() if price_source is None else price_source
+        self.__retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.__failed_attempts = 0
+        self.__entries = {}
+        self.__model = SpotPriceModel.empty()
         self.__price_now = None
-        self.__price_now_item = None
-        self.__price_items = None
+        self.__delivery_date = None
+        self.__fetch_thread = None
+        self.__rollover_timer = None
+        self.__fetch_timer = None
+        self.__stopped = False
+        self.__update_callbacks = {}
+        self.__price_now_property = self.__create_data_property("spotPriceNow", "Spot price of the current price period")
+        self.__price_next_property = self.__create_data_property("spotPriceNext", "Spot price of the next price period")
+        self.__statistics_properties = (
+            self.__create_data_property("spotPriceTodayMin", "Lowest spot price of today"),
+            self.__create_data_property("spotPriceTodayMax", "Highest spot price of today"),
+            self.__create_data_property("spotPriceTodayAverage", "Average spot price of today"),
+        )
         self.__prices_scene = LCDScene(
             id="SCENE_SPOT_PRICE_LIST",
             items_selectable=False,
             lcd_scene_controller=lcd_scene_controller,
         )
-        self.__items_created = False
-        self.__update()
-        self.__create_items()
-        self.__scheduler = BackgroundScheduler(timezone="Europe/Helsinki")
-        self.__scheduler.start()
-        self.__scheduler.add_job(
-            func=self.__update,
-            trigger="cron",
-            minute="0, 15, 30, 45",
-            id="SPOT_PRICE_UPDATER",
+        self.__graph_scene = SpotPriceGraphScene(
+            id="SCENE_SPOT_PRICE_GRAPH",
+            lcd_scene_controller=lcd_scene_controller,
+        )
+        self.__graph_item = LCDItem(
+            title="Hintakäyrä",
+            id="ITEM_SPOT_PRICE_GRAPH",
+            target=self.__graph_scene,
         )
-        LOG.debug("Successfully initialized SpotPriceProvider")
-
-    def __update(self) -> None:
-        LOG.debug("Updating SpotPriceProvider data")
-        with urllib.request.urlopen("https://api.spot-hinta.fi/Today") as url:
-            data = json.loads(url.read().decode())
-
-        for item in data:
-            item["PriceWithTax"] = round(item["PriceWithTax"] * 100, 2)
-            item["PriceNoTax"] = round(item["PriceNoTax"] * 100, 2)
-            self.__prices[
-                datetime.strptime(item["DateTime"], "%Y-%m-%dT%H:%M:%S%z").strftime(
-                    "%H"
-                )
-            ] = item
-
-        self.__price_now = self.__prices[datetime.now().strftime("%H")]["PriceWithTax"]
-        if self.__items_created:
-            self.__update_items()
-        LOG.debug("Successfully updated SpotPriceProvider data")
-
-    def __create_items(self) -> None:
-        self.__price_items = {}
-        hours = [str(i) if i > 9 else "0" + str(i) for i in range(24)]
-        for hour in hours:
-            self.__price_items[hour] = LCDItem(
-                id=f"ITEM_SPOT_PRICE_{hour}",
-                title=f"Tunti {hour}:",
-                content_centering=False,
-                second_title=str(self.__prices[hour]["PriceWithTax"]) + "C/kWh",
-            )
-            self.__prices_scene.add_item(self.__price_items[hour])
-
         self.__price_now_item = LCDItem(
             title="Hinta Nyt",
             id="ITEM_SPOT_PRICE_NOW",
             content_centering=False,
-            second_title=str(self.__price_now) + "C/kWh",
+            second_title=self.__format_price(None),
             target=self.__prices_scene,
         )
-        self.__items_created = True
+        self.__load_day(datetime.now().astimezone())
+        LOG.debug("Successfully initialized SpotPriceProvider")
+
+    def __create_data_property(self, id: str, desc: str) -> ExternalDataProperty:
+        return ExternalDataProperty(id=id, category="electricity", desc=desc, unit="c/kWh")
+
+    def __load_day(self, now: datetime) -> None:
+        today = now.date()
+        with self.__lock:
+            self.__delivery_date = today
+            self.__entries = {}
+            for delivery_date in (today, today + timedelta(days=1)):
+                entries = self.__cache.get(delivery_date) if self.__cache is not None else None
+                if entries is not None:
+                    self.__entries[delivery_date] = entries
+            self.__update_model()
+        self.__update_list_items()
+        self.__schedule_fetch(now)
+        self.__roll_over()
+
+    def __update_model(self) -> None:
+        entries = [entry for day in sorted(self.__entries) for entry in self.__entries[day]]
+        self.__model = SpotPriceModel.from_entries(entries)
+
+    def __get_fetch_delay(self, now: datetime) -> float:
+        '''
+        Gets the seconds until the next fetch is needed. None if today and tomorrow are complete.
+        '''
 
-    def __update_items(self) -> None:
-        hours = [str(i) if i > 9 else "0" + str(i) for i in range(24)]
-        for hour in hours:
-            self.__price_items[hour].update_content(
-                second_title=str(self.__prices[hour]["PriceWithTax"]) + "C/kWh",
+        today = now.date()
+        with self.__lock:
+            today_complete = self.__model.is_complete(today)
+            tomorrow_complete = self.__model.is_complete(today + timedelta(days=1))
+        if not today_complete:
+            return 0
+        if tomorrow_complete:
+            return None
+        publication = datetime.combine(today, self.PUBLICATION_TIME).astimezone()
+        return max((publication - now).total_seconds(), 0)
+
+    def __schedule_fetch(self, now: datetime, retry: bool = False) -> None:
+        delay = self.__get_fetch_delay(now)
+        if delay != 0:
+            self.__failed_attempts = 0
+        if delay is None:
+            return
+        if retry and delay == 0:
+            self.__failed_attempts += 1
+            delay = self.__retry_policy.get_delay(self.__failed_attempts)
+        if delay == 0:
+            self.__start_fetch()
+            return
+        with self.__timer_lock:
+            if self.__stopped:
+                return
+            if self.__fetch_timer is not None:
+                self.__fetch_timer.cancel()
+            self.__fetch_timer = Timer(delay, self.__start_fetch)
+            self.__fetch_timer.daemon = True
+            self.__fetch_timer.start()
+        LOG.debug(f"Next spot price fetch in {round(delay)}s")
+
+    def __start_fetch(self) -> None:
+        if self.__fetch_thread is not None and self.__fetch_thread.is_alive():
+            return
+        self.__fetch_thread = Thread(target=self.__fetch, name="SPOT_PRICE_FETCH", daemon=True)
+        self.__fetch_thread.start()
+
+    def __fetch(self) -> None:
+        LOG.debug(f"Fetching spot prices (Source: {self.__price_source})")
+        try:
+            data = self.__price_source.fetch()
+        except PriceSourceError as e:
+            LOG.error(f"Failed to fetch spot prices (Error: {e})")
+            self.__schedule_fetch(datetime.now().astimezone(), retry=True)
+            return
+
+        entries_by_date = {}
+        for item in data:
+            entries_by_date.setdefault(parse_price_time(item["DateTime"]).astimezone().date(), []).append(item)
+
+        with self.__lock:
+            today = self.__delivery_date
+            for delivery_date, entries in entries_by_date.items():
+                if self.__cache is not None:
+                    self.__cache.put(delivery_date, entries)
+                if delivery_date in (today, today + timedelta(days=1)):
+                    self.__entries[delivery_date] = entries
+            self.__update_model()
+
+        if self.__cache is not None:
+            self.__cache.remove_older_than(today - timedelta(days=7))
+        LOG.debug(f"Fetched spot prices (Delivery dates: {sorted(str(day) for day in entries_by_date)})")
+        self.__update_list_items()
+        self.__schedule_fetch(datetime.now().astimezone(), retry=True)
+        self.__roll_over()
+
+    def __roll_over(self) -> None:
+        now = datetime.now().astimezone()
+        if now.date() != self.__delivery_date:
+            self.__load_day(now)
+            return
+
+        with self.__lock:
+            self.__price_now = self.__model.price_at(now)
+            next_boundary = self.__model.next_boundary(now)
+            price_next = self.__model.price_at(next_boundary)
+        self.__price_now_item.update_content(second_title=self.__format_price(self.__price_now))
+        self.__price_now_property.update_value(self.__price_now)
+        self.__price_next_property.update_value(price_next)
+        self.__run_update_callbacks()
+
+        with self.__timer_lock:
+            if self.__stopped:
+                return
+            if self.__rollover_timer is not None:
+                self.__rollover_timer.cancel()
+            self.__rollover_timer = Timer(
+                max((next_boundary - now).total_seconds(), 0) + 0.5, self.__roll_over
             )
-        self.__price_now_item.update_content(second_title=str(self.__price_now) + "C/kWh")
+            self.__rollover_timer.daemon = True
+            self.__rollover_timer.start()
+
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        '''
+        Adds callback function which is called when the current price period changes or new prices are fetched.
+
+        Args:
+            id (str): ID for the function so it can be removed later.
+            function (callable): Function to be called.
+            args (list, optional): Arguments for the given function. Defaults to None.
+        '''
+
+        self.__update_callbacks[id] = {
+            "id": id,
+            "function": function,
+            "args": [] if args is None else args,
+        }
+        LOG.debug(f"Added SpotPriceProvider update callback function (ID: {id})")
+
+    def remove_update_callback(self, id: str) -> None:
+        self.__update_callbacks.pop(id, None)
+        LOG.debug(f"Removed SpotPriceProvider update callback function (ID: {id})")
+
+    def __run_update_callbacks(self) -> None:
+        for callback in list(self.__update_callbacks.values()):
+            try:
+                callback["function"](*callback["args"])
+            except Exception as e:
+                LOG.exception(e)
+
+    def stop(self) -> None:
+        '''
+        Stops the rollover and fetch timers.
+        '''
+
+        with self.__timer_lock:
+            self.__stopped = True
+            for timer in (self.__rollover_timer, self.__fetch_timer):
+                if timer is not None:
+                    timer.cancel()
+
+    def __format_price(self, price) -> str:
+        return ("-" if price is None else str(price)) + "C/kWh"
+
+    def __update_list_items(self) -> None:
+        with self.__lock:
+            today = self.__delivery_date
+            model = self.__model
+        hourly = model.hourly()
+        statistics = model.statistics(local_midnight(today), local_midnight(today + timedelta(days=1)))
+        for data_property, value in zip(self.__statistics_properties, statistics or (None, None, None)):
+            data_property.update_value(value)
+        items = []
+        for hour_start, price in hourly:
+            if hour_start.date() == today:
+                title = f"Tunti {hour_start:%H}:"
+            elif hour_start.date() == today + timedelta(days=1):
+                title = f"Huom. {hour_start:%H}:"
+            else:
+                continue
+            items.append(
+                LCDItem(
+                    id=f"ITEM_SPOT_PRICE_{hour_start:%Y%m%d%H%z}",
+                    title=title,
+                    content_centering=False,
+                    second_title=self.__format_price(price),
+                )
+            )
+        self.__prices_scene.set_items(items)
+        self.__graph_scene.set_prices(model, today)
+
+    @property
+    def model(self) -> SpotPriceModel:
+        '''
+        Prices of today and tomorrow. Replaced with new SpotPriceModel when prices are fetched or the day changes.
+        '''
+
+        return self.__model
 
     @property
-    def prices(self) -> dict:
-        return self.__prices
+    def price_now(self) -> float:
+        return self.__price_now
 
     @property
     def scene(self) -> LCDScene:
@@ -105,3 +359,15 @@ class SpotPriceProvider:
     @property
     def price_now_item(self) -> LCDItem:
         return self.__price_now_item
+
+    @property
+    def data_properties(self) -> list:
+        return [self.__price_now_property, self.__price_next_property, *self.__statistics_properties]
+
+    @property
+    def graph_scene(self) -> SpotPriceGraphScene:
+        return self.__graph_scene
+
+    @property
+    def graph_item(self) -> LCDItem:
+        return self.__graph_item
@@ -1,4 +1,7 @@
 from build_tools.loggers_configurator import load_loggers
+from weconnect_id.tools.logger import start_data_logger, stop_data_logger, flush_data_logger
+from weconnect_id.tools.log_retention import DataLogRetention
+from weconnect_id.tools.parquet_export import DataLogExporter
 from weconnect_id.tools.vehicle_loader import WeConnectVehicleLoader
 import secret_items
 import os
@@ -26,6 +29,13 @@ except FileNotFoundError as e:
 
 
 load_loggers(config)
+start_data_logger(config)
+data_log_exporter = DataLogExporter.from_config(config)
+if data_log_exporter is not None:
+    data_log_exporter.start()
+data_log_retention = DataLogRetention.from_config(config, data_log_exporter=data_log_exporter)
+if data_log_retention is not None:
+    data_log_retention.start()
 
 
 from time import sleep
@@ -37,6 +47,11 @@ import RPi.GPIO as GPIO
 from display.custom_scenes.vehicle_selection_scene import VehicleSelectionScene
 from display.custom_scenes.options_menu_scene import OptionsMenuScene
 from electricity_price.spot_price_provider import SpotPriceProvider
+from electricity_price.price_sources import RetryPolicy, create_price_source
+from electricity_price.cheapest_window import CheapestWindows
+from weconnect_id.tools.charging_sessions import ChargingSessionTracker
+from weconnect_id.tools.battery_capacity import BatteryCapacityEstimator
+from weconnect_id.tools.charging_curves import ChargeTimeEstimator
 from build_tools.scene_builder import SceneBuilder
 
 
@@ -73,6 +88,7 @@ sleep(2)
 
 lcd_controller.display_message("Initializing Updater")
 weconnect_updater = WeConnectUpdater(weconnect=weconnect, config=config)
+weconnect_updater.add_update_callback(id="DATA_LOGGER_FLUSH", function=flush_data_logger)
 
 selected_vin = config["selected vehicle vin"]
 if selected_vin != "none":
@@ -83,7 +99,29 @@ else:
     lcd_controller.display_message(message="No Vehicle Selected")
 sleep(2)
 
-spot_price_provider = SpotPriceProvider(lcd_scene_controller=lcd_scene_controller)
+spot_price_provider = SpotPriceProvider(
+    lcd_scene_controller=lcd_scene_controller,
+    cache_path=config["paths"].get(
+        "spot prices", os.path.join(os.path.dirname(config["paths"]["data_logs"]), "spot_prices")
+    ),
+    price_source=create_price_source(config),
+    retry_policy=RetryPolicy.from_config(config),
+)
+cheapest_windows = CheapestWindows.from_config(
+    config=config,
+    spot_price_provider=spot_price_provider,
+    lcd_scene_controller=lcd_scene_controller,
+)
+charging_session_tracker = ChargingSessionTracker.from_config(
+    config=config,
+    spot_price_provider=spot_price_provider,
+    weconnect_updater=weconnect_updater,
+)
+battery_capacity_estimator = BatteryCapacityEstimator.from_config(
+    config=config,
+    charging_session_tracker=charging_session_tracker,
+)
+charge_time_estimator = ChargeTimeEstimator.from_config(config=config, weconnect_updater=weconnect_updater)
 
 lcd_controller.display_message("Initializing Buttons")
 button_up = PushButton(
@@ -116,6 +154,8 @@ scene_builder = SceneBuilder(
     weconnect_updater=weconnect_updater,
     lcd_scene_controller=lcd_scene_controller,
     spot_price_provider=spot_price_provider,
+    cheapest_windows=cheapest_windows,
+    charging_session_tracker=charging_session_tracker,
 )
 
 weconnect_vehicle_loader = WeConnectVehicleLoader(
@@ -123,6 +163,11 @@ weconnect_vehicle_loader = WeConnectVehicleLoader(
     lcd_scene_controller=lcd_scene_controller,
     weconnect_updater=weconnect_updater,
     scene_builder=scene_builder,
+    cheapest_windows=cheapest_windows,
+    spot_price_provider=spot_price_provider,
+    charging_session_tracker=charging_session_tracker,
+    battery_capacity_estimator=battery_capacity_estimator,
+    charge_time_estimator=charge_time_estimator,
 )
 
 vehicle_selection_scene = VehicleSelectionScene(
@@ -161,6 +206,18 @@ else:
 stop_event.wait()
 
 lcd_controller.display_message("Exiting...")
+spot_price_provider.stop()
+if charging_session_tracker is not None:
+    charging_session_tracker.stop()
+if charge_time_estimator is not None:
+    charge_time_estimator.stop()
+if data_log_retention is not None:
+    data_log_retention.stop()
+if data_log_exporter is not None:
+    data_log_exporter.stop()
+if weconnect_vehicle_loader.selected_vehicle is not None:
+    weconnect_vehicle_loader.selected_vehicle.close_event_journal()
+stop_data_logger()
 lcd_controller.backlight_off()
 
 os._exit(0)
@@ -0,0 +1,183 @@
+from threading import Lock
+import sys
+import types
+
+
+class SimulatedCharLCD:
+    def __init__(self, cols: int = 20, rows: int = 4, **kwargs) -> None:
+        '''
+        Replaces RPLCD.i2c.CharLCD. Keeps the screen content in a framebuffer and counts the writes,
+        so the user interface can be driven and measured without LCD screen.
+
+        Args:
+            cols (int, optional): Character count on each line. Defaults to 20.
+            rows (int, optional): Line count. Defaults to 4.
+        '''
+
+        self.__cols = cols
+        self.__rows = rows
+        self.__lock = Lock()
+        self.__cursor = (0, 0)
+        self.__framebuffer = [[" "] * cols for _ in range(rows)]
+        self.__custom_characters = {}
+        self.backlight_enabled = True
+        self.writes = 0
+        self.characters_written = 0
+
+    @property
+    def cursor_pos(self) -> tuple:
+        return self.__cursor
+
+    @cursor_pos.setter
+    def cursor_pos(self, position: tuple) -> None:
+        self.__cursor = tuple(position)
+
+    def write_string(self, value: str) -> None:
+        with self.__lock:
+            row, col = self.__cursor
+            for character in value:
+                if character == "\n":
+                    row, col = (row + 1) % self.__rows, 0
+                    continue
+                if character == "\r":
+                    col = 0
+                    continue
+                self.__framebuffer[row][col] = character
+                col += 1
+                if col == self.__cols:
+                    row, col = (row + 1) % self.__rows, 0
+            self.__cursor = (row, col)
+            self.writes += 1
+            self.characters_written += len(value)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__framebuffer = [[" "] * self.__cols for _ in range(self.__rows)]
+            self.__cursor = (0, 0)
+            self.writes += 1
+
+    def create_char(self, location: int, bitmap: list) -> None:
+        self.__custom_characters[location] = tuple(bitmap)
+
+    def close(self, clear: bool = False) -> None:
+        if clear:
+            self.clear()
+
+    @property
+    def content(self) -> list:
+        with self.__lock:
+            return ["".join(line) for line in self.__framebuffer]
+
+
+class SimulatedGPIO(types.ModuleType):
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self) -> None:
+        '''
+        Replaces RPi.GPIO module. Keeps the pin states in memory and counts the output changes.
+        '''
+
+        super().__init__("RPi.GPIO")
+        self.__lock = Lock()
+        self.pins = {}
+        self.toggles = {}
+        self.event_callbacks = {}
+
+    def setmode(self, mode: int) -> None:
+        pass
+
+    def setwarnings(self, enabled: bool) -> None:
+        pass
+
+    def setup(self, pin: int, direction: int, pull_up_down: int = None, initial: int = None) -> None:
+        with self.__lock:
+            self.pins.setdefault(pin, self.LOW if initial is None else initial)
+            self.toggles.setdefault(pin, 0)
+
+    def output(self, pin: int, state: int) -> None:
+        with self.__lock:
+            if self.pins.get(pin) != state:
+                self.toggles[pin] = self.toggles.get(pin, 0) + 1
+            self.pins[pin] = state
+
+    def input(self, pin: int) -> int:
+        return self.pins.get(pin, self.LOW)
+
+    def add_event_detect(self, pin: int, edge: int, callback: callable = None, bouncetime: int = None) -> None:
+        self.event_callbacks[pin] = callback
+
+    def remove_event_detect(self, pin: int) -> None:
+        self.event_callbacks.pop(pin, None)
+
+    def cleanup(self, pins=None) -> None:
+        with self.__lock:
+            self.pins.clear()
+
+    @property
+    def total_toggles(self) -> int:
+        return sum(self.toggles.values())
+
+
+class SimulatedHardware:
+    def __init__(self) -> None:
+        '''
+        Holds the simulated hardware backends created after install_simulated_hardware.
+        '''
+
+        self.gpio = SimulatedGPIO()
+        self.lcds = []
+
+    def create_lcd(self, *args, **kwargs) -> SimulatedCharLCD:
+        lcd = SimulatedCharLCD(
+            cols=kwargs.get("cols", 20),
+            rows=kwargs.get("rows", 4),
+        )
+        self.lcds.append(lcd)
+        return lcd
+
+    @property
+    def lcd_writes(self) -> int:
+        return sum(lcd.writes for lcd in self.lcds)
+
+
+_hardware = None
+
+
+def install_simulated_hardware() -> SimulatedHardware:
+    '''
+    Installs simulated RPi.GPIO and RPLCD.i2c modules. Has to be called before the modules
+    using the hardware (display, led and button) are imported.
+
+    Returns:
+        SimulatedHardware: Simulated hardware backends.
+    '''
+
+    global _hardware
+    if _hardware is not None:
+        return _hardware
+
+    _hardware = SimulatedHardware()
+
+    rpi = types.ModuleType("RPi")
+    rpi.GPIO = _hardware.gpio
+    rplcd = types.ModuleType("RPLCD")
+    rplcd_i2c = types.ModuleType("RPLCD.i2c")
+    rplcd_i2c.CharLCD = _hardware.create_lcd
+    rplcd.i2c = rplcd_i2c
+
+    sys.modules["RPi"] = rpi
+    sys.modules["RPi.GPIO"] = _hardware.gpio
+    sys.modules["RPLCD"] = rplcd
+    sys.modules["RPLCD.i2c"] = rplcd_i2c
+    return _hardware
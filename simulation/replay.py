@@ -0,0 +1,368 @@
+from simulation.hardware import install_simulated_hardware
+
+HARDWARE = install_simulated_hardware()
+
+from display.lcd_scene_controller import LCDSceneController  # noqa: E402
+from display.lcd_item import LCDItem  # noqa: E402
+from display.weconnect_lcd_message import configure_auto_messages  # noqa: E402
+from build_tools.scene_builder import SceneBuilder  # noqa: E402
+from led.led_driver import load_automated_leds  # noqa: E402
+from weconnect_id.vehicle import WeConnectVehicle  # noqa: E402
+from weconnect_id.tools.event_journal import EventJournalReader, JournalEntry  # noqa: E402
+from weconnect_id.tools.logger import start_data_logger, stop_data_logger  # noqa: E402
+from simulation.vehicle import SimulatedVehicle, EnumResolver, apply_event  # noqa: E402
+from datetime import datetime  # noqa: E402
+from pathlib import Path  # noqa: E402
+import argparse  # noqa: E402
+import copy  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+
+
+LOG = logging.getLogger("replay")
+
+
+class ReplayError(Exception):
+    pass
+
+
+class SimulatedUpdater:
+    def __init__(self) -> None:
+        '''
+        Stands in for the WeConnectUpdater during replay. Update cycles are driven by the ReplayHarness
+        instead of a scheduler, and the update callbacks are run at the end of each replayed cycle.
+        '''
+
+        self.__update_callbacks = {}
+        self.__domains = []
+
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        self.__update_callbacks[id] = {
+            "id": id,
+            "function": function,
+            "args": [] if args is None else args,
+        }
+
+    def remove_update_callback(self, id: str) -> None:
+        self.__update_callbacks.pop(id, None)
+
+    def add_scheduler(self, id: str, domains: list, interval: int, silent: bool, run_immediately: bool = True) -> None:
+        pass
+
+    def remove_scheduler(self, id: str) -> None:
+        pass
+
+    def set_domains(self, domains: list) -> None:
+        self.__domains = list(domains)
+
+    def update(self, domains: list = None, silent: bool = False, job_id: str = None) -> None:
+        for callback in list(self.__update_callbacks.values()):
+            try:
+                callback["function"](*callback["args"])
+            except Exception as e:
+                LOG.exception(e)
+
+    @property
+    def domains(self) -> list:
+        return self.__domains
+
+
+class SimulatedSpotPriceProvider:
+    def __init__(self) -> None:
+        '''
+        Stands in for the SpotPriceProvider during replay so no prices are fetched from the network.
+        '''
+
+        self.__price_now_item = LCDItem(
+            title="Hinta Nyt",
+            id="ITEM_SPOT_PRICE_NOW",
+            content_centering=False,
+            second_title="-C/kWh",
+        )
+        self.__graph_item = LCDItem(title="Hintakäyrä", id="ITEM_SPOT_PRICE_GRAPH")
+
+    @property
+    def price_now_item(self) -> LCDItem:
+        return self.__price_now_item
+
+    @property
+    def graph_item(self) -> LCDItem:
+        return self.__graph_item
+
+
+def _percentile(values: list, percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ReplayHarness:
+    def __init__(
+        self,
+        journal_path: str,
+        config: dict,
+        start: float = None,
+        end: float = None,
+        cycle_gap: float = 10,
+    ) -> None:
+        '''
+        Feeds update stream recorded by the VehicleEventJournal into real WeConnectVehicle, LCDScenes,
+        LCDStatusBar, LEDTriggers and WeConnectLCDMessages running on simulated hardware.
+
+        Events closer than cycle_gap seconds to each other are applied as one update cycle,
+        after which the update callbacks are run like after a real WeConnectUpdater update.
+
+        Args:
+            journal_path (str): Path of the vehicle event journal.
+            config (dict): App configuration. Data logging and the event journal are disabled for the replay.
+            start (float, optional): POSIX timestamp where the replay starts. Defaults to the start of the journal.
+            end (float, optional): POSIX timestamp where the replay ends. Defaults to the end of the journal.
+            cycle_gap (float, optional): Max time in seconds between events of one update cycle. Defaults to 10.
+        '''
+
+        self.__reader = EventJournalReader(journal_path)
+        self.__start = start
+        self.__end = end
+        self.__cycle_gap = cycle_gap
+        self.__enum_resolver = EnumResolver()
+        self.__temporary_directory = tempfile.TemporaryDirectory(prefix="weconnect_replay_")
+        self.__config = self.__replay_config(config)
+        self.__cycles = None
+
+        self.__load_cycles()
+        self.__build_app()
+
+    def __replay_config(self, config: dict) -> dict:
+        config = copy.deepcopy(config)
+        config["log data"] = []
+        config["paths"]["data_logs"] = self.__temporary_directory.name
+        config["paths"]["config"] = str(Path(self.__temporary_directory.name) / "config.json")
+        data_logger_config = config.setdefault("data logger", {})
+        data_logger_config["event journal"] = {"enabled": False}
+        data_logger_config["telemetry ring"] = {"enabled": False}
+        data_logger_config["retention"] = {"enabled": False}
+        return config
+
+    def __load_cycles(self) -> None:
+        self.__cycles = []
+        cycle = []
+        previous = None
+        for event in self.__reader.events(start=self.__start, end=self.__end):
+            if previous is not None and event[0] - previous > self.__cycle_gap:
+                self.__cycles.append(cycle)
+                cycle = []
+            cycle.append(event)
+            previous = event[0]
+        if cycle:
+            self.__cycles.append(cycle)
+        if not self.__cycles:
+            raise ReplayError("No events to replay in the given time range")
+
+        first_timestamp = self.__cycles[0][0][0]
+        self.__initial_state = self.__reader.state_at(first_timestamp - 1e-6)
+        for timestamp, address, value, flags in self.__cycles[0]:
+            self.__initial_state.setdefault(address, JournalEntry(value, timestamp, flags))
+
+    def __build_app(self) -> None:
+        vin = self.__get_vin()
+        self.__vehicle = SimulatedVehicle(
+            vin=vin, state=self.__initial_state, enum_resolver=self.__enum_resolver
+        )
+
+        start_data_logger(self.__config)
+        self.__lcd_scene_controller = LCDSceneController()
+        self.__lcd_controller = self.__lcd_scene_controller.lcd_controller
+        self.__updater = SimulatedUpdater()
+        self.__weconnect_vehicle = WeConnectVehicle(vehicle=self.__vehicle, config=self.__config)
+        self.__updater.set_domains(self.__weconnect_vehicle.domains)
+        self.__updater.add_update_callback(
+            id="VEHICLE_SNAPSHOT", function=self.__weconnect_vehicle.publish_snapshot
+        )
+        self.__updater.add_update_callback(
+            id="DATA_LOG_HEARTBEAT", function=self.__weconnect_vehicle.log_heartbeats
+        )
+
+        scene_builder = SceneBuilder(
+            config=self.__config,
+            weconnect_updater=self.__updater,
+            lcd_scene_controller=self.__lcd_scene_controller,
+            spot_price_provider=SimulatedSpotPriceProvider(),
+        )
+        scene_builder.load_scenes(weconnect_vehicle=self.__weconnect_vehicle)
+        load_automated_leds(config=self.__config, weconnect_vehicle=self.__weconnect_vehicle)
+        configure_auto_messages(self.__config, self.__weconnect_vehicle, self.__lcd_controller)
+        self.__lcd_scene_controller.home()
+        self.__updater.update()
+
+    def __get_vin(self) -> str:
+        for address in self.__initial_state:
+            parts = address.split("/")
+            if len(parts) > 3 and parts[1] == "vehicles":
+                return parts[2]
+        raise ReplayError("Journal doesn't contain vehicle addresses")
+
+    def run(self, speed: float = 500) -> dict:
+        '''
+        Replays the update cycles.
+
+        Only the update cycles follow the replay speed. Timers started by the user interface, such as
+        LCD backlight and message timeouts and LED blinking, still run in real time,
+        so at high speeds they fire many replayed cycles late or only after the replay has ended.
+
+        Args:
+            speed (float, optional): Replay speed as multiple of real time. If 0, cycles are replayed as fast as possible.
+                Defaults to 500.
+
+        Returns:
+            dict: Replay report with the CPU time used per update cycle.
+        '''
+
+        first_timestamp = self.__cycles[0][0][0]
+        cpu_times = []
+        events = 0
+        skipped = 0
+        lcd_writes = HARDWARE.lcd_writes
+        gpio_toggles = HARDWARE.gpio.total_toggles
+        wall_start = time.monotonic()
+
+        for cycle in self.__cycles:
+            if speed > 0:
+                delay = (cycle[0][0] - first_timestamp) / speed - (time.monotonic() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            cpu_start = time.process_time()
+            for _, address, value, flags in cycle:
+                element = self.__vehicle.get_element(address)
+                if element is None:
+                    skipped += 1
+                    continue
+                apply_event(element, self.__enum_resolver.resolve(value), flags)
+                events += 1
+            self.__updater.update()
+            cpu_times.append((time.process_time() - cpu_start) * 1000)
+
+        wall_time = time.monotonic() - wall_start
+        return {
+            "cycles": len(self.__cycles),
+            "events": events,
+            "skipped events": skipped,
+            "recorded seconds": round(self.__cycles[-1][-1][0] - first_timestamp, 3),
+            "wall seconds": round(wall_time, 3),
+            "speed": speed,
+            "cpu ms per cycle": {
+                "mean": round(sum(cpu_times) / len(cpu_times), 4),
+                "p50": round(_percentile(cpu_times, 50), 4),
+                "p95": round(_percentile(cpu_times, 95), 4),
+                "max": round(max(cpu_times), 4),
+            },
+            "cpu us per event": round(sum(cpu_times) * 1000 / events, 2) if events else None,
+            "lcd writes": HARDWARE.lcd_writes - lcd_writes,
+            "gpio toggles": HARDWARE.gpio.total_toggles - gpio_toggles,
+        }
+
+    def close(self) -> None:
+        self.__weconnect_vehicle.close_event_journal()
+        stop_data_logger()
+        self.__temporary_directory.cleanup()
+
+    @property
+    def screen(self) -> list:
+        return HARDWARE.lcds[0].content if HARDWARE.lcds else []
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float) -> list:
+    '''
+    Compares CPU times of the replay report against baseline report.
+
+    Args:
+        report (dict): Report of the current replay.
+        baseline (dict): Report saved from earlier replay.
+        tolerance (float): Allowed slowdown as fraction of the baseline value.
+
+    Returns:
+        list: Descriptions of the regressed metrics. Empty if nothing regressed.
+    '''
+
+    regressions = []
+    for metric in ("mean", "p95"):
+        current = report["cpu ms per cycle"][metric]
+        previous = baseline["cpu ms per cycle"][metric]
+        if previous > 0 and current > previous * (1 + tolerance):
+            regressions.append(
+                f"{metric} cpu time per cycle {current} ms exceeds baseline {previous} ms by more than {tolerance:.0%}"
+            )
+    return regressions
+
+
+def _parse_time(value: str) -> float:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded vehicle event journal through the user interface on simulated hardware",
+        epilog="Only the update cycles follow --speed. Timers of the user interface, such as backlight and message "
+        "timeouts and LED blinking, run in real time.",
+    )
+    parser.add_argument("journal", help="Path of the vehicle event journal")
+    parser.add_argument("--config", required=True, help="Path of the app configuration file")
+    parser.add_argument("--speed", type=float, default=500, help="Replay speed as multiple of real time, 0 for max speed")
+    parser.add_argument("--start", help="Start time in ISO 8601 format")
+    parser.add_argument("--end", help="End time in ISO 8601 format")
+    parser.add_argument("--cycle-gap", type=float, default=10, help="Max seconds between events of one update cycle")
+    parser.add_argument("--report", help="Write the report as JSON into this file")
+    parser.add_argument("--baseline", help="Compare against report written by earlier replay")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown compared to the baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show the app logs")
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if arguments.verbose else logging.WARNING)
+
+    with open(arguments.config, "r") as config_file:
+        config = json.load(config_file)
+
+    harness = ReplayHarness(
+        journal_path=arguments.journal,
+        config=config,
+        start=_parse_time(arguments.start),
+        end=_parse_time(arguments.end),
+        cycle_gap=arguments.cycle_gap,
+    )
+    try:
+        report = harness.run(speed=arguments.speed)
+        screen = harness.screen
+    finally:
+        harness.close()
+
+    print(json.dumps(report, indent=4))
+    print("\n".join(screen))
+
+    if arguments.report is not None:
+        with open(arguments.report, "w") as report_file:
+            json.dump(report, report_file, indent=4)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_reports(report, baseline, arguments.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.stdout.flush()
+    # Timers started by the replayed user interface are not daemon threads and would keep the process alive.
+    os._exit(exit_code)
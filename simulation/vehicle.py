@@ -0,0 +1,167 @@
+from enum import Enum
+from weconnect.addressable import AddressableObject, AddressableAttribute, AddressableLeaf
+from weconnect_id.data_providers.data_property_catalog import DATA_PROPERTY_CATALOG
+from weconnect_id.tools.event_journal import EnumValue
+import importlib
+import logging
+
+
+LOG = logging.getLogger("replay")
+
+
+class SimulatedDevicePlatform(Enum):
+    WCAR = "WCAR"
+
+
+class EnumResolver:
+    def __init__(self) -> None:
+        '''
+        Turns EnumValues read from the event journal back into the enum members used by the WeConnect-API.
+        '''
+
+        self.__types = {}
+
+    def resolve(self, value):
+        if not isinstance(value, EnumValue):
+            return value
+        enum_type = self.__get_type(value.type)
+        if enum_type is None:
+            return value.value
+        try:
+            return enum_type(value.value)
+        except ValueError:
+            LOG.warning(f"Value {value.value} is not a member of enum (Type: {value.type})")
+            return value.value
+
+    def __get_type(self, type_name: str):
+        if type_name in self.__types:
+            return self.__types[type_name]
+
+        enum_type = None
+        if ":" in type_name:
+            module_name, qualified_name = type_name.split(":", 1)
+            try:
+                enum_type = importlib.import_module(module_name)
+                for name in qualified_name.split("."):
+                    enum_type = getattr(enum_type, name)
+            except (ImportError, AttributeError):
+                enum_type = None
+        if enum_type is None:
+            LOG.warning(f"Could not resolve enum (Type: {type_name}), using raw values")
+        self.__types[type_name] = enum_type
+        return enum_type
+
+
+class SimulatedVehicle(AddressableObject):
+    def __init__(self, vin: str, state: dict, enum_resolver: EnumResolver, nickname: str = None) -> None:
+        '''
+        Stands in for the WeConnect-API Vehicle during replay. Contains the WeConnect-API elements
+        referenced by the data property catalog with their addresses matching the real API, so the
+        recorded events can be applied to the same addresses they were recorded from.
+
+        Args:
+            vin (str): VIN of the recorded vehicle.
+            state (dict): JournalEntries by address used as the initial values.
+            enum_resolver (EnumResolver): Used to turn the recorded enum values back into enums.
+            nickname (str, optional): Nickname of the vehicle. Defaults to the VIN.
+        '''
+
+        self.__root = AddressableObject(localAddress="", parent=None)
+        self.__vehicles = AddressableObject(localAddress="vehicles", parent=self.__root)
+        super().__init__(localAddress=vin, parent=self.__vehicles)
+        self.vin = vin
+        self.nickname = vin if nickname is None else nickname
+        self.model = "Replay"
+        self.brandCode = "V"
+        self.devicePlatform = AddressableAttribute(
+            localAddress="devicePlatform",
+            parent=self,
+            value=SimulatedDevicePlatform.WCAR,
+            valueType=SimulatedDevicePlatform,
+        )
+        self.domains = {}
+        self.__domains_object = AddressableObject(localAddress="domains", parent=self)
+        self.__objects = {}
+        self.__elements = {}
+        self.__build_elements(state, enum_resolver)
+
+    def __build_elements(self, state: dict, enum_resolver: EnumResolver) -> None:
+        for entry in DATA_PROPERTY_CATALOG:
+            address = self.get_address(entry["domain"].value, entry["path"])
+            if address in self.__elements or address not in state:
+                continue
+
+            parent = self.__get_object(entry["domain"].value, entry["path"][:-1])
+            element = AddressableAttribute(
+                localAddress=entry["path"][-1],
+                parent=parent,
+                value=enum_resolver.resolve(state[address].value),
+                valueType=object,
+            )
+            setattr(parent, entry["path"][-1], element)
+            self.__elements[address] = element
+
+    def __get_object(self, domain: str, path: tuple) -> AddressableObject:
+        key = (domain,) + tuple(path)
+        if key in self.__objects:
+            return self.__objects[key]
+
+        if len(path) == 1:
+            domain_object = self.__get_domain_object(domain)
+            element = AddressableObject(localAddress=path[0], parent=domain_object)
+            self.domains.setdefault(domain, {})[path[0]] = element
+        else:
+            parent = self.__get_object(domain, path[:-1])
+            element = AddressableObject(localAddress=path[-1], parent=parent)
+            setattr(parent, path[-1], element)
+        self.__objects[key] = element
+        return element
+
+    def __get_domain_object(self, domain: str) -> AddressableObject:
+        key = (domain,)
+        if key not in self.__objects:
+            self.__objects[key] = AddressableObject(localAddress=domain, parent=self.__domains_object)
+        return self.__objects[key]
+
+    def get_address(self, domain: str, path: tuple) -> str:
+        return f"/vehicles/{self.vin}/domains/{domain}/{'/'.join(path)}"
+
+    def get_element(self, address: str) -> AddressableAttribute:
+        '''
+        Finds the WeConnect-API element for the recorded address.
+
+        Args:
+            address (str): Address of the recorded event.
+
+        Returns:
+            AddressableAttribute: The element or None if the address isn't used by the data property catalog.
+        '''
+
+        return self.__elements.get(address)
+
+    def enableTracker(self) -> None:
+        pass
+
+    def disableTracker(self) -> None:
+        pass
+
+    @property
+    def elements(self) -> dict:
+        return self.__elements
+
+
+def apply_event(element: AddressableAttribute, value, flags: int) -> None:
+    '''
+    Applies recorded event to the WeConnect-API element so the observers are notified the same way as during the recording.
+
+    Args:
+        element (AddressableAttribute): Element the event was recorded from.
+        value: Recorded value with the enums already resolved.
+        flags (int): Recorded AddressableLeaf.ObserverEvent flags.
+    '''
+
+    flags = AddressableLeaf.ObserverEvent(flags)
+    if flags & AddressableLeaf.ObserverEvent.DISABLED:
+        element.enabled = False
+        return
+    element.setValueWithCarTime(value, fromServer=True)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from weconnect_id.tools.battery_capacity import BatteryCapacityEstimator
+import json
+import pytest
+
+
+class FakeVehicle:
+    def __init__(self, vin: str) -> None:
+        self.vin = vin
+
+    def add_external_data_property(self, data_property) -> None:
+        pass
+
+    def get_data_property(self, data_id: str):
+        raise KeyError(data_id)
+
+
+def create_session(vin: str, capacity: float, soc_delta: float, day: int) -> dict:
+    end = datetime(2026, 1, 1).astimezone() + timedelta(days=day)
+    return {
+        "vin": vin,
+        "start": (end - timedelta(hours=3)).isoformat(timespec="seconds"),
+        "end": end.isoformat(timespec="seconds"),
+        "start_level": 20,
+        "end_level": 20 + soc_delta,
+        "energy_kwh": capacity * soc_delta / 100,
+    }
+
+
+def test_capacity_is_fitted_from_sessions_of_selected_vehicle(tmp_path):
+    sessions_path = tmp_path / "charging_sessions.jsonl"
+    sessions = [create_session("SMALL", 58, 20 + day, day) for day in range(4)]
+    sessions += [create_session("LARGE", 77, 30 + day, day) for day in range(4)]
+    sessions_path.write_text("".join(json.dumps(session) + "\n" for session in sessions))
+    estimator = BatteryCapacityEstimator(sessions_path=sessions_path)
+
+    estimator.set_vehicle(FakeVehicle("SMALL"))
+    assert estimator.estimate.sessions == 4
+    assert estimator.capacity == pytest.approx(58)
+
+    estimator.set_vehicle(FakeVehicle("LARGE"))
+    assert estimator.estimate.sessions == 4
+    assert estimator.capacity == pytest.approx(77)
+
+    # Sessions of other vehicles are kept for later but don't change the estimate
+    estimator.add_session(create_session("SMALL", 58, 40, 5))
+    assert estimator.estimate.sessions == 4
+    estimator.set_vehicle(FakeVehicle("SMALL"))
+    assert estimator.estimate.sessions == 5
+
+
+def test_interrupted_sessions_are_ignored(tmp_path):
+    estimator = BatteryCapacityEstimator(sessions_path=tmp_path / "charging_sessions.jsonl")
+    estimator.set_vehicle(FakeVehicle("SMALL"))
+
+    estimator.add_session(dict(create_session("SMALL", 58, 30, 0), interrupted=True))
+    assert estimator.estimate.sessions == 0
+    estimator.add_session(dict(create_session("SMALL", 58, 30, 0), interrupted=False))
+    assert estimator.estimate.sessions == 1
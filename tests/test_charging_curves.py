@@ -0,0 +1,73 @@
+from weconnect.elements.charging_status import ChargingStatus
+from weconnect_id.tools.charging_curves import ChargeTimeEstimator, ChargingCurveModel
+from types import SimpleNamespace
+import pytest
+
+AC = ChargingStatus.ChargeType.AC
+
+
+def test_sample_without_temperature_is_learned_only_into_merged_curve():
+    model = ChargingCurveModel(temperature_edges=(0, 10, 20, 30), default_power={"ac": 11})
+    model.add_sample(AC, 5, 50, 5.0)
+    model.add_sample(AC, None, 50, 2.0)
+
+    # Cold bucket learned only its own sample
+    assert model.get_charging_hours(AC, 5, 50, 51, 100) == pytest.approx(1 / 5.0)
+    # Middle bucket has no samples and falls back to the merged curve
+    middle = model.get_charging_hours(AC, 15, 50, 51, 100)
+    merged = model.get_charging_hours(AC, None, 50, 51, 100)
+    assert middle == pytest.approx(merged)
+    assert merged == pytest.approx(1 / 3.5)
+
+
+def test_saved_curves_are_loaded():
+    model = ChargingCurveModel()
+    model.add_sample(AC, None, 40, 7.0)
+    model.add_sample(AC, 25, 60, 9.0)
+    loaded = ChargingCurveModel()
+    assert loaded.load_dict(model.to_dict())
+    assert loaded.samples == 2
+    assert loaded.get_charging_hours(AC, None, 40, 80, 58) == pytest.approx(
+        model.get_charging_hours(AC, None, 40, 80, 58)
+    )
+
+
+class FakeUpdater:
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        pass
+
+
+class FakeVehicle:
+    def __init__(self, values: dict) -> None:
+        self.data_properties = {
+            data_id: SimpleNamespace(value=value) for data_id, value in values.items()
+        }
+
+    def get_data_property(self, data_id: str):
+        return self.data_properties[data_id]
+
+    def add_external_data_property(self, data_property) -> None:
+        pass
+
+
+def test_unchanged_values_are_learned_once(tmp_path):
+    estimator = ChargeTimeEstimator(path=tmp_path / "curves.json", weconnect_updater=FakeUpdater(), interval=3600)
+    vehicle = FakeVehicle(
+        {
+            "batteryLevel": 50,
+            "targetBatteryLevel": 80,
+            "chargePower": 11.0,
+            "chargeState": ChargingStatus.ChargingState.CHARGING,
+            "chargeType": AC,
+        }
+    )
+    estimator.set_vehicle(vehicle)
+
+    estimator.update()
+    estimator.update()
+    assert estimator.model.samples == 1
+
+    vehicle.data_properties["batteryLevel"].value = 51
+    estimator.update()
+    assert estimator.model.samples == 2
+    estimator.stop()
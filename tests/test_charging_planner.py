@@ -0,0 +1,162 @@
+from datetime import datetime, time, timedelta
+from electricity_price.price_model import SpotPriceModel
+from weconnect.elements.charging_status import ChargingStatus
+from weconnect.elements.control_operation import ControlOperation
+from weconnect.elements.enums import MaximumChargeCurrent
+from weconnect.elements.plug_status import PlugStatus
+from weconnect_id.controllers import charging_planner
+from weconnect_id.controllers.charging_planner import ChargingPlanner, plan_charging
+from weconnect_id.data_providers.vehicle_snapshot import WeConnectVehicleSnapshot
+from types import SimpleNamespace
+import pytest
+
+NOW = datetime(2026, 1, 10, 18, 30).astimezone()
+MODEL_START = datetime(2026, 1, 10, 18).astimezone()
+DEPARTURE = datetime(2026, 1, 11, 7).astimezone()
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+class ChargingControl:
+    def __init__(self) -> None:
+        self.enabled = True
+        self.requests = []
+
+    @property
+    def value(self):
+        return self.requests[-1] if self.requests else None
+
+    @value.setter
+    def value(self, operation: ControlOperation) -> None:
+        self.requests.append(operation)
+
+
+class FakeVehicle:
+    def __init__(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        self.snapshot = snapshot
+        self.nickname = "Test"
+        self.api_vehicle = SimpleNamespace(controls=SimpleNamespace(chargingControl=ChargingControl()))
+
+    def add_snapshot_callback(self, id: str, function: callable, args: list = None) -> None:
+        pass
+
+    def remove_snapshot_callback(self, id: str) -> None:
+        pass
+
+
+class FakeSpotPriceProvider:
+    def __init__(self, model: SpotPriceModel) -> None:
+        self.model = model
+
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        pass
+
+    def remove_update_callback(self, id: str) -> None:
+        pass
+
+
+def create_model(prices: list) -> SpotPriceModel:
+    return SpotPriceModel(MODEL_START.timestamp(), 3600, prices)
+
+
+def create_snapshot(**changes) -> WeConnectVehicleSnapshot:
+    values = {
+        "batteryLevel": 70,
+        "targetBatteryLevel": 80,
+        "batteryCharge": None,
+        "chargePower": 0.0,
+        "chargeType": ChargingStatus.ChargeType.INVALID,
+        "maxACChargeCurrent": MaximumChargeCurrent.MAXIMUM,
+        "chargeState": ChargingStatus.ChargingState.READY_FOR_CHARGING,
+        "chargingPlugConnectionStatus": PlugStatus.PlugConnectionState.CONNECTED,
+    }
+    values.update(changes)
+    return WeConnectVehicleSnapshot(version=1, values=values, changed_ids=frozenset(values), time=NOW)
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(charging_planner, "datetime", FrozenDatetime)
+
+
+def create_planner(prices: list, **changes) -> tuple:
+    vehicle = FakeVehicle(create_snapshot(**changes))
+    planner = ChargingPlanner(
+        weconnect_vehicle=vehicle,
+        spot_price_provider=FakeSpotPriceProvider(create_model(prices)),
+        departure_time=time(7),
+        battery_capacity=58,
+    )
+    return planner, vehicle, vehicle.api_vehicle.controls.chargingControl
+
+
+def test_plan_picks_cheapest_slots_before_departure():
+    prices = [10.0] * 24
+    prices[3] = 1.0
+    prices[5] = 2.0
+    prices[20] = 0.5
+    plan = plan_charging(create_model(prices), NOW, DEPARTURE, energy=20, power=11)
+
+    assert plan.slots == (MODEL_START + timedelta(hours=3), MODEL_START + timedelta(hours=5))
+    assert plan.departure == DEPARTURE
+
+
+def test_no_plan_nor_requests_when_prices_end_before_departure():
+    planner, _, control = create_planner([1.0] * 6)
+
+    assert plan_charging(create_model([1.0] * 6), NOW, DEPARTURE, energy=5.8, power=11) is None
+    assert planner.plan is None
+    assert control.requests == []
+
+
+def test_no_requests_when_unplugged():
+    planner, _, control = create_planner(
+        [1.0] + [10.0] * 23, chargingPlugConnectionStatus=PlugStatus.PlugConnectionState.DISCONNECTED
+    )
+
+    assert planner.plan.is_charging_slot(NOW)
+    assert control.requests == []
+
+
+def test_plan_is_made_again_when_needed_slots_change():
+    planner, vehicle, _ = create_planner([5.0] * 24)
+    first_plan = planner.plan
+    assert len(first_plan.slots) == 1
+
+    planner.update(create_snapshot(batteryLevel=75))
+    assert planner.plan is first_plan
+
+    planner.update(create_snapshot(batteryLevel=20))
+    assert planner.plan is not first_plan
+    assert len(planner.plan.slots) == 4
+
+
+def test_repeated_requests_are_suppressed_until_timeout(monkeypatch):
+    planner, _, control = create_planner([1.0] + [10.0] * 23)
+    assert control.requests == [ControlOperation.START]
+
+    planner.update()
+    assert control.requests == [ControlOperation.START]
+
+    monkeypatch.setattr(ChargingPlanner, "REQUEST_TIMEOUT", 0)
+    planner.update()
+    assert control.requests == [ControlOperation.START, ControlOperation.START]
+
+
+def test_dc_charge_power_is_not_learned():
+    planner, _, _ = create_planner([5.0] * 24)
+
+    planner.update(
+        create_snapshot(
+            batteryLevel=20,
+            chargePower=120.0,
+            chargeType=ChargingStatus.ChargeType.DC,
+            chargeState=ChargingStatus.ChargingState.CHARGING,
+        )
+    )
+    assert planner.plan.power == 11.0
+    assert len(planner.plan.slots) == 4
@@ -0,0 +1,84 @@
+from electricity_price.price_model import SpotPriceModel
+from weconnect.elements.charging_status import ChargingStatus
+from weconnect.elements.plug_status import PlugStatus
+from weconnect_id.tools.charging_sessions import ChargingSessionTracker
+from types import SimpleNamespace
+import json
+
+VIN = "WVWZZZ1"
+
+
+class FakeUpdater:
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        pass
+
+
+class FakeVehicle:
+    def __init__(self) -> None:
+        self.vin = VIN
+        self.data_properties = {
+            "batteryLevel": SimpleNamespace(value=40),
+            "batteryCharge": SimpleNamespace(value=None),
+            "chargePower": SimpleNamespace(value=11.0),
+            "chargeState": SimpleNamespace(value=ChargingStatus.ChargingState.CHARGING),
+            "chargingPlugConnectionStatus": SimpleNamespace(value=PlugStatus.PlugConnectionState.CONNECTED),
+        }
+
+    def get_data_property(self, data_id: str):
+        return self.data_properties[data_id]
+
+
+def create_tracker(tmp_path) -> ChargingSessionTracker:
+    return ChargingSessionTracker(
+        path=tmp_path / "charging_sessions.jsonl",
+        spot_price_provider=SimpleNamespace(model=SpotPriceModel.empty()),
+        weconnect_updater=FakeUpdater(),
+    )
+
+
+def read_sessions(tmp_path) -> list:
+    path = tmp_path / "charging_sessions.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_ongoing_session_is_resumed_after_restart(tmp_path):
+    vehicle = FakeVehicle()
+    tracker = create_tracker(tmp_path)
+    tracker.set_vehicle(vehicle)
+    tracker.update()
+    tracker.stop()
+    assert read_sessions(tmp_path) == []
+
+    tracker = create_tracker(tmp_path)
+    tracker.set_vehicle(vehicle)
+    assert tracker.session is not None
+    vehicle.data_properties["batteryLevel"].value = 70
+    vehicle.data_properties["chargingPlugConnectionStatus"].value = PlugStatus.PlugConnectionState.DISCONNECTED
+    tracker.update()
+
+    sessions = read_sessions(tmp_path)
+    assert len(sessions) == 1
+    assert sessions[0]["vin"] == VIN
+    assert sessions[0]["start_level"] == 40
+    assert sessions[0]["end_level"] == 70
+    assert sessions[0]["samples"] == 2
+    assert not sessions[0]["interrupted"]
+
+
+def test_stale_session_is_recorded_as_interrupted(tmp_path, monkeypatch):
+    vehicle = FakeVehicle()
+    tracker = create_tracker(tmp_path)
+    tracker.set_vehicle(vehicle)
+    tracker.update()
+    tracker.stop()
+
+    monkeypatch.setattr(ChargingSessionTracker, "RESUME_TIMEOUT", -1)
+    tracker = create_tracker(tmp_path)
+    tracker.set_vehicle(vehicle)
+
+    assert tracker.session is None
+    sessions = read_sessions(tmp_path)
+    assert len(sessions) == 1
+    assert sessions[0]["interrupted"]
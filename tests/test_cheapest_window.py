@@ -0,0 +1,79 @@
+from datetime import datetime, time, timedelta
+from electricity_price.cheapest_window import CheapestWindowTracker, find_cheapest_window
+from electricity_price.price_model import SpotPriceModel
+import math
+
+START = datetime(2026, 1, 10, 18).astimezone()
+
+
+def create_model(prices: list) -> SpotPriceModel:
+    return SpotPriceModel(START.timestamp(), 3600, prices)
+
+
+def hours(*offsets) -> tuple:
+    return tuple(START + timedelta(hours=offset) for offset in offsets)
+
+
+def test_contiguous_window_has_cheapest_sum():
+    model = create_model([5, 1, 9, 2, 3, 4, 5, 5])
+    window = find_cheapest_window(model, timedelta(hours=3), START + timedelta(hours=8), START)
+
+    assert window.slots == hours(3, 4, 5)
+    assert window.start == START + timedelta(hours=3)
+    assert window.end == START + timedelta(hours=6)
+    assert window.average_price == 3
+
+
+def test_non_contiguous_window_has_cheapest_slots():
+    model = create_model([5, 1, 9, 2, 3, 4, 5, 5])
+    window = find_cheapest_window(model, timedelta(hours=3), START + timedelta(hours=8), START, contiguous=False)
+
+    assert window.slots == hours(1, 3, 4)
+    assert window.contains(START + timedelta(hours=1, minutes=30))
+    assert not window.contains(START + timedelta(hours=2, minutes=30))
+
+
+def test_unknown_price_blocks_window():
+    model = create_model([1, 1, math.nan, 1, 4, 4, 4, 4])
+    window = find_cheapest_window(model, timedelta(hours=3), START + timedelta(hours=8), START)
+
+    assert window.slots == hours(3, 4, 5)
+
+    model = create_model([1, math.nan, 1, math.nan, 1, math.nan])
+    assert find_cheapest_window(model, timedelta(hours=2), START + timedelta(hours=6), START) is None
+    assert find_cheapest_window(
+        model, timedelta(hours=4), START + timedelta(hours=6), START, contiguous=False
+    ) is None
+
+
+def test_no_window_when_prices_end_before_deadline():
+    model = create_model([1] * 8)
+
+    assert find_cheapest_window(model, timedelta(hours=1), START + timedelta(hours=9), START) is None
+
+
+def test_window_starts_from_current_slot():
+    model = create_model([1, 1, 3, 3, 3])
+    window = find_cheapest_window(model, timedelta(hours=2), START + timedelta(hours=5), START + timedelta(hours=1, minutes=30))
+
+    assert window.slots == hours(1, 2)
+
+
+def test_tracker_keeps_running_window():
+    tracker = CheapestWindowTracker(
+        id="cheapestWindow", title="Test", duration=timedelta(hours=2), deadline_time=time(2)
+    )
+    tracker.update(create_model([5, 1, 1, 5, 5, 5, 5, 5, 5]), START)
+    assert tracker.window.slots == hours(1, 2)
+
+    now = START + timedelta(hours=1, minutes=10)
+    tracker.update(create_model([5, 1, 1, 5, 0, 0, 5, 5, 5]), now)
+    assert tracker.window.slots == hours(1, 2)
+    assert tracker.data_properties[0].value is True
+
+    # Cheaper window is taken once the running window has ended
+    now = START + timedelta(hours=3, minutes=10)
+    tracker.update(create_model([5, 1, 1, 5, 0, 0, 5, 5, 5]), now)
+    assert tracker.window.slots == hours(4, 5)
+    assert tracker.data_properties[0].value is False
+    assert tracker.data_properties[1].value == f"{START + timedelta(hours=4):%H:%M}"
@@ -0,0 +1,78 @@
+from threading import Event
+from weconnect_id.tools.logger import DataLogRecord, DataLogWriter, WeConnectLoggerError
+import time
+import pytest
+
+
+class RecordingSink:
+    def __init__(self, write_started: Event = None, release: Event = None) -> None:
+        self.records = []
+        self.closed = False
+        self.write_after_close = False
+        self.__write_started = write_started
+        self.__release = release
+
+    def write(self, records: list) -> None:
+        if self.closed:
+            self.write_after_close = True
+        if self.__write_started is not None:
+            self.__write_started.set()
+            self.__release.wait(5)
+        self.records.extend(records)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def create_record(value: int) -> DataLogRecord:
+    return DataLogRecord(id="batteryLevel", category="battery", path="", row=(value,), value=value, timestamp=value)
+
+
+def test_replaced_sink_is_closed_after_its_records():
+    writer = DataLogWriter(backend=RecordingSink(), flush_size=1)
+    old_sink = RecordingSink()
+    new_sink = RecordingSink()
+    writer.add_sink("SINK", old_sink)
+    writer.write(create_record(1))
+    writer.add_sink("SINK", new_sink)
+    writer.write(create_record(2))
+    writer.close()
+
+    assert [record.value for record in old_sink.records] == [1]
+    assert [record.value for record in new_sink.records] == [2]
+    assert old_sink.closed and not old_sink.write_after_close
+    assert new_sink.closed
+
+
+def test_write_does_not_block_when_queue_is_full():
+    write_started = Event()
+    release = Event()
+    writer = DataLogWriter(backend=RecordingSink(write_started, release), queue_size=1, flush_size=1)
+    writer.write(create_record(1))
+    assert write_started.wait(5)
+    writer.write(create_record(2))
+
+    start = time.monotonic()
+    with pytest.raises(WeConnectLoggerError):
+        writer.write(create_record(3))
+    assert time.monotonic() - start < 0.5
+    assert writer.dropped_records == 1
+    release.set()
+    writer.close()
+
+
+class FailingCloseSink(RecordingSink):
+    def close(self) -> None:
+        raise OSError("close failed")
+
+
+def test_failing_close_does_not_skip_other_targets():
+    writer = DataLogWriter(backend=FailingCloseSink())
+    sink = RecordingSink()
+    writer.add_sink("SINK", sink)
+    writer.close()
+
+    assert sink.closed
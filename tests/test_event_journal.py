@@ -0,0 +1,53 @@
+from weconnect.addressable import AddressableAttribute, AddressableLeaf, AddressableObject
+from weconnect_id.tools.event_journal import (
+    INDEX_ENTRY,
+    INDEX_SUFFIX,
+    EventJournalReader,
+    VehicleEventJournal,
+)
+
+
+def create_attribute() -> AddressableAttribute:
+    root = AddressableObject(localAddress="vehicle", parent=None)
+    return AddressableAttribute(localAddress="soc", parent=root, value=50, valueType=int)
+
+
+def test_observed_value_change_is_recorded(tmp_path):
+    path = tmp_path / "vehicle.journal"
+    journal = VehicleEventJournal(path=path)
+    attribute = create_attribute()
+    attribute.addObserver(
+        observer=journal.observe,
+        flag=AddressableLeaf.ObserverEvent.VALUE_CHANGED,
+    )
+
+    attribute.setValueWithCarTime(55)
+    journal.close()
+
+    events = list(EventJournalReader(path).events())
+    assert len(events) == 1
+    timestamp, address, value, flags = events[0]
+    assert address == attribute.getGlobalAddress()
+    assert value == 55
+    assert flags == AddressableLeaf.ObserverEvent.VALUE_CHANGED.value
+
+
+def test_torn_tail_drops_index_entries_past_the_end(tmp_path):
+    path = tmp_path / "vehicle.journal"
+    index_path = tmp_path / ("vehicle.journal" + INDEX_SUFFIX)
+    journal = VehicleEventJournal(path=path)
+    journal.record("vehicle/soc", 50, 0, timestamp=1.0)
+    journal.snapshot()
+    journal.record("vehicle/soc", 60, 0, timestamp=2.0)
+    journal.snapshot()
+    journal.close()
+
+    # Cut the journal in the middle of the second snapshot frame
+    with open(path, "r+b") as file:
+        file.truncate(path.stat().st_size - 3)
+    VehicleEventJournal(path=path).close()
+
+    offsets = [entry[1] for entry in INDEX_ENTRY.iter_unpack(index_path.read_bytes())]
+    assert len(offsets) == 1
+    assert all(offset < path.stat().st_size for offset in offsets)
+    assert EventJournalReader(path).state_at()["vehicle/soc"].value == 60
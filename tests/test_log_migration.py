@@ -0,0 +1,34 @@
+from zoneinfo import ZoneInfo
+from weconnect_id.tools.log_migration import migrate, migrate_file
+import gzip
+
+
+LEGACY_LOG = "value;time;date\n80;12.30:00;01.06.2023\n81;12.45:00;01.06.2023\n"
+
+
+def test_compressed_log_stays_compressed(tmp_path):
+    path = tmp_path / "batteryLevel" / "batteryLevel_2023-06-01.csv.gz"
+    path.parent.mkdir()
+    with gzip.open(path, "wt", newline="") as log_file:
+        log_file.write(LEGACY_LOG)
+
+    assert migrate_file(path, ZoneInfo("Europe/Helsinki"))
+
+    with gzip.open(path, "rt", newline="") as log_file:
+        lines = log_file.read().splitlines()
+    assert lines == [
+        "value;time",
+        "80;2023-06-01T12:30:00+03:00",
+        "81;2023-06-01T12:45:00+03:00",
+    ]
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_migration_is_skipped_for_current_format(tmp_path):
+    path = tmp_path / "batteryLevel" / "batteryLevel.csv"
+    path.parent.mkdir()
+    path.write_text(LEGACY_LOG)
+
+    assert migrate(tmp_path) == 1
+    assert path.read_text().splitlines()[1] == "80;2023-06-01T12:30:00+03:00"
+    assert migrate(tmp_path) == 0
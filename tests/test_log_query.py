@@ -0,0 +1,36 @@
+from datetime import datetime
+from weconnect_id.tools.log_query import DataLogIndex
+
+
+def write_log(path, day: int, values: list) -> list:
+    timestamps = [datetime(2026, 1, day, 10, minute).astimezone() for minute in range(len(values))]
+    path.write_text(
+        "value;time\n"
+        + "".join(f"{value}%;{timestamp.isoformat(timespec='seconds')}\n" for value, timestamp in zip(values, timestamps))
+    )
+    return [timestamp.timestamp() for timestamp in timestamps]
+
+
+def test_index_is_rebuilt_when_grown_file_has_different_start(tmp_path):
+    path = tmp_path / "batteryLevel.csv"
+    write_log(path, 1, [80, 79])
+    DataLogIndex(path)
+
+    # Rotation replaced the file and the new active file grew past the size of the old one
+    timestamps = write_log(path, 2, [50, 51, 52])
+    index = DataLogIndex(path)
+
+    assert index.timestamps.tolist() == timestamps
+    assert [row[0] for row in index.read_rows(0, 3)] == ["50%", "51%", "52%"]
+
+
+def test_index_of_grown_file_is_extended(tmp_path):
+    path = tmp_path / "batteryLevel.csv"
+    timestamps = write_log(path, 1, [80, 79])
+    DataLogIndex(path)
+    with open(path, "a") as file:
+        file.write(f"78%;{datetime(2026, 1, 1, 11).astimezone().isoformat(timespec='seconds')}\n")
+
+    index = DataLogIndex(path)
+
+    assert index.timestamps.tolist() == timestamps + [datetime(2026, 1, 1, 11).astimezone().timestamp()]
@@ -0,0 +1,27 @@
+from weconnect_id.tools.log_retention import raw_columns, read_rollup, reduce_rollup, write_rollup
+import numpy
+import pytest
+
+
+def write_raw(tmp_path, timestamps: list, values: list) -> None:
+    bucket_timestamps, columns = reduce_rollup(
+        numpy.asarray(timestamps, dtype="<f8"), raw_columns(numpy.asarray(values, dtype="<f8")), 300
+    )
+    write_rollup(tmp_path, "5min", "battery/batteryLevel", bucket_timestamps, columns)
+
+
+def test_bucket_split_between_segments_is_merged(tmp_path):
+    start = 1767261600.0
+    # First segment ends and the second one starts in the middle of the second bucket
+    write_raw(tmp_path, [start, start + 300, start + 360], [50, 60, 70])
+    write_raw(tmp_path, [start + 420, start + 600], [40, 80])
+
+    rollup_files = list((tmp_path / "rollups" / "5min" / "battery").glob("*.csv"))
+    assert len(rollup_files) == 1
+    timestamps, columns = read_rollup(rollup_files[0])
+    assert timestamps.tolist() == [start, start + 300, start + 600]
+    assert columns["count"].tolist() == [1, 3, 1]
+    assert columns["min"][1] == 40
+    assert columns["max"][1] == 70
+    assert columns["mean"][1] == pytest.approx(numpy.mean([60, 70, 40]))
+    assert columns["last"][1] == 40
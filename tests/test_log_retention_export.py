@@ -0,0 +1,42 @@
+from datetime import datetime
+from weconnect_id.tools.log_retention import DataLogRetention
+from weconnect_id.tools.log_rotation import get_manifest
+import pytest
+
+pyarrow = pytest.importorskip("pyarrow")
+
+from weconnect_id.tools.parquet_export import DataLogExporter  # noqa: E402
+
+
+def test_segment_is_kept_until_exported(tmp_path):
+    logs = tmp_path / "logs"
+    (logs / "battery").mkdir(parents=True)
+    start = datetime(2026, 1, 1, 10).astimezone().timestamp()
+    segment = logs / "battery" / "batteryLevel.2026-01-01.csv"
+    segment.write_text(
+        "value;time\n"
+        + "".join(
+            f"{80 + i}%;{datetime.fromtimestamp(start + i * 60).astimezone().isoformat(timespec='seconds')}\n"
+            for i in range(10)
+        )
+    )
+    manifest = get_manifest(str(logs))
+    manifest.add_segment(
+        "battery/batteryLevel",
+        {"file": "battery/batteryLevel.2026-01-01.csv", "start": start, "end": start + 540, "rows": 10},
+    )
+    manifest.save()
+
+    exporter = DataLogExporter(str(logs), str(tmp_path / "parquet"), delay=0)
+    retention = DataLogRetention(str(logs), raw_days=1, data_log_exporter=exporter)
+    now = start + 40 * 86400
+
+    retention.compact(now=now)
+    assert segment.exists()
+
+    assert exporter.export(now=now) == 10
+    assert exporter.get_watermark("battery", "batteryLevel") == start + 540
+    assert list((tmp_path / "parquet" / "category=battery").glob("month=2026-01/*.parquet"))
+
+    retention.compact(now=now)
+    assert not segment.exists()
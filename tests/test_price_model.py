@@ -0,0 +1,112 @@
+from datetime import date, datetime, timedelta
+from electricity_price.price_model import SpotPriceModel, local_midnight
+import time
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def helsinki_time(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/Helsinki")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def create_entries(start: datetime, end: datetime, resolution: int, price=None) -> list:
+    entries = []
+    timestamp = start.timestamp()
+    while timestamp < end.timestamp():
+        moment = datetime.fromtimestamp(timestamp).astimezone()
+        value = float(len(entries)) if price is None else price
+        entries.append(
+            {"DateTime": moment.strftime("%Y-%m-%dT%H:%M:%S%z"), "PriceWithTax": value, "PriceNoTax": value / 1.255}
+        )
+        timestamp += resolution
+    return entries
+
+
+def create_day(day: date, resolution: int = 900) -> list:
+    return create_entries(local_midnight(day), local_midnight(day + timedelta(days=1)), resolution)
+
+
+@pytest.mark.parametrize("day, hours", [(date(2026, 3, 29), 23), (date(2026, 10, 25), 25), (date(2026, 6, 1), 24)])
+def test_days_when_clocks_are_turned(day, hours):
+    model = SpotPriceModel.from_entries(create_day(day))
+
+    assert model.resolution == 900
+    assert len(model) == hours * 4
+    assert model.is_complete(day)
+    assert len(model.hourly()) == hours
+    assert model.end == local_midnight(day + timedelta(days=1))
+
+
+def test_hourly_entries_fill_their_quarter_slots():
+    day = date(2026, 6, 1)
+    entries = create_entries(local_midnight(day), local_midnight(day) + timedelta(hours=1), 3600, price=4.0)
+    entries += create_entries(
+        local_midnight(day) + timedelta(hours=1), local_midnight(day) + timedelta(hours=2), 900, price=8.0
+    )
+    model = SpotPriceModel.from_entries(entries)
+
+    assert model.resolution == 900
+    assert model.prices.tolist() == [4.0] * 4 + [8.0] * 4
+
+
+def test_gap_is_unknown_and_day_incomplete():
+    day = date(2026, 6, 1)
+    entries = create_day(day, resolution=3600)
+    del entries[5]
+    model = SpotPriceModel.from_entries(entries)
+
+    assert len(model) == 24
+    assert model.price_at(local_midnight(day) + timedelta(hours=5, minutes=30)) is None
+    assert model.price_at(local_midnight(day) + timedelta(hours=6)) == 6.0
+    assert not model.is_complete(day)
+    assert not model.is_complete(day + timedelta(days=1))
+    assert model.hourly()[5] == (local_midnight(day) + timedelta(hours=5), None)
+
+
+def test_missing_quarter_is_unknown():
+    day = date(2026, 6, 1)
+    entries = create_day(day)
+    del entries[1]
+    model = SpotPriceModel.from_entries(entries)
+
+    assert model.prices[0] == 0.0
+    assert model.price_at(local_midnight(day) + timedelta(minutes=15)) is None
+    assert not model.is_complete(day)
+
+
+def test_hourly_averages_the_known_slots():
+    day = date(2026, 6, 1)
+    entries = create_day(day)
+    del entries[1]
+    model = SpotPriceModel.from_entries(entries)
+
+    hours = model.hourly(local_midnight(day), local_midnight(day) + timedelta(hours=2))
+    assert hours == [
+        (local_midnight(day), round((0 + 2 + 3) / 3, 2)),
+        (local_midnight(day) + timedelta(hours=1), round((4 + 5 + 6 + 7) / 4, 2)),
+    ]
+
+
+def test_next_boundary():
+    day = date(2026, 6, 1)
+    model = SpotPriceModel.from_entries(create_day(day))
+    midnight = local_midnight(day)
+
+    assert model.next_boundary(midnight + timedelta(minutes=7)) == midnight + timedelta(minutes=15)
+    assert model.next_boundary(midnight + timedelta(minutes=15)) == midnight + timedelta(minutes=30)
+    # Outside the model the hour boundaries are used
+    after = midnight + timedelta(days=1, minutes=7)
+    assert model.next_boundary(after) == midnight + timedelta(days=1, hours=1)
+
+
+def test_empty_model():
+    model = SpotPriceModel.from_entries([])
+
+    assert len(model) == 0
+    assert model.statistics() is None
+    assert model.hourly() == []
+    assert not model.is_complete(date(2026, 6, 1))
@@ -0,0 +1,20 @@
+from threading import Thread
+from weconnect_id.data_providers.vehicle_data_property import ExternalDataProperty
+
+
+def test_callback_can_update_the_same_data_property():
+    data_property = ExternalDataProperty(id="spotPriceNow", category="electricity", value=1)
+    values = []
+
+    def on_update() -> None:
+        values.append(data_property.value)
+        if data_property.value < 3:
+            data_property.update_value(data_property.value + 1)
+
+    data_property.add_callback_function(id="TEST", function=on_update)
+    thread = Thread(target=data_property.update_value, args=[2], daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert values == [2, 3]
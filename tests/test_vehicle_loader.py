@@ -0,0 +1,159 @@
+from simulation.hardware import install_simulated_hardware
+
+HARDWARE = install_simulated_hardware()
+
+from build_tools.scene_builder import SceneBuilder  # noqa: E402
+from display.lcd_scene_controller import LCDSceneController  # noqa: E402
+from electricity_price.price_model import SpotPriceModel  # noqa: E402
+from simulation.replay import SimulatedSpotPriceProvider, SimulatedUpdater  # noqa: E402
+from simulation.vehicle import EnumResolver, SimulatedVehicle, apply_event  # noqa: E402
+from weconnect.addressable import AddressableLeaf  # noqa: E402
+from weconnect.elements.charging_status import ChargingStatus  # noqa: E402
+from weconnect.elements.climatization_status import ClimatizationStatus  # noqa: E402
+from weconnect.elements.enums import MaximumChargeCurrent  # noqa: E402
+from weconnect.elements.plug_status import PlugStatus  # noqa: E402
+from weconnect_id.controllers.charging_planner import create_price_history  # noqa: E402
+from weconnect_id.tools.charging_curves import ChargeTimeEstimator  # noqa: E402
+from weconnect_id.tools.charging_sessions import ChargingSessionTracker  # noqa: E402
+from weconnect_id.tools.event_journal import EventJournalReader, JournalEntry  # noqa: E402
+from weconnect_id.tools.vehicle_loader import WeConnectVehicleLoader  # noqa: E402
+from weconnect_id.vehicle import WeConnectVehicle  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import threading  # noqa: E402
+import pytest  # noqa: E402
+
+VIN = "WVWZZZ1"
+DOMAINS = f"/vehicles/{VIN}/domains/"
+STATE = {
+    "charging/batteryStatus/currentSOC_pct": 40,
+    "charging/batteryStatus/cruisingRangeElectric_km": 160,
+    "charging/chargingStatus/chargingState": ChargingStatus.ChargingState.READY_FOR_CHARGING,
+    "charging/chargingStatus/chargePower_kW": 0.0,
+    "charging/chargingStatus/chargeType": ChargingStatus.ChargeType.INVALID,
+    "charging/plugStatus/plugConnectionState": PlugStatus.PlugConnectionState.CONNECTED,
+    "charging/chargingSettings/targetSOC_pct": 80,
+    "charging/chargingSettings/maxChargeCurrentAC": MaximumChargeCurrent.MAXIMUM,
+    "climatisation/climatisationStatus/climatisationState": ClimatizationStatus.ClimatizationState.OFF,
+    "climatisation/climatisationSettings/targetTemperature_C": 21.0,
+}
+
+
+class LoaderUpdater(SimulatedUpdater):
+    def __init__(self, vehicle: SimulatedVehicle) -> None:
+        super().__init__()
+        self.weconnect = SimpleNamespace(vehicles={VIN: vehicle})
+
+
+class PriceProvider(SimulatedSpotPriceProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.model = SpotPriceModel.from_entries(create_price_history(3))
+        self.data_properties = ()
+        self.__update_callbacks = {}
+
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        self.__update_callbacks[id] = function
+
+    def remove_update_callback(self, id: str) -> None:
+        self.__update_callbacks.pop(id, None)
+
+
+@pytest.fixture
+def config(tmp_path) -> dict:
+    config_path = tmp_path / "config.json"
+    config = {
+        "paths": {"data_logs": str(tmp_path / "logs"), "config": str(config_path)},
+        "log data": ["batteryLevel"],
+        "translations": {},
+        "home scene": "SCENE_MENU",
+        "pin layout": {"button climate": 5},
+        "lcd scenes": [
+            {"id": "SCENE_MENU", "type": "normal", "title": "Menu", "items selectable": True, "items": ["ITEM_BATTERY"]},
+            {"id": "SCENE_CLIMATE_SETTINGS", "type": "custom", "custom scene id": "SCENE_CLIMATE_SETTINGS"},
+        ],
+        "lcd items": [
+            {
+                "id": "ITEM_BATTERY",
+                "type": "WeConnectLCDItem",
+                "data provider id": "batteryLevel",
+                "title": "Akku",
+                "translate": False,
+                "content centering": False,
+            },
+        ],
+        "automated leds": [],
+        "automated messages": [],
+        "charging planner": {"departure": "07:00"},
+        "charge time estimate": {},
+    }
+    config_path.write_text(json.dumps(config))
+    yield config
+    # Timers of the user interface are not daemon threads
+    for thread in threading.enumerate():
+        if isinstance(thread, threading.Timer):
+            thread.cancel()
+
+
+def create_loader(config: dict, tmp_path, monkeypatch) -> tuple:
+    # ClimateController needs the climatisation controls of a real WeConnect-API vehicle
+    monkeypatch.setattr(WeConnectVehicle, "setup_climate_controller", lambda self, **kwargs: None)
+    vehicle = SimulatedVehicle(
+        vin=VIN,
+        state={DOMAINS + address: JournalEntry(value, 0.0, 0) for address, value in STATE.items()},
+        enum_resolver=EnumResolver(),
+    )
+    vehicle.controls = SimpleNamespace(chargingControl=SimpleNamespace(enabled=True, value=None))
+    updater = LoaderUpdater(vehicle)
+    spot_price_provider = PriceProvider()
+    lcd_scene_controller = LCDSceneController()
+    loader = WeConnectVehicleLoader(
+        lcd_scene_controller=lcd_scene_controller,
+        weconnect_updater=updater,
+        config=config,
+        scene_builder=SceneBuilder(
+            config=config,
+            weconnect_updater=updater,
+            lcd_scene_controller=lcd_scene_controller,
+            spot_price_provider=spot_price_provider,
+        ),
+        spot_price_provider=spot_price_provider,
+        charging_session_tracker=ChargingSessionTracker(
+            path=str(tmp_path / "sessions.jsonl"),
+            spot_price_provider=spot_price_provider,
+            weconnect_updater=updater,
+        ),
+        charge_time_estimator=ChargeTimeEstimator.from_config(config, updater),
+    )
+
+    return loader, vehicle, updater
+
+
+def test_vehicle_dependent_items_are_loaded(config, tmp_path, monkeypatch, caplog):
+    loader, _, updater = create_loader(config, tmp_path, monkeypatch)
+
+    loader.load_vehicle_dependent_items(VIN)
+    updater.update()
+
+    weconnect_vehicle = loader.selected_vehicle
+    assert weconnect_vehicle is not None
+    assert weconnect_vehicle.get_data_property("batteryLevel").value == 40
+    assert weconnect_vehicle.get_data_property("chargeTimeEstimate").value is None
+    assert json.loads((tmp_path / "config.json").read_text())["selected vehicle vin"] == VIN
+    assert "Akku" in "\n".join(HARDWARE.lcds[0].content)
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_reloading_vehicle_closes_previous_event_journal(config, tmp_path, monkeypatch):
+    config["data logger"] = {"event journal": {"enabled": True}}
+    loader, vehicle, _ = create_loader(config, tmp_path, monkeypatch)
+    loader.load_vehicle_dependent_items(VIN)
+    loader.load_vehicle_dependent_items(VIN)
+
+    address = DOMAINS + "charging/batteryStatus/currentSOC_pct"
+    apply_event(vehicle.get_element(address), 41, AddressableLeaf.ObserverEvent.VALUE_CHANGED.value)
+    loader.selected_vehicle.close_event_journal()
+
+    events = EventJournalReader(tmp_path / "logs" / f"{VIN}.journal").events()
+    assert [value for _, event_address, value, _ in events if event_address == address].count(41) == 1
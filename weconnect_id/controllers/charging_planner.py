@@ -0,0 +1,422 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple
+if TYPE_CHECKING:
+    from electricity_price.spot_price_provider import SpotPriceProvider
+    from weconnect_id.vehicle import WeConnectVehicle
+    from weconnect_id.data_providers.vehicle_snapshot import WeConnectVehicleSnapshot
+from electricity_price.price_model import SpotPriceModel, local_midnight
+from electricity_price.cheapest_window import find_cheapest_window, next_deadline
+from weconnect.elements.control_operation import ControlOperation
+from weconnect.elements.charging_status import ChargingStatus
+from weconnect.elements.plug_status import PlugStatus
+from weconnect.elements.enums import MaximumChargeCurrent
+from weconnect_id.data_providers.data_property_catalog import NOMINAL_BATTERY_CAPACITY
+from datetime import datetime, time, timedelta
+from threading import Lock
+import argparse
+import json
+import math
+import timeit
+import logging
+import numpy
+
+
+LOG = logging.getLogger("charging_planner")
+
+
+class ChargingPlannerCompatibilityError(Exception):
+    pass
+
+
+class ChargingPlan(NamedTuple):
+    slots: tuple
+    resolution: int
+    energy: float
+    power: float
+    # Estimated cost in cents
+    cost: float
+    departure: datetime
+
+    def is_charging_slot(self, moment: datetime) -> bool:
+        '''
+        Checks if the moment is inside one of the planned charging slots.
+        '''
+
+        return any(
+            0 <= (moment - slot).total_seconds() < self.resolution for slot in self.slots
+        )
+
+    @property
+    def start(self) -> datetime:
+        return self.slots[0] if self.slots else None
+
+
+def plan_charging(
+    model: SpotPriceModel,
+    now: datetime,
+    departure: datetime,
+    energy: float,
+    power: float,
+) -> ChargingPlan:
+    '''
+    Plans the cheapest charging slots for charging the energy before the departure.
+
+    Args:
+        model (SpotPriceModel): Prices to plan with.
+        now (datetime): Current time as aware datetime. Charging can start from the current slot.
+        departure (datetime): Charging has to be finished before this.
+        energy (float): Energy to be charged in kWh.
+        power (float): Charging power in kW.
+
+    Returns:
+        ChargingPlan: None if the prices until the departure are not known.
+            If there isn't enough time, all slots until the departure are planned.
+    '''
+
+    if model.end < departure:
+        return None
+
+    resolution = model.resolution
+    if energy <= 0:
+        return ChargingPlan((), resolution, 0.0, power, 0.0, departure)
+
+    needed = int(math.ceil(energy / (power * resolution / 3600)))
+    first, last = model.bounds(now, departure)
+    window = find_cheapest_window(
+        model=model,
+        duration=timedelta(seconds=min(needed, last - first) * resolution),
+        deadline=departure,
+        start=now,
+        contiguous=False,
+    )
+    if window is None:
+        return None
+    return ChargingPlan(
+        slots=window.slots,
+        resolution=resolution,
+        energy=energy,
+        power=power,
+        cost=round(window.average_price * energy, 2),
+        departure=departure,
+    )
+
+
+class ChargingPlanner:
+    DATA_PROPERTY_IDS = (
+        "batteryLevel",
+        "targetBatteryLevel",
+        "batteryCharge",
+        "chargePower",
+        "chargeType",
+        "maxACChargeCurrent",
+        "chargeState",
+        "chargingPlugConnectionStatus",
+    )
+    # Requests are sent again if the vehicle hasn't reached the requested state in this time
+    REQUEST_TIMEOUT = 10 * 60
+
+    def __init__(
+        self,
+        weconnect_vehicle: WeConnectVehicle,
+        spot_price_provider: SpotPriceProvider,
+        departure_time: time,
+        charge_power: dict = None,
+        battery_capacity: float = NOMINAL_BATTERY_CAPACITY,
+    ) -> None:
+        '''
+        Charges the vehicle in the cheapest price periods so the target battery level is reached by the departure time.
+
+        The plan is made from batteryLevel, targetBatteryLevel and batteryCharge with the charging power learned from
+        chargePower during AC charging for each maxACChargeCurrent setting. It is made again only when the spot prices, the departure
+        or the amount of needed charging slots change. Charging is started and stopped with the charging control
+        of the WeConnect-API at the price period boundaries while the charging plug is connected.
+
+        Args:
+            weconnect_vehicle (WeConnectVehicle): Vehicle to be charged.
+            spot_price_provider (SpotPriceProvider): Provides the prices.
+            departure_time (time): Time of the day when the vehicle has to be charged.
+            charge_power (dict, optional): Charging power in kW for each maxACChargeCurrent setting ("maximum", "reduced")
+                used until the power is learned from chargePower. Defaults to 11 and 5 kW.
+            battery_capacity (float, optional): Usable battery capacity in kWh used if it can't be calculated
+                from batteryCharge. Defaults to NOMINAL_BATTERY_CAPACITY.
+
+        Raises:
+            ChargingPlannerCompatibilityError: Raised if vehicle is not compatible with remote charging controls.
+        '''
+
+        LOG.debug("Initializing ChargingPlanner")
+        self.__weconnect_vehicle = weconnect_vehicle
+        self.__spot_price_provider = spot_price_provider
+        self.__departure_time = departure_time
+        self.__battery_capacity = battery_capacity
+        self.__charge_power = {
+            MaximumChargeCurrent.MAXIMUM: 11.0,
+            MaximumChargeCurrent.REDUCED: 5.0,
+        }
+        for setting, power in (charge_power or {}).items():
+            self.__charge_power[MaximumChargeCurrent(setting)] = float(power)
+
+        self.__charging_control = weconnect_vehicle.api_vehicle.controls.chargingControl
+        if not (self.__charging_control is not None and self.__charging_control.enabled):
+            raise ChargingPlannerCompatibilityError("Car is not compatible with charging controls")
+
+        self.__lock = Lock()
+        self.__plan = None
+        self.__plan_model = None
+        self.__plan_key = None
+        self.__requested_operation = None
+        self.__request_time = None
+        self.__stopped = False
+
+        weconnect_vehicle.add_snapshot_callback(id="CHARGING_PLANNER", function=self.__on_snapshot)
+        spot_price_provider.add_update_callback(id="CHARGING_PLANNER", function=self.update)
+        self.update()
+        LOG.debug("Successfully initialized ChargingPlanner")
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict,
+        weconnect_vehicle: WeConnectVehicle,
+        spot_price_provider: SpotPriceProvider,
+    ):
+        '''
+        Creates ChargingPlanner from the optional "charging planner" config, e.g.
+        {"departure": "07:00", "charge power": {"maximum": 11, "reduced": 5}, "battery capacity": 58}.
+
+        Returns:
+            ChargingPlanner: None if the charging planner is not configured.
+        '''
+
+        planner_config = config.get("charging planner")
+        if planner_config is None or not planner_config.get("enabled", True):
+            return None
+        return cls(
+            weconnect_vehicle=weconnect_vehicle,
+            spot_price_provider=spot_price_provider,
+            departure_time=time.fromisoformat(planner_config.get("departure", "07:00")),
+            charge_power=planner_config.get("charge power"),
+            battery_capacity=planner_config.get("battery capacity", NOMINAL_BATTERY_CAPACITY),
+        )
+
+    def stop(self) -> None:
+        self.__stopped = True
+        self.__weconnect_vehicle.remove_snapshot_callback(id="CHARGING_PLANNER")
+        self.__spot_price_provider.remove_update_callback(id="CHARGING_PLANNER")
+
+    def __on_snapshot(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        if snapshot.changed_ids.isdisjoint(self.DATA_PROPERTY_IDS):
+            return
+        self.update(snapshot)
+
+    def __learn_charge_power(self, snapshot: WeConnectVehicleSnapshot) -> None:
+        power = snapshot["chargePower"]
+        setting = snapshot["maxACChargeCurrent"]
+        # maxACChargeCurrent limits only AC charging, DC power would make the plans far too short
+        if (
+            snapshot["chargeState"] == ChargingStatus.ChargingState.CHARGING
+            and snapshot.get("chargeType") == ChargingStatus.ChargeType.AC
+            and setting in self.__charge_power
+            and power is not None
+            and power > 0
+        ):
+            self.__charge_power[setting] = float(power)
+
+    def __get_needed_energy(self, snapshot: WeConnectVehicleSnapshot) -> float:
+        level = snapshot["batteryLevel"]
+        target = snapshot["targetBatteryLevel"]
+        charge = snapshot["batteryCharge"]
+        if level is None or target is None:
+            return None
+        capacity = self.__battery_capacity
+        if charge is not None and level > 0:
+            capacity = charge / level * 100
+        return max(target - level, 0) / 100 * capacity
+
+    def update(self, snapshot: WeConnectVehicleSnapshot = None) -> None:
+        '''
+        Makes a new plan if the inputs changed and starts or stops charging according to the plan.
+
+        Args:
+            snapshot (WeConnectVehicleSnapshot, optional): Latest snapshot of the vehicle. Defaults to the current snapshot.
+        '''
+
+        if self.__stopped:
+            return
+        if snapshot is None:
+            snapshot = self.__weconnect_vehicle.snapshot
+        now = datetime.now().astimezone()
+        model = self.__spot_price_provider.model
+
+        with self.__lock:
+            self.__learn_charge_power(snapshot)
+            energy = self.__get_needed_energy(snapshot)
+            power = self.__charge_power.get(
+                snapshot["maxACChargeCurrent"], self.__charge_power[MaximumChargeCurrent.MAXIMUM]
+            )
+            departure = next_deadline(now, self.__departure_time)
+            needed = None if energy is None else int(math.ceil(energy / (power * model.resolution / 3600)))
+            if (
+                model is not self.__plan_model
+                or (departure, needed) != self.__plan_key
+                or self.__plan_finished(now)
+            ):
+                self.__plan_model = model
+                self.__plan_key = (departure, needed)
+                self.__plan = None if energy is None else plan_charging(model, now, departure, energy, power)
+                LOG.info(f"Updated charging plan (Plan: {self.__plan})")
+
+            operation = self.__get_operation(snapshot, now)
+            if operation is None:
+                return
+            self.__requested_operation = operation
+            self.__request_time = now
+
+        LOG.info(f"Requesting charging {operation.value} (Vehicle: {self.__weconnect_vehicle.nickname})")
+        try:
+            self.__charging_control.value = operation
+        except Exception as e:
+            LOG.exception(e)
+
+    def __plan_finished(self, now: datetime) -> bool:
+        '''
+        Checks if all planned slots have passed, e.g. when the charging was slower than planned.
+        '''
+
+        if self.__plan is None or not self.__plan.slots:
+            return False
+        return (now - self.__plan.slots[-1]).total_seconds() >= self.__plan.resolution
+
+    def __get_operation(self, snapshot: WeConnectVehicleSnapshot, now: datetime) -> ControlOperation:
+        if self.__plan is None:
+            return None
+        if snapshot["chargingPlugConnectionStatus"] != PlugStatus.PlugConnectionState.CONNECTED:
+            self.__requested_operation = None
+            return None
+
+        charging = snapshot["chargeState"] == ChargingStatus.ChargingState.CHARGING
+        should_charge = self.__plan.is_charging_slot(now)
+        if charging == should_charge:
+            self.__requested_operation = None
+            return None
+
+        operation = ControlOperation.START if should_charge else ControlOperation.STOP
+        if (
+            operation == self.__requested_operation
+            and (now - self.__request_time).total_seconds() < self.REQUEST_TIMEOUT
+        ):
+            return None
+        return operation
+
+    @property
+    def plan(self) -> ChargingPlan:
+        return self.__plan
+
+
+def load_price_history(path: str) -> list:
+    '''
+    Reads price entries from a JSON file containing a list of entries in the spot-hinta.fi format,
+    or from a folder of such files. SpotPriceCache removes old delivery dates, so its folder
+    holds only the last few days and a longer history has to be collected separately.
+
+    Returns:
+        list: Price entries ordered by time.
+    '''
+
+    from pathlib import Path
+
+    path = Path(path)
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    entries = []
+    for price_file in files:
+        with open(price_file, "r") as prices:
+            entries.extend(json.load(prices))
+    return sorted(entries, key=lambda entry: entry["DateTime"])
+
+
+def create_price_history(days: int, resolution: int = 900, seed: int = 0) -> list:
+    '''
+    Creates synthetic price entries with daily peaks for benchmarking when history isn't available.
+    '''
+
+    generator = numpy.random.default_rng(seed)
+    start = local_midnight(datetime.now().date() - timedelta(days=days))
+    slots_per_day = 86400 // resolution
+    hours = numpy.arange(days * slots_per_day) * resolution / 3600 % 24
+    prices = 8 + 6 * numpy.sin((hours - 12) / 24 * 2 * numpy.pi) + generator.gamma(2, 2, len(hours))
+    return [
+        {
+            "DateTime": (start + timedelta(seconds=int(index) * resolution)).strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "PriceWithTax": round(float(price), 2),
+            "PriceNoTax": round(float(price) / 1.255, 2),
+        }
+        for index, price in enumerate(prices)
+    ]
+
+
+def benchmark(entries: list, plug_in: time, departure: time, energy: float, power: float) -> dict:
+    '''
+    Plans the charging for every night of the price history, making a new plan at every price period
+    from the plug in time to the departure like the ChargingPlanner does when the battery level changes.
+
+    Returns:
+        dict: Amount of plans and the planning times in milliseconds.
+    '''
+
+    model = SpotPriceModel.from_entries(entries)
+    first_day = model.start.date()
+    days = (model.end.date() - first_day).days - 1
+    durations = []
+    for day in range(days):
+        plug_in_moment = datetime.combine(first_day + timedelta(days=day), plug_in).astimezone()
+        departure_moment = next_deadline(plug_in_moment, departure)
+        # Prices known at the plug in time: until the end of the next day
+        known_model = SpotPriceModel(
+            model.start.timestamp(),
+            model.resolution,
+            model.prices[: model.bounds(end=local_midnight(plug_in_moment.date() + timedelta(days=2)))[1]],
+        )
+        now = plug_in_moment
+        while now < departure_moment:
+            durations.append(
+                timeit.timeit(
+                    lambda: plan_charging(known_model, now, departure_moment, energy, power), number=1
+                )
+            )
+            now += timedelta(seconds=model.resolution)
+
+    durations = numpy.array(durations) * 1000
+    return {
+        "plans": len(durations),
+        "mean ms": round(float(durations.mean()), 3),
+        "p99 ms": round(float(numpy.percentile(durations, 99)), 3),
+        "max ms": round(float(durations.max()), 3),
+    }
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the charging planner over a price history")
+    parser.add_argument(
+        "--prices",
+        help="JSON file or folder of JSON files of price entries in the spot-hinta.fi format. Synthetic prices are used if not given",
+    )
+    parser.add_argument("--days", type=int, default=365, help="Days of synthetic prices")
+    parser.add_argument("--plug-in", default="18:00", help="Time of the day when the planning starts")
+    parser.add_argument("--departure", default="07:00", help="Time of the day when the charging has to be finished")
+    parser.add_argument("--energy", type=float, default=30, help="Energy to be charged in kWh")
+    parser.add_argument("--power", type=float, default=11, help="Charging power in kW")
+    arguments = parser.parse_args(argv)
+
+    entries = load_price_history(arguments.prices) if arguments.prices else create_price_history(arguments.days)
+    result = benchmark(
+        entries=entries,
+        plug_in=time.fromisoformat(arguments.plug_in),
+        departure=time.fromisoformat(arguments.departure),
+        energy=arguments.energy,
+        power=arguments.power,
+    )
+    print(json.dumps(result, indent=1))
+
+
+if __name__ == "__main__":
+    main()
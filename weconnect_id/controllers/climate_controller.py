@@ -95,6 +95,10 @@ class ClimateController:
         ControlOperation.STOP: Operation.STOP,
         ControlOperation.START: Operation.START,
     }
+    DATA_PROPERTY_IDS = (
+        "climateControllerTargetTemperature",
+        "climateControllerState",
+    )
 
     def __init__(
         self,
@@ -127,10 +131,10 @@ class ClimateController:
 
         self.__climate_controls = self.__vehicle.controls.climatizationControl
         self.__climate_temperature = weconnect_vehicle.get_data_property(
-            "climate controller target temperature"
+            "climateControllerTargetTemperature"
         )
         self.__climate_state = weconnect_vehicle.get_data_property(
-            "climate controller state"
+            "climateControllerState"
         )
         self.__climate_settings = self.__vehicle.domains["climatisation"][
             "climatisationSettings"
@@ -0,0 +1,280 @@
+from weconnect.domain import Domain
+
+
+# Usable battery capacity in kWh used until BatteryCapacityEstimator has learned the capacity of the vehicle.
+NOMINAL_BATTERY_CAPACITY = 58
+
+
+# Declarative description of every WeConnectVehicleDataProperty the app can provide.
+#
+#   id: ID of the data property.
+#   domain: WeConnect domain which provides the data.
+#   path: Path to the WeConnect-API element inside the domain.
+#       Attributes and dict keys are both accepted as path items.
+#   category: Category where the data property belongs to.
+#   desc: Description for the data property.
+#   unit (optional): Unit for the data property.
+#   formula (optional): If given, a CalculatedWeConnectVehicleDataProperty is created and
+#       the formula is used to calculate its value from the WeConnect-API element value.
+DATA_PROPERTY_CATALOG = (
+    {
+        "id": "batteryLevel",
+        "domain": Domain.CHARGING,
+        "path": ("batteryStatus", "currentSOC_pct"),
+        "category": "battery",
+        "desc": "Battery level as percentage",
+        "unit": "%",
+    },
+    {
+        "id": "batteryCharge",
+        "domain": Domain.CHARGING,
+        "path": ("batteryStatus", "currentSOC_pct"),
+        "category": "battery",
+        "desc": "Battery charge in kWh",
+        "unit": "kWh",
+        "formula": lambda x: round(x / 100 * NOMINAL_BATTERY_CAPACITY, 2),
+    },
+    {
+        "id": "range",
+        "domain": Domain.CHARGING,
+        "path": ("batteryStatus", "cruisingRangeElectric_km"),
+        "category": "battery",
+        "desc": "Estimated electric range in km",
+        "unit": "km",
+    },
+    {
+        "id": "chargeTimeRemaining",
+        "domain": Domain.CHARGING,
+        "path": ("chargingStatus", "remainingChargingTimeToComplete_min"),
+        "category": "battery",
+        "desc": "Remaining charging time in minutes",
+        "unit": "min",
+    },
+    {
+        "id": "chargeState",
+        "domain": Domain.CHARGING,
+        "path": ("chargingStatus", "chargingState"),
+        "category": "battery",
+        "desc": "Charging state",
+    },
+    {
+        "id": "chargeMode",
+        "domain": Domain.CHARGING,
+        "path": ("chargingStatus", "chargeMode"),
+        "category": "battery",
+        "desc": "Charging mode",
+    },
+    {
+        "id": "chargePower",
+        "domain": Domain.CHARGING,
+        "path": ("chargingStatus", "chargePower_kW"),
+        "category": "battery",
+        "desc": "Charging power in kWs",
+        "unit": "kW",
+    },
+    {
+        "id": "chargeRate",
+        "domain": Domain.CHARGING,
+        "path": ("chargingStatus", "chargeRate_kmph"),
+        "category": "battery",
+        "desc": "Charging rate in km/h",
+        "unit": "km/h",
+    },
+    {
+        "id": "chargeType",
+        "domain": Domain.CHARGING,
+        "path": ("chargingStatus", "chargeType"),
+        "category": "battery",
+        "desc": "Charging type",
+    },
+    {
+        "id": "maxACChargeCurrent",
+        "domain": Domain.CHARGING,
+        "path": ("chargingSettings", "maxChargeCurrentAC"),
+        "category": "battery",
+        "desc": "Maximum AC charging current",
+    },
+    {
+        "id": "autoUnlockChargingPlug",
+        "domain": Domain.CHARGING,
+        "path": ("chargingSettings", "autoUnlockPlugWhenCharged"),
+        "category": "battery",
+        "desc": "Automatically unlock charging plug after charging is completed",
+    },
+    {
+        "id": "targetBatteryLevel",
+        "domain": Domain.CHARGING,
+        "path": ("chargingSettings", "targetSOC_pct"),
+        "category": "battery",
+        "desc": "Target battery level as percentage",
+        "unit": "%",
+    },
+    {
+        "id": "autoUnlockChargingPlugAC",
+        "domain": Domain.CHARGING,
+        "path": ("chargingSettings", "autoUnlockPlugWhenChargedAC"),
+        "category": "battery",
+        "desc": "Automatically unlock charging plug after charging with AC is completed",
+    },
+    {
+        "id": "chargingPlugConnectionStatus",
+        "domain": Domain.CHARGING,
+        "path": ("plugStatus", "plugConnectionState"),
+        "category": "battery",
+        "desc": "Connection status of charging plug",
+    },
+    {
+        "id": "chargingPlugLockStatus",
+        "domain": Domain.CHARGING,
+        "path": ("plugStatus", "plugLockState"),
+        "category": "battery",
+        "desc": "Charging plug locked / unlocked",
+    },
+    {
+        "id": "chargingLedColor",
+        "domain": Domain.CHARGING,
+        "path": ("plugStatus", "ledColor"),
+        "category": "battery",
+        "desc": "Color of the charging indicator LED",
+    },
+    {
+        "id": "externalPower",
+        "domain": Domain.CHARGING,
+        "path": ("plugStatus", "externalPower"),
+        "category": "battery",
+        "desc": "External power status",
+    },
+    {
+        "id": "preferredChargingMode",
+        "domain": Domain.CHARGING,
+        "path": ("chargeMode", "preferredChargeMode"),
+        "category": "battery",
+        "desc": "Preferred charging mode",
+    },
+    {
+        "id": "batteryCareMode",
+        "domain": Domain.CHARGING,
+        "path": ("chargingCareSettings", "batteryCareMode"),
+        "category": "battery",
+        "desc": "Battery care mode activated / deactivated",
+    },
+    {
+        "id": "climateControllerTimeRemaining",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationStatus", "remainingClimatisationTime_min"),
+        "category": "climate",
+        "desc": "Remaining standby climate controller time in minutes",
+        "unit": "min",
+    },
+    {
+        "id": "climateControllerState",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationStatus", "climatisationState"),
+        "category": "climate",
+        "desc": "Climate controller state",
+    },
+    {
+        "id": "climateControllerTargetTemperature",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationSettings", "targetTemperature_C"),
+        "category": "climate",
+        "desc": "Climate controller target temperature in °C",
+        "unit": "°C",
+    },
+    {
+        "id": "climateControllerWithoutExternalPower",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationSettings", "climatisationWithoutExternalPower"),
+        "category": "climate",
+        "desc": "Standby climate controller availability without external power",
+    },
+    {
+        "id": "climateControllerAtUnlock",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationSettings", "climatizationAtUnlock"),
+        "category": "climate",
+        "desc": "Start standby climate controller when vehicle is unlocked",
+    },
+    {
+        "id": "windowsHeating",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationSettings", "windowHeatingEnabled"),
+        "category": "climate",
+        "desc": "Activate windscreen heater with standby climate controller",
+    },
+    {
+        "id": "heatLeftSeat",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationSettings", "zoneFrontLeftEnabled"),
+        "category": "climate",
+        "desc": "Activate driver seat heater with standby climate controller",
+    },
+    {
+        "id": "heatRightSeat",
+        "domain": Domain.CLIMATISATION,
+        "path": ("climatisationSettings", "zoneFrontRightEnabled"),
+        "category": "climate",
+        "desc": "Activate passenger seat heater with standby climate controller",
+    },
+    {
+        "id": "rearWindowHeating",
+        "domain": Domain.CLIMATISATION,
+        "path": ("windowHeatingStatus", "windows", "rear", "windowHeatingState"),
+        "category": "climate",
+        "desc": "Activate rear glass heater with standby climate controller",
+    },
+    {
+        "id": "frontWindowHeating",
+        "domain": Domain.CLIMATISATION,
+        "path": ("windowHeatingStatus", "windows", "front", "windowHeatingState"),
+        "category": "climate",
+        "desc": "Activate windscreen heater with standby climate controller",
+    },
+    {
+        "id": "car online",
+        "domain": Domain.READINESS,
+        "path": ("readinessStatus", "connectionState", "isOnline"),
+        "category": "readiness",
+        "desc": "Car is connected to internet",
+    },
+    {
+        "id": "car in use",
+        "domain": Domain.READINESS,
+        "path": ("readinessStatus", "connectionState", "isActive"),
+        "category": "readiness",
+        "desc": "Car is in use",
+    },
+    {
+        "id": "critical battery level",
+        "domain": Domain.READINESS,
+        "path": ("readinessStatus", "connectionWarning", "insufficientBatteryLevelWarning"),
+        "category": "readiness",
+        "desc": "Car battery is critically low",
+    },
+    {
+        "id": "odometer",
+        "domain": Domain.MEASUREMENTS,
+        "path": ("odometerStatus", "odometer"),
+        "category": "measurement",
+        "desc": "Odometer measurement in kms",
+        "unit": "km",
+    },
+    {
+        "id": "batteryTemperatureMin",
+        "domain": Domain.MEASUREMENTS,
+        "path": ("temperatureBatteryStatus", "temperatureHvBatteryMin_K"),
+        "category": "measurement",
+        "desc": "High voltage battery minimum temperature in °C",
+        "unit": "°C",
+        "formula": lambda x: x - 273.15,
+    },
+    {
+        "id": "batteryTemperatureMax",
+        "domain": Domain.MEASUREMENTS,
+        "path": ("temperatureBatteryStatus", "temperatureHvBatteryMax_K"),
+        "category": "measurement",
+        "desc": "High voltage battery maximum temperature in °C",
+        "unit": "°C",
+        "formula": lambda x: x - 273.15,
+    },
+)
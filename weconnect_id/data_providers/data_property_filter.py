@@ -0,0 +1,109 @@
+from enum import Enum
+import logging
+
+
+LOG = logging.getLogger("data_properties")
+
+
+class DataPropertyChangeFilter:
+    def __init__(
+        self,
+        absolute_deadband: float = None,
+        relative_deadband: float = None,
+        minimum_interval: float = None,
+        trailing_edge: bool = True,
+    ) -> None:
+        '''
+        Decides when a changed WeConnectVehicleDataProperty value should be delivered to callbacks and loggers.
+
+        Args:
+            absolute_deadband (float, optional): Numeric changes smaller than this are ignored. Defaults to None.
+            relative_deadband (float, optional): Numeric changes smaller than this fraction of the last delivered value are ignored. Defaults to None.
+            minimum_interval (float, optional): Minimum time in seconds between two deliveries. Defaults to None.
+            trailing_edge (bool, optional): If the final value of changes held back by the minimum interval
+                should be delivered once the interval has passed. Defaults to True.
+        '''
+
+        self.__absolute_deadband = absolute_deadband
+        self.__relative_deadband = relative_deadband
+        self.__minimum_interval = minimum_interval
+        self.__trailing_edge = trailing_edge
+        self.__delivered = False
+        self.__last_value = None
+        self.__last_time = None
+
+    @classmethod
+    def from_config(cls, filter_config: dict):
+        '''
+        Creates DataPropertyChangeFilter from config.
+
+        Args:
+            filter_config (dict): Dict with optional "absolute deadband", "relative deadband",
+                "minimum interval" and "trailing edge" keys.
+
+        Returns:
+            DataPropertyChangeFilter
+        '''
+
+        return cls(
+            absolute_deadband=filter_config.get("absolute deadband"),
+            relative_deadband=filter_config.get("relative deadband"),
+            minimum_interval=filter_config.get("minimum interval"),
+            trailing_edge=filter_config.get("trailing edge", True),
+        )
+
+    @property
+    def trailing_edge(self) -> bool:
+        return self.__trailing_edge
+
+    def get_delay(self, value, now: float) -> float:
+        '''
+        Checks how long delivering the given value should be delayed.
+
+        Args:
+            value: New value of the WeConnectVehicleDataProperty.
+            now (float): Current monotonic time in seconds.
+
+        Returns:
+            float: None if the change should be ignored, 0 if the value should be delivered now
+                and otherwise seconds until the value can be delivered.
+        '''
+
+        if not self.__delivered:
+            return 0
+        if not self.__is_significant(value):
+            return None
+        if self.__minimum_interval is not None:
+            elapsed = now - self.__last_time
+            if elapsed < self.__minimum_interval:
+                return self.__minimum_interval - elapsed
+        return 0
+
+    def mark_delivered(self, value, now: float) -> None:
+        self.__delivered = True
+        self.__last_value = value
+        self.__last_time = now
+
+    def __is_significant(self, value) -> bool:
+        last_value = self.__last_value
+        if not self.__is_number(value) or not self.__is_number(last_value):
+            return value != last_value
+
+        change = abs(value - last_value)
+        if change == 0:
+            return False
+        if self.__absolute_deadband is not None and change < self.__absolute_deadband:
+            return False
+        if (
+            self.__relative_deadband is not None
+            and change < abs(last_value) * self.__relative_deadband
+        ):
+            return False
+        return True
+
+    @staticmethod
+    def __is_number(value) -> bool:
+        return (
+            isinstance(value, (int, float))
+            and not isinstance(value, (bool, Enum))
+        )
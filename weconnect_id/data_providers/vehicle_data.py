@@ -2,26 +2,173 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from weconnect.elements.vehicle import Vehicle
+    from weconnect.domain import Domain
+from weconnect_id.data_providers.data_property_catalog import DATA_PROPERTY_CATALOG
+from weconnect_id.data_providers.vehicle_data_property import (
+    CalculatedWeConnectVehicleDataProperty,
+    WeConnectVehicleDataProperty,
+)
+import logging
+
+
+LOG = logging.getLogger("data_properties")
 
 
 class WeConnectVehicleData:
-    def __init__(self, vehicle: Vehicle) -> None:
+    def __init__(
+        self,
+        vehicle: Vehicle,
+        data_property_ids: set = None,
+        catalog: tuple = DATA_PROPERTY_CATALOG,
+    ) -> None:
         '''
         Used to store and provide WeConnectVehicleDataProperties.
+        The WeConnectVehicleDataProperties are created from the data property catalog in one pass
+        and indexed by ID, WeConnect-API element address and category.
 
         Args:
             vehicle (Vehicle): Used to provide data to the WeConnectDataProperties.
+            data_property_ids (set, optional): IDs of the WeConnectVehicleDataProperties to be created.
+                If None, every WeConnectVehicleDataProperty of the catalog is created. Defaults to None.
+            catalog (tuple, optional): Catalog describing the WeConnectVehicleDataProperties. Defaults to DATA_PROPERTY_CATALOG.
         '''
-        
+
         self._vehicle = vehicle
-        self._data = {}
+        self.__by_id = {}
+        self.__by_address = {}
+        self.__elements = {}
+        self.__by_category = {}
+        self.__domains = []
+        self.__import_data(catalog=catalog, data_property_ids=data_property_ids)
 
-    def get_data(self) -> dict:
-        data = {}
-        for item in self._data.values():
-            if isinstance(item, list):
-                for list_item in item:
-                    data[list_item.id] = list_item
+    @staticmethod
+    def get_domains(
+        data_property_ids: set = None, catalog: tuple = DATA_PROPERTY_CATALOG
+    ) -> list:
+        '''
+        Resolves the WeConnect domains needed by the given WeConnectVehicleDataProperties without creating them.
+
+        Args:
+            data_property_ids (set, optional): IDs of the WeConnectVehicleDataProperties. None means all. Defaults to None.
+            catalog (tuple, optional): Catalog describing the WeConnectVehicleDataProperties. Defaults to DATA_PROPERTY_CATALOG.
+
+        Returns:
+            list: List of the needed domains.
+        '''
+
+        domains = []
+        for entry in catalog:
+            if data_property_ids is not None and entry["id"] not in data_property_ids:
+                continue
+            if entry["domain"] not in domains:
+                domains.append(entry["domain"])
+        return domains
+
+    def __import_data(self, catalog: tuple, data_property_ids: set) -> None:
+        LOG.debug(f"Importing vehicle data (Vehicle: {self._vehicle.nickname})")
+        for entry in catalog:
+            if data_property_ids is not None and entry["id"] not in data_property_ids:
                 continue
-            data[item.id] = item
-        return data
+
+            try:
+                weconnect_element = self.__get_element(entry["domain"], entry["path"])
+            except (KeyError, AttributeError) as e:
+                LOG.warning(
+                    f"WeConnect-API element for WeConnectVehicleDataProperty (ID: {entry['id']}) "
+                    f"was not found (Vehicle: {self._vehicle.nickname}) (Error: {e!r})"
+                )
+                continue
+
+            if "formula" in entry:
+                data_property = CalculatedWeConnectVehicleDataProperty(
+                    id=entry["id"],
+                    weconnect_element=weconnect_element,
+                    category=entry["category"],
+                    formula=entry["formula"],
+                    desc=entry["desc"],
+                    unit=entry.get("unit"),
+                )
+            else:
+                data_property = WeConnectVehicleDataProperty(
+                    id=entry["id"],
+                    weconnect_element=weconnect_element,
+                    category=entry["category"],
+                    desc=entry["desc"],
+                    unit=entry.get("unit"),
+                )
+
+            address = weconnect_element.getGlobalAddress()
+            self.__by_id[data_property.id] = data_property
+            self.__by_address.setdefault(address, []).append(data_property)
+            self.__elements[address] = weconnect_element
+            self.__by_category.setdefault(data_property.category, []).append(data_property)
+            if entry["domain"] not in self.__domains:
+                self.__domains.append(entry["domain"])
+
+    def add(self, data_property: WeConnectVehicleDataProperty) -> None:
+        '''
+        Adds WeConnectVehicleDataProperty which doesn't receive data from the WeConnect-API.
+
+        Raises:
+            KeyError: Raised if WeConnectVehicleDataProperty with the same ID already exists.
+        '''
+
+        if data_property.id in self.__by_id:
+            raise KeyError(f"WeConnectVehicleDataProperty (ID: {data_property.id}) already exists")
+        self.__by_id[data_property.id] = data_property
+        self.__by_category.setdefault(data_property.category, []).append(data_property)
+
+    def __get_element(self, domain: Domain, path: tuple):
+        element = self._vehicle.domains[domain.value]
+        for key in path:
+            element = element[key] if isinstance(element, dict) else getattr(element, key)
+        return element
+
+    def __contains__(self, data_property_id: str) -> bool:
+        return data_property_id in self.__by_id
+
+    def __len__(self) -> int:
+        return len(self.__by_id)
+
+    @property
+    def domains(self) -> list:
+        return self.__domains
+
+    @property
+    def data_properties(self) -> list:
+        return list(self.__by_id.values())
+
+    @property
+    def elements(self) -> dict:
+        '''
+        WeConnect-API elements providing data to the WeConnectVehicleDataProperties by global address.
+        '''
+
+        return dict(self.__elements)
+
+    def get(self, data_property_id: str) -> WeConnectVehicleDataProperty:
+        '''
+        Get WeConnectVehicleDataProperty using it's ID.
+
+        Raises:
+            KeyError: Raised if WeConnectVehicleDataProperty with given ID doesn't exist.
+        '''
+
+        return self.__by_id[data_property_id]
+
+    def get_by_address(self, address: str) -> list:
+        '''
+        Get WeConnectVehicleDataProperties which receive data from the WeConnect-API element with given global address.
+        '''
+
+        return self.__by_address.get(address, [])
+
+    def get_category(self, category: str) -> list:
+        '''
+        Get WeConnectVehicleDataProperties of given category.
+        '''
+
+        return self.__by_category.get(category, [])
+
+    def get_data(self) -> dict:
+        return dict(self.__by_id)
@@ -1,9 +1,14 @@
 from weconnect_id.tools.logger import (
-    log as log_data,
+    log_record,
+    format_log_time,
+    DataLogPolicy,
     WeConnectLoggerError,
 )
+from weconnect_id.data_providers.data_property_filter import DataPropertyChangeFilter
 from datetime import datetime
 import logging
+import time
+from threading import Lock, Timer
 from enum import Enum
 from weconnect.addressable import AddressableAttribute, AddressableLeaf
 import json
@@ -43,8 +48,7 @@ class WeConnectVehicleDataProperty:
             self._value_string = str(
                 self._value.value if isinstance(self._value, Enum) else self._value
             )
-            self._time_updated = datetime.now().time().strftime("%H.%M:%S")
-            self._date_updated = datetime.now().date().strftime("%d.%m.%Y")
+            self._set_update_time()
             weconnect_element.addObserver(
                 observer=self.__update_value,
                 flag=AddressableLeaf.ObserverEvent.ENABLED
@@ -55,10 +59,20 @@ class WeConnectVehicleDataProperty:
         self._callback_functions = {}
         self.__logging_enabled = False
         self.__logger_path = None
+        self.__log_policy = None
+        self.__change_filter = None
+        self.__trailing_timer = None
+        self.__notify_lock = Lock()
 
     def __str__(self) -> str:
         return self._value_string
 
+    def _set_update_time(self) -> None:
+        updated_at = datetime.now()
+        self._timestamp_updated = updated_at.timestamp()
+        self._time_updated = updated_at.time().strftime("%H.%M:%S")
+        self._date_updated = updated_at.date().strftime("%d.%m.%Y")
+
     @property
     def id(self) -> str:
         return self._id
@@ -91,6 +105,10 @@ class WeConnectVehicleDataProperty:
     def last_update_date(self) -> str:
         return self._date_updated
 
+    @property
+    def last_update_timestamp(self) -> float:
+        return self._timestamp_updated
+
     @property
     def logger_path(self) -> str:
         return self.__logger_path
@@ -99,8 +117,7 @@ class WeConnectVehicleDataProperty:
     def logger_value_format(self) -> tuple:
         return (
             self.custom_value_format(translate=False, include_unit=True),
-            self._time_updated,
-            self._date_updated,
+            format_log_time(self._timestamp_updated),
         )
 
     def custom_value_format(self, translate=False, include_unit=True) -> str:
@@ -130,10 +147,49 @@ class WeConnectVehicleDataProperty:
             self._value.value if isinstance(self._value, Enum) else self._value
         )
 
-        self._time_updated = datetime.now().time().strftime("%H.%M:%S")
-        self._date_updated = datetime.now().date().strftime("%d.%m.%Y")
+        self._set_update_time()
+
+        self._on_value_update()
+
+    def _on_value_update(self) -> None:
+        if self.__change_filter is None:
+            self._notify()
+            return
 
-        for callback in self._callback_functions.values():
+        delay = self.__change_filter.get_delay(self._value, time.monotonic())
+        if delay is None:
+            return
+        if delay == 0:
+            self._notify()
+            return
+        if self.__change_filter.trailing_edge:
+            self.__schedule_trailing_notification(delay)
+
+    def __schedule_trailing_notification(self, delay: float) -> None:
+        with self.__notify_lock:
+            if self.__trailing_timer is not None:
+                return
+            self.__trailing_timer = Timer(
+                interval=delay, function=self.__on_trailing_timer
+            )
+            self.__trailing_timer.daemon = True
+            self.__trailing_timer.start()
+
+    def __on_trailing_timer(self) -> None:
+        with self.__notify_lock:
+            self.__trailing_timer = None
+        self._on_value_update()
+
+    def _notify(self) -> None:
+        with self.__notify_lock:
+            if self.__trailing_timer is not None:
+                self.__trailing_timer.cancel()
+                self.__trailing_timer = None
+            if self.__change_filter is not None:
+                self.__change_filter.mark_delivered(self._value, time.monotonic())
+
+        # Callbacks run without the lock, because they may update this data property again
+        for callback in list(self._callback_functions.values()):
             if callback["specific values"] is None:
                 callback["function"](*callback["args"])
             elif self._value in callback["specific values"]:
@@ -141,6 +197,19 @@ class WeConnectVehicleDataProperty:
 
         self.log()
 
+    def set_change_filter(self, change_filter: DataPropertyChangeFilter) -> None:
+        """
+        Sets filter which decides which value changes are delivered to the callback functions and the logger.
+
+        Args:
+            change_filter (DataPropertyChangeFilter): Filter for the value changes. None removes the filter.
+        """
+
+        LOG.debug(f"Setting change filter on WeconnectVehicleDataProperty (ID: {self._id})")
+        self.__change_filter = change_filter
+        if change_filter is not None:
+            change_filter.mark_delivered(self._value, time.monotonic())
+
     def add_callback_function(
         self, id, function: callable, args: list = None, specific_values: list = None
     ) -> None:
@@ -173,10 +242,26 @@ class WeConnectVehicleDataProperty:
     def log(self) -> None:
         if not self.__logging_enabled:
             return
-        try:
-            log_data(self)
-        except WeConnectLoggerError as e:
-            LOG.exception(e)
+        self.__write_log_records(self.__log_policy.observe(self))
+
+    def log_heartbeat(self, now: float = None) -> None:
+        """
+        Writes the current value again if the heartbeat interval of the log policy has passed.
+
+        Args:
+            now (float, optional): Current POSIX timestamp. Defaults to None.
+        """
+
+        if not self.__logging_enabled:
+            return
+        self.__write_log_records(self.__log_policy.heartbeat(self, now))
+
+    def __write_log_records(self, records: list) -> None:
+        for record in records:
+            try:
+                log_record(record)
+            except WeConnectLoggerError as e:
+                LOG.exception(e)
 
     def add_translations(self, translations: dict) -> None:
         """
@@ -192,12 +277,15 @@ class WeConnectVehicleDataProperty:
             )
             self.__translations = translations
 
-    def set_logging(self, logging_enabled: bool, path: str) -> None:
+    def set_logging(
+        self, logging_enabled: bool, path: str, log_policy: DataLogPolicy = None
+    ) -> None:
         """
         Used to enable logging for the data property values.
 
         Args:
             path (str): Path of the .csv file where logs will get saved.
+            log_policy (DataLogPolicy, optional): Decides which values are written. Defaults to logging every value.
         """
 
         LOG.debug(
@@ -206,8 +294,15 @@ class WeConnectVehicleDataProperty:
                 f"{', logs will be saved to {path}' if logging_enabled else ''}"
             )
         )
+        if self.__log_policy is not None:
+            self.__write_log_records(self.__log_policy.close())
         self.__logging_enabled = logging_enabled
         self.__logger_path = path
+        self.__log_policy = (
+            (DataLogPolicy() if log_policy is None else log_policy)
+            if logging_enabled
+            else None
+        )
         self.log()
 
     def as_json(self) -> str:
@@ -264,6 +359,7 @@ class CalculatedWeConnectVehicleDataProperty(WeConnectVehicleDataProperty):
             unit=unit,
         )
         self.__formula = formula
+        self.__weconnect_element = weconnect_element
         calculation = self.__formula(weconnect_element.value)
         self._value = calculation
         self._value_string = str(calculation)
@@ -272,21 +368,86 @@ class CalculatedWeConnectVehicleDataProperty(WeConnectVehicleDataProperty):
             flag=AddressableLeaf.ObserverEvent.VALUE_CHANGED,
             priority=AddressableLeaf.ObserverPriority.INTERNAL_HIGH,
         )
-        self._time_updated = datetime.now().time().strftime("%H.%M:%S")
-        self._date_updated = datetime.now().date().strftime("%d.%m.%Y")
+        self._set_update_time()
 
     def __update_value(self, element, flags) -> None:
         calculation = self.__formula(element.value)
         self._value = calculation
         self._value_string = str(calculation)
 
-        self._time_updated = datetime.now().time().strftime("%H.%M:%S")
-        self._date_updated = datetime.now().date().strftime("%d.%m.%Y")
+        self._set_update_time()
 
-        for callback in self._callback_functions.values():
-            if callback["specific values"] is None:
-                callback["function"](*callback["args"])
-            elif self._value in callback["specific values"]:
-                callback["function"](*callback["args"])
+        self._on_value_update()
 
-        self.log()
+    def set_formula(self, formula: callable) -> None:
+        """
+        Replaces the formula and calculates the value again. Callback functions are called if the value changed.
+
+        Args:
+            formula (callable): Function used to calculate the value for the data property.
+        """
+
+        LOG.debug(f"Setting new formula for CalculatedWeConnectVehicleDataProperty (ID: {self._id})")
+        self.__formula = formula
+        if self.__weconnect_element.value is None:
+            return
+        calculation = self.__formula(self.__weconnect_element.value)
+        if calculation == self._value:
+            return
+        self._value = calculation
+        self._value_string = str(calculation)
+
+        self._set_update_time()
+
+        self._on_value_update()
+
+
+class ExternalDataProperty(WeConnectVehicleDataProperty):
+    def __init__(
+        self,
+        id: str,
+        category: str,
+        value=None,
+        desc: str = None,
+        unit: str = None,
+    ) -> None:
+        """
+        Used to provide data which doesn't come from the WeConnect-API (e.g. electricity prices) the same way as vehicle data,
+        so it can be used by LCDItems, LEDTriggers and WeConnectLCDMessages.
+
+        Args:
+            id (str): ID of the data property
+            category (str): Category where the data property belongs to.
+            value (optional): Initial value of the data property. Defaults to None.
+            desc (str, optional): Description for the data property. Defaults to None.
+            unit (str, optional): Unit for the data property. Defaults to None.
+        """
+
+        LOG.debug(f"Initializing ExternalDataProperty (ID: {id})")
+        super().__init__(
+            id=id,
+            weconnect_element=None,
+            desc=desc,
+            category=category,
+            unit=unit,
+        )
+        self._value = value
+        self._value_string = str(value.value if isinstance(value, Enum) else value)
+        self._set_update_time()
+
+    def update_value(self, value) -> None:
+        """
+        Sets new value for the data property. Callback functions are called only if the value changed.
+
+        Args:
+            value: The new value.
+        """
+
+        if value == self._value:
+            return
+        self._value = value
+        self._value_string = str(value.value if isinstance(value, Enum) else value)
+
+        self._set_update_time()
+
+        self._on_value_update()
@@ -0,0 +1,73 @@
+from datetime import datetime
+from types import MappingProxyType
+
+
+class WeConnectVehicleSnapshot:
+    __slots__ = ("__version", "__values", "__changed_ids", "__time")
+
+    def __init__(
+        self, version: int, values: dict, changed_ids: frozenset, time: datetime
+    ) -> None:
+        '''
+        Immutable view of the WeConnectVehicleDataProperty values at the end of an update cycle.
+        Snapshots are never modified after creation, so they can be read without locking.
+
+        Args:
+            version (int): Version of the snapshot. Grows by one every time a snapshot with changes is published.
+            values (dict): WeConnectVehicleDataProperty values in ID - value pairs. The dict must not be modified afterwards.
+            changed_ids (frozenset): IDs of the WeConnectVehicleDataProperties which changed since the previous version.
+            time (datetime): Time when the snapshot was published.
+        '''
+
+        self.__version = version
+        self.__values = MappingProxyType(values)
+        self.__changed_ids = changed_ids
+        self.__time = time
+
+    def __getitem__(self, data_property_id: str):
+        return self.__values[data_property_id]
+
+    def __contains__(self, data_property_id: str) -> bool:
+        return data_property_id in self.__values
+
+    def get(self, data_property_id: str, default=None):
+        return self.__values.get(data_property_id, default)
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    @property
+    def values(self) -> MappingProxyType:
+        return self.__values
+
+    @property
+    def changed_ids(self) -> frozenset:
+        return self.__changed_ids
+
+    @property
+    def time(self) -> datetime:
+        return self.__time
+
+    def derive(self, changes: dict, time: datetime):
+        '''
+        Creates the next version of the snapshot. Values are shared with this snapshot except for the given changes.
+
+        Args:
+            changes (dict): Changed values in ID - value pairs.
+            time (datetime): Time when the new snapshot is published.
+
+        Returns:
+            WeConnectVehicleSnapshot: New snapshot, or this snapshot if there are no changes.
+        '''
+
+        if not changes:
+            return self
+        values = dict(self.__values)
+        values.update(changes)
+        return WeConnectVehicleSnapshot(
+            version=self.__version + 1,
+            values=values,
+            changed_ids=frozenset(changes),
+            time=time,
+        )
@@ -0,0 +1,353 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple
+if TYPE_CHECKING:
+    from weconnect_id.tools.charging_sessions import ChargingSessionTracker
+    from weconnect_id.vehicle import WeConnectVehicle
+from weconnect_id.data_providers.vehicle_data_property import (
+    CalculatedWeConnectVehicleDataProperty,
+    ExternalDataProperty,
+)
+from weconnect_id.data_providers.data_property_catalog import NOMINAL_BATTERY_CAPACITY
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+import json
+import logging
+import numpy
+
+
+LOG = logging.getLogger("battery_capacity")
+
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+class CapacityFit(NamedTuple):
+    capacity: float
+    standard_error: float
+    weights: numpy.ndarray
+
+
+class CapacityEstimate(NamedTuple):
+    capacity: float
+    confidence: float
+    trend: float
+    sessions: int
+
+
+def fit_capacity(
+    soc_deltas: numpy.ndarray,
+    energies: numpy.ndarray,
+    initial_capacity: float = None,
+    tuning: float = 1.345,
+    iterations: int = 50,
+) -> CapacityFit:
+    '''
+    Fits the usable battery capacity as the slope of energy against SOC delta through the origin.
+    Huber weights are solved with iteratively reweighted least squares, so sessions with wrong power samples
+    or SOC jumps don't move the estimate much. Each iteration is vectorized over all sessions.
+
+    Args:
+        soc_deltas (numpy.ndarray): SOC change of each session as percentage.
+        energies (numpy.ndarray): Energy charged in each session in kWh.
+        initial_capacity (float, optional): Starting point of the iteration, e.g. the previous estimate.
+            Defaults to None, which starts from the ordinary least squares fit.
+        tuning (float, optional): Huber tuning constant in robust standard deviations. Defaults to 1.345.
+        iterations (int, optional): Maximum amount of iterations. Defaults to 50.
+
+    Returns:
+        CapacityFit: Capacity in kWh, its standard error and the final weights of the sessions.
+    '''
+
+    x = numpy.asarray(soc_deltas, dtype=float) / 100
+    y = numpy.asarray(energies, dtype=float)
+    weights = numpy.ones_like(x)
+    capacity = (
+        numpy.dot(x, y) / numpy.dot(x, x)
+        if initial_capacity is None
+        else float(initial_capacity)
+    )
+    for _ in range(iterations):
+        residuals = y - capacity * x
+        # Median absolute deviation scaled to the standard deviation of normally distributed residuals
+        scale = 1.4826 * numpy.median(numpy.abs(residuals - numpy.median(residuals)))
+        if scale <= 0:
+            break
+        weights = numpy.minimum(1.0, tuning * scale / numpy.maximum(numpy.abs(residuals), 1e-12))
+        new_capacity = numpy.dot(weights * x, y) / numpy.dot(weights * x, x)
+        if abs(new_capacity - capacity) < 1e-6:
+            capacity = new_capacity
+            break
+        capacity = new_capacity
+
+    residuals = y - capacity * x
+    degrees_of_freedom = max(len(x) - 1, 1)
+    variance = numpy.dot(weights, residuals ** 2) / degrees_of_freedom
+    standard_error = float(numpy.sqrt(variance / numpy.dot(weights * x, x)))
+    return CapacityFit(capacity=float(capacity), standard_error=standard_error, weights=weights)
+
+
+def fit_capacity_trend(
+    soc_deltas: numpy.ndarray,
+    energies: numpy.ndarray,
+    timestamps: numpy.ndarray,
+    weights: numpy.ndarray,
+) -> float:
+    '''
+    Fits the change of the capacity over time from the capacities of the single sessions.
+    Sessions are weighted with their robust weights and SOC deltas, because short sessions are the least accurate.
+
+    Returns:
+        float: Change of the capacity in kWh per year.
+    '''
+
+    x = numpy.asarray(soc_deltas, dtype=float) / 100
+    capacities = numpy.asarray(energies, dtype=float) / x
+    years = (numpy.asarray(timestamps, dtype=float) - numpy.min(timestamps)) / SECONDS_PER_YEAR
+    trend_weights = numpy.asarray(weights, dtype=float) * x
+    mean_year = numpy.average(years, weights=trend_weights)
+    mean_capacity = numpy.average(capacities, weights=trend_weights)
+    spread = numpy.dot(trend_weights, (years - mean_year) ** 2)
+    if spread <= 0:
+        return 0.0
+    return float(numpy.dot(trend_weights, (years - mean_year) * (capacities - mean_capacity)) / spread)
+
+
+class BatteryCapacityEstimator:
+    def __init__(
+        self,
+        sessions_path: str,
+        nominal_capacity: float = NOMINAL_BATTERY_CAPACITY,
+        minimum_sessions: int = 3,
+        minimum_soc_delta: float = 10,
+        minimum_confidence: float = 0.5,
+        minimum_trend_days: float = 30,
+    ) -> None:
+        '''
+        Estimates the usable battery capacity from the charging sessions recorded by ChargingSessionTracker.
+        Only the sessions of the selected vehicle are used, so vehicles with different battery packs don't mix.
+        The estimate is fitted when the vehicle is selected and updated after each finished session of the vehicle.
+
+        batteryCharge of the vehicle is calculated with the estimated capacity once the confidence is high enough.
+        The estimate is published as batteryCapacity, batteryCapacityConfidence and batteryCapacityTrend data properties.
+
+        Args:
+            sessions_path (str): Path of the JSON Lines file of the charging sessions.
+            nominal_capacity (float, optional): Capacity in kWh used until the estimate is confident.
+                Defaults to NOMINAL_BATTERY_CAPACITY.
+            minimum_sessions (int, optional): Amount of sessions needed for an estimate. Defaults to 3.
+            minimum_soc_delta (float, optional): Sessions with a smaller SOC change in percentage points are ignored,
+                because the rounding of the SOC makes them inaccurate. Defaults to 10.
+            minimum_confidence (float, optional): Confidence between 0 and 1 needed to use the estimate. Defaults to 0.5.
+            minimum_trend_days (float, optional): Days the sessions have to cover before the trend is reported. Defaults to 30.
+        '''
+
+        LOG.debug("Initializing BatteryCapacityEstimator")
+        self.__sessions_path = Path(sessions_path)
+        self.__nominal_capacity = nominal_capacity
+        self.__minimum_sessions = minimum_sessions
+        self.__minimum_soc_delta = minimum_soc_delta
+        self.__minimum_confidence = minimum_confidence
+        self.__minimum_trend_days = minimum_trend_days
+        self.__lock = Lock()
+        self.__sessions = []
+        self.__vin = None
+        self.__soc_deltas = numpy.empty(0)
+        self.__energies = numpy.empty(0)
+        self.__timestamps = numpy.empty(0)
+        self.__estimate = CapacityEstimate(capacity=None, confidence=0.0, trend=None, sessions=0)
+        self.__battery_charge = None
+
+        self.__capacity_data_property = ExternalDataProperty(
+            id="batteryCapacity",
+            category="battery",
+            desc="Estimated usable battery capacity in kWh",
+            unit="kWh",
+        )
+        self.__confidence_data_property = ExternalDataProperty(
+            id="batteryCapacityConfidence",
+            category="battery",
+            value=0,
+            desc="Confidence of the estimated battery capacity as percentage",
+            unit="%",
+        )
+        self.__trend_data_property = ExternalDataProperty(
+            id="batteryCapacityTrend",
+            category="battery",
+            desc="Change of the estimated battery capacity in kWh per year",
+            unit="kWh/a",
+        )
+
+        self.__load_sessions()
+        self.__refit()
+        LOG.debug("Successfully initialized BatteryCapacityEstimator")
+
+    @classmethod
+    def from_config(cls, config: dict, charging_session_tracker: ChargingSessionTracker):
+        '''
+        Creates BatteryCapacityEstimator if the "battery capacity" config exists and charging sessions are tracked, e.g.
+        {"nominal": 58, "minimum sessions": 3, "minimum soc delta": 10, "minimum confidence": 0.5}.
+        The estimator is updated with the sessions of the given tracker.
+
+        Returns:
+            BatteryCapacityEstimator: None if the estimator is not configured.
+        '''
+
+        capacity_config = config.get("battery capacity")
+        if capacity_config is None or not capacity_config.get("enabled", True):
+            return None
+        if charging_session_tracker is None:
+            LOG.warning("Battery capacity can't be estimated without the charging sessions config")
+            return None
+        estimator = cls(
+            sessions_path=charging_session_tracker.path,
+            nominal_capacity=capacity_config.get("nominal", NOMINAL_BATTERY_CAPACITY),
+            minimum_sessions=capacity_config.get("minimum sessions", 3),
+            minimum_soc_delta=capacity_config.get("minimum soc delta", 10),
+            minimum_confidence=capacity_config.get("minimum confidence", 0.5),
+            minimum_trend_days=capacity_config.get("minimum trend days", 30),
+        )
+        charging_session_tracker.add_session_callback(id="BATTERY_CAPACITY", function=estimator.add_session)
+        return estimator
+
+    def __parse_session(self, session: dict) -> tuple:
+        try:
+            vin = session["vin"]
+            soc_delta = float(session["end_level"]) - float(session["start_level"])
+            energy = float(session["energy_kwh"])
+            timestamp = datetime.fromisoformat(session["end"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return None
+        # Interrupted sessions cover only a part of the charge
+        if soc_delta < self.__minimum_soc_delta or energy <= 0 or session.get("interrupted", False):
+            return None
+        return vin, soc_delta, energy, timestamp
+
+    def __load_sessions(self) -> None:
+        if not self.__sessions_path.exists():
+            return
+        rows = []
+        try:
+            with open(self.__sessions_path, "r") as sessions_file:
+                for line in sessions_file:
+                    try:
+                        row = self.__parse_session(json.loads(line))
+                    except ValueError:
+                        continue
+                    if row is not None:
+                        rows.append(row)
+        except OSError as e:
+            LOG.exception(e)
+            return
+        self.__sessions = rows
+        LOG.debug(f"Loaded {len(rows)} charging sessions for the battery capacity estimate")
+
+    def __select_sessions(self) -> None:
+        rows = [row[1:] for row in self.__sessions if row[0] is not None and row[0] == self.__vin]
+        self.__soc_deltas, self.__energies, self.__timestamps = (
+            numpy.array(column, dtype=float) for column in (zip(*rows) if rows else ((), (), ()))
+        )
+        # Estimate of the previous vehicle is not a starting point for the fit of another battery
+        self.__estimate = CapacityEstimate(capacity=None, confidence=0.0, trend=None, sessions=0)
+
+    def add_session(self, session: dict) -> None:
+        '''
+        Updates the estimate with a finished charging session of the selected vehicle.
+        Sessions with too small SOC change are ignored.
+
+        Args:
+            session (dict): Session in the format of ChargingSession.to_dict().
+        '''
+
+        row = self.__parse_session(session)
+        if row is None:
+            LOG.debug("Charging session ignored for the battery capacity estimate")
+            return
+        with self.__lock:
+            self.__sessions.append(row)
+            vin, soc_delta, energy, timestamp = row
+            if vin is None or vin != self.__vin:
+                return
+            self.__soc_deltas = numpy.append(self.__soc_deltas, soc_delta)
+            self.__energies = numpy.append(self.__energies, energy)
+            self.__timestamps = numpy.append(self.__timestamps, timestamp)
+            self.__refit()
+
+    def __refit(self) -> None:
+        sessions = len(self.__soc_deltas)
+        if sessions == 0:
+            self.__publish(CapacityEstimate(capacity=None, confidence=0.0, trend=None, sessions=0))
+            return
+
+        # The previous estimate is used as the starting point, so an update converges in a few iterations
+        fit = fit_capacity(self.__soc_deltas, self.__energies, initial_capacity=self.__estimate.capacity)
+        confidence = 0.0
+        if sessions >= self.__minimum_sessions and fit.capacity > 0:
+            # Relative half-width of the 95 % confidence interval
+            confidence = float(numpy.clip(1 - 1.96 * fit.standard_error / fit.capacity, 0, 1))
+        trend = None
+        if (
+            sessions >= self.__minimum_sessions
+            and numpy.ptp(self.__timestamps) >= self.__minimum_trend_days * 86400
+        ):
+            trend = fit_capacity_trend(self.__soc_deltas, self.__energies, self.__timestamps, fit.weights)
+        estimate = CapacityEstimate(capacity=fit.capacity, confidence=confidence, trend=trend, sessions=sessions)
+        LOG.info(f"Battery capacity estimated (Estimate: {estimate})")
+        self.__publish(estimate)
+
+    def __publish(self, estimate: CapacityEstimate) -> None:
+        self.__estimate = estimate
+        self.__capacity_data_property.update_value(
+            None if estimate.capacity is None else round(estimate.capacity, 1)
+        )
+        self.__confidence_data_property.update_value(round(estimate.confidence * 100))
+        self.__trend_data_property.update_value(None if estimate.trend is None else round(estimate.trend, 2))
+        self.__apply_capacity()
+
+    def __apply_capacity(self) -> None:
+        if self.__battery_charge is None:
+            return
+        capacity = self.capacity
+        self.__battery_charge.set_formula(lambda x: round(x / 100 * capacity, 2))
+
+    def set_vehicle(self, weconnect_vehicle: WeConnectVehicle) -> None:
+        '''
+        Fits the estimate from the sessions of the vehicle, adds the estimate data properties to the vehicle
+        and calculates its batteryCharge with the estimated capacity.
+        '''
+
+        for data_property in self.data_properties:
+            weconnect_vehicle.add_external_data_property(data_property)
+        with self.__lock:
+            try:
+                battery_charge = weconnect_vehicle.get_data_property("batteryCharge")
+            except KeyError:
+                battery_charge = None
+            if not isinstance(battery_charge, CalculatedWeConnectVehicleDataProperty):
+                battery_charge = None
+            self.__battery_charge = battery_charge
+            self.__vin = weconnect_vehicle.vin
+            self.__select_sessions()
+            self.__refit()
+
+    @property
+    def capacity(self) -> float:
+        '''
+        Estimated capacity in kWh if the confidence is high enough, otherwise the nominal capacity.
+        '''
+
+        if self.__estimate.capacity is None or self.__estimate.confidence < self.__minimum_confidence:
+            return self.__nominal_capacity
+        return self.__estimate.capacity
+
+    @property
+    def estimate(self) -> CapacityEstimate:
+        return self.__estimate
+
+    @property
+    def data_properties(self) -> tuple:
+        return (
+            self.__capacity_data_property,
+            self.__confidence_data_property,
+            self.__trend_data_property,
+        )
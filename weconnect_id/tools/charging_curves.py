@@ -0,0 +1,453 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from weconnect_id.tools.updater import WeConnectUpdater
+    from weconnect_id.vehicle import WeConnectVehicle
+from weconnect_id.data_providers.vehicle_data_property import ExternalDataProperty
+from weconnect_id.data_providers.data_property_catalog import NOMINAL_BATTERY_CAPACITY
+from weconnect.elements.charging_status import ChargingStatus
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock, Timer
+import json
+import os
+import time
+import logging
+import numpy
+
+
+LOG = logging.getLogger("charging_curves")
+
+
+class ChargingCurveModel:
+    CHARGE_TYPES = (ChargingStatus.ChargeType.AC, ChargingStatus.ChargeType.DC)
+    SOC_LEVELS = 101
+
+    def __init__(
+        self,
+        temperature_edges: tuple = (0, 10, 20, 30),
+        default_power: dict = None,
+        smoothing: float = 0.2,
+    ) -> None:
+        '''
+        Learns charging power against battery level for each charge type and battery temperature bucket.
+
+        Learned powers are kept on a 1 % battery level grid. After each sample the time tables are rebuilt, so the
+        charging time between two battery levels is read with two table lookups. Each table holds the remaining
+        hours per kWh of battery capacity from each level to 100 %. Levels without samples are interpolated
+        from the learned levels of the same curve. Curves without samples use the curve learned over all temperatures,
+        and charge types without samples use the default power. Samples without battery temperature are learned
+        only into the curve of all temperatures.
+
+        Args:
+            temperature_edges (tuple, optional): Edges of the battery temperature buckets in °C. Defaults to (0, 10, 20, 30).
+            default_power (dict, optional): Charging power in kW for "ac" and "dc" used before anything is learned.
+                Defaults to 11 kW for AC and 50 kW for DC.
+            smoothing (float, optional): Weight of a new sample in the exponential moving average of a level. Defaults to 0.2.
+        '''
+
+        self.__temperature_edges = numpy.array(temperature_edges, dtype=float)
+        default_power = {} if default_power is None else default_power
+        self.__default_power = numpy.array(
+            [default_power.get("ac", 11), default_power.get("dc", 50)], dtype=float
+        )
+        self.__smoothing = smoothing
+        buckets = len(self.__temperature_edges) + 1
+        # The last bucket holds samples without temperature, which are learned only into the curve of all temperatures
+        shape = (len(self.CHARGE_TYPES), buckets + 1, self.SOC_LEVELS)
+        self.__power = numpy.full(shape, numpy.nan)
+        self.__samples = numpy.zeros(shape, dtype=int)
+        # The last bucket of the time tables is the curve learned over all temperatures
+        self.__time_tables = numpy.zeros((len(self.CHARGE_TYPES), buckets + 1, self.SOC_LEVELS))
+        for type_index in range(len(self.CHARGE_TYPES)):
+            self.__rebuild(type_index)
+
+    def __get_type_index(self, charge_type: ChargingStatus.ChargeType) -> int:
+        try:
+            return self.CHARGE_TYPES.index(charge_type)
+        except ValueError:
+            return None
+
+    def __get_bucket(self, temperature: float) -> int:
+        if temperature is None:
+            return len(self.__temperature_edges) + 1
+        return int(numpy.digitize(temperature, self.__temperature_edges))
+
+    def __fill_curve(self, power: numpy.ndarray, fallback: numpy.ndarray) -> numpy.ndarray:
+        learned = ~numpy.isnan(power)
+        if not learned.any():
+            return fallback
+        levels = numpy.arange(self.SOC_LEVELS)
+        return numpy.interp(levels, levels[learned], power[learned])
+
+    def __rebuild(self, type_index: int) -> None:
+        power = self.__power[type_index]
+        samples = self.__samples[type_index]
+        total = samples.sum(axis=0)
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            merged = numpy.sum(numpy.nan_to_num(power) * samples, axis=0) / total
+        merged[total == 0] = numpy.nan
+        merged = self.__fill_curve(merged, numpy.full(self.SOC_LEVELS, self.__default_power[type_index]))
+
+        curves = numpy.vstack([self.__fill_curve(bucket, merged) for bucket in power[:-1]] + [merged])
+        # Charging from level k to k + 1 takes 1 % of the capacity with the average power of the two levels
+        hours_per_kwh = 0.01 / numpy.maximum((curves[:, :-1] + curves[:, 1:]) / 2, 0.1)
+        tables = numpy.zeros_like(curves)
+        tables[:, :-1] = numpy.cumsum(hours_per_kwh[:, ::-1], axis=1)[:, ::-1]
+        self.__time_tables[type_index] = tables
+
+    def add_sample(
+        self,
+        charge_type: ChargingStatus.ChargeType,
+        temperature: float,
+        battery_level: float,
+        power: float,
+    ) -> bool:
+        '''
+        Learns charging power at a battery level.
+
+        Args:
+            charge_type (ChargingStatus.ChargeType): Charge type of the sample. Only AC and DC are learned.
+            temperature (float): Battery temperature in °C. None if not known.
+            battery_level (float): Battery level as percentage.
+            power (float): Charging power in kW.
+
+        Returns:
+            bool: True if the sample was learned.
+        '''
+
+        type_index = self.__get_type_index(charge_type)
+        if type_index is None or battery_level is None or power is None or power <= 0:
+            return False
+        level = int(numpy.clip(round(battery_level), 0, self.SOC_LEVELS - 1))
+        bucket = self.__get_bucket(temperature)
+        previous = self.__power[type_index, bucket, level]
+        if numpy.isnan(previous):
+            self.__power[type_index, bucket, level] = power
+        else:
+            self.__power[type_index, bucket, level] = previous + self.__smoothing * (power - previous)
+        self.__samples[type_index, bucket, level] += 1
+        self.__rebuild(type_index)
+        return True
+
+    def __lookup(self, table: numpy.ndarray, battery_level: float) -> float:
+        position = min(max(battery_level, 0.0), self.SOC_LEVELS - 1.0)
+        index = min(int(position), self.SOC_LEVELS - 2)
+        fraction = position - index
+        return table[index] + (table[index + 1] - table[index]) * fraction
+
+    def get_charging_hours(
+        self,
+        charge_type: ChargingStatus.ChargeType,
+        temperature: float,
+        battery_level: float,
+        target_level: float,
+        capacity: float,
+    ) -> float:
+        '''
+        Gets the charging time between two battery levels with table lookups.
+
+        Args:
+            charge_type (ChargingStatus.ChargeType): Charge type of the charging.
+            temperature (float): Battery temperature in °C. None uses the curve learned over all temperatures.
+            battery_level (float): Current battery level as percentage.
+            target_level (float): Target battery level as percentage.
+            capacity (float): Usable battery capacity in kWh.
+
+        Returns:
+            float: Charging time in hours. None if the charge type is not AC nor DC.
+        '''
+
+        type_index = self.__get_type_index(charge_type)
+        if type_index is None:
+            return None
+        table = self.__time_tables[type_index, self.__get_bucket(temperature)]
+        hours_per_kwh = self.__lookup(table, battery_level) - self.__lookup(table, target_level)
+        return max(hours_per_kwh, 0.0) * capacity
+
+    def to_dict(self) -> dict:
+        return {
+            "temperature_edges": self.__temperature_edges.tolist(),
+            "power": numpy.where(numpy.isnan(self.__power), None, self.__power).tolist(),
+            "samples": self.__samples.tolist(),
+        }
+
+    def load_dict(self, data: dict) -> bool:
+        '''
+        Loads curves saved with to_dict. Curves with different temperature buckets are not loaded.
+
+        Returns:
+            bool: True if the curves were loaded.
+        '''
+
+        power = numpy.array(data["power"], dtype=float)
+        samples = numpy.array(data["samples"], dtype=int)
+        if (
+            not numpy.array_equal(numpy.array(data["temperature_edges"], dtype=float), self.__temperature_edges)
+            or power.shape != self.__power.shape
+            or samples.shape != self.__samples.shape
+        ):
+            return False
+        self.__power = power
+        self.__samples = samples
+        for type_index in range(len(self.CHARGE_TYPES)):
+            self.__rebuild(type_index)
+        return True
+
+    @property
+    def samples(self) -> int:
+        return int(self.__samples.sum())
+
+
+class ChargeTimeEstimator:
+    DATA_PROPERTY_IDS = (
+        "batteryLevel",
+        "batteryCharge",
+        "targetBatteryLevel",
+        "chargePower",
+        "chargeState",
+        "chargeType",
+        "batteryTemperatureMin",
+        "batteryTemperatureMax",
+    )
+    OPTIONAL_DATA_PROPERTY_IDS = ("batteryCharge", "batteryTemperatureMin", "batteryTemperatureMax")
+
+    def __init__(
+        self,
+        path: str,
+        weconnect_updater: WeConnectUpdater,
+        model: ChargingCurveModel = None,
+        battery_capacity: float = NOMINAL_BATTERY_CAPACITY,
+        interval: float = 30,
+    ) -> None:
+        '''
+        Estimates the remaining charging time from the charging curves learned from the charging power.
+
+        Curves are learned at the end of each update cycle while the vehicle is charging and saved when charging stops.
+        The estimate is made at each update cycle. Between the update cycles it counts down along the learned curve,
+        so chargeTimeEstimate and chargeCompletionTime stay smooth while the chargeTimeRemaining of the
+        WeConnect-API changes only at the update cycles.
+
+        Args:
+            path (str): Path of the JSON file for the learned curves.
+            weconnect_updater (WeConnectUpdater): Calls the estimator at the end of each update cycle.
+            model (ChargingCurveModel, optional): Model for the curves. Defaults to ChargingCurveModel with the default settings.
+            battery_capacity (float, optional): Usable battery capacity in kWh used if it can't be calculated
+                from batteryCharge. Defaults to NOMINAL_BATTERY_CAPACITY.
+            interval (float, optional): Seconds between the estimate updates between the update cycles. Defaults to 30.
+        '''
+
+        LOG.debug("Initializing ChargeTimeEstimator")
+        self.__path = Path(path)
+        self.__model = ChargingCurveModel() if model is None else model
+        self.__battery_capacity = battery_capacity
+        self.__interval = interval
+        self.__lock = Lock()
+        self.__data_properties = None
+        self.__anchor = None
+        self.__learned = False
+        self.__last_sample = None
+        self.__timer = None
+        self.__stopped = False
+
+        self.__time_data_property = ExternalDataProperty(
+            id="chargeTimeEstimate",
+            category="battery",
+            desc="Estimated remaining charging time in minutes",
+            unit="min",
+        )
+        self.__completion_data_property = ExternalDataProperty(
+            id="chargeCompletionTime",
+            category="battery",
+            desc="Estimated time when charging is completed",
+        )
+
+        self.__load_model()
+        weconnect_updater.add_update_callback(id="CHARGE_TIME_ESTIMATE", function=self.update)
+        LOG.debug("Successfully initialized ChargeTimeEstimator")
+
+    @classmethod
+    def from_config(cls, config: dict, weconnect_updater: WeConnectUpdater):
+        '''
+        Creates ChargeTimeEstimator if the "charge time estimate" config exists, e.g.
+        {"temperature edges": [0, 10, 20, 30], "default power": {"ac": 11, "dc": 50}, "interval": 30}.
+        Curves are saved to the "charging curves" path, which defaults to charging_curves.json next to the data logs.
+
+        Returns:
+            ChargeTimeEstimator: None if the estimator is not configured.
+        '''
+
+        estimate_config = config.get("charge time estimate")
+        if estimate_config is None or not estimate_config.get("enabled", True):
+            return None
+        return cls(
+            path=config["paths"].get(
+                "charging curves",
+                os.path.join(os.path.dirname(config["paths"]["data_logs"]), "charging_curves.json"),
+            ),
+            weconnect_updater=weconnect_updater,
+            model=ChargingCurveModel(
+                temperature_edges=tuple(estimate_config.get("temperature edges", (0, 10, 20, 30))),
+                default_power=estimate_config.get("default power"),
+                smoothing=estimate_config.get("smoothing", 0.2),
+            ),
+            battery_capacity=config.get("battery capacity", {}).get("nominal", NOMINAL_BATTERY_CAPACITY),
+            interval=estimate_config.get("interval", 30),
+        )
+
+    def __load_model(self) -> None:
+        if not self.__path.exists():
+            return
+        try:
+            with open(self.__path, "r") as curves_file:
+                loaded = self.__model.load_dict(json.load(curves_file))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOG.error(f"Failed to load charging curves (Error: {e})")
+            return
+        if loaded:
+            LOG.info(f"Loaded charging curves (Samples: {self.__model.samples})")
+        else:
+            LOG.warning("Saved charging curves have different temperature buckets and were not loaded")
+
+    def __save_model(self) -> None:
+        try:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.__path.with_suffix(".tmp")
+            with open(temporary_path, "w") as curves_file:
+                json.dump(self.__model.to_dict(), curves_file)
+            os.replace(temporary_path, self.__path)
+        except OSError as e:
+            LOG.exception(e)
+            return
+        self.__learned = False
+        LOG.debug(f"Saved charging curves (Samples: {self.__model.samples})")
+
+    def set_vehicle(self, weconnect_vehicle: WeConnectVehicle) -> None:
+        '''
+        Starts estimating the charging time of the vehicle and adds the estimate data properties to it.
+        '''
+
+        for data_property in self.data_properties:
+            weconnect_vehicle.add_external_data_property(data_property)
+        with self.__lock:
+            data_properties = {}
+            for data_id in self.DATA_PROPERTY_IDS:
+                try:
+                    data_properties[data_id] = weconnect_vehicle.get_data_property(data_id)
+                except KeyError as e:
+                    if data_id in self.OPTIONAL_DATA_PROPERTY_IDS:
+                        continue
+                    LOG.error(f"Charging time can't be estimated, data property {e} is not available")
+                    data_properties = None
+                    break
+            self.__data_properties = data_properties
+            self.__last_sample = None
+            self.__set_anchor(None)
+
+    def __get_temperature(self, values: dict) -> float:
+        temperatures = [
+            values.get(data_id)
+            for data_id in ("batteryTemperatureMin", "batteryTemperatureMax")
+            if values.get(data_id) is not None
+        ]
+        if not temperatures:
+            return None
+        return sum(temperatures) / len(temperatures)
+
+    def __get_capacity(self, values: dict) -> float:
+        level = values["batteryLevel"]
+        charge = values.get("batteryCharge")
+        if charge is not None and level is not None and level > 0:
+            return charge / level * 100
+        return self.__battery_capacity
+
+    def update(self) -> None:
+        with self.__lock:
+            if self.__data_properties is None:
+                return
+            values = {data_id: data_property.value for data_id, data_property in self.__data_properties.items()}
+            charging = values["chargeState"] == ChargingStatus.ChargingState.CHARGING
+            if not charging:
+                if self.__learned:
+                    self.__save_model()
+                self.__last_sample = None
+                self.__set_anchor(None)
+                return
+
+            temperature = self.__get_temperature(values)
+            # Values stay the same between the polls of the WeConnect-API, so the same sample is learned only once
+            sample = (values["batteryLevel"], values["chargePower"])
+            if sample != self.__last_sample and self.__model.add_sample(
+                charge_type=values["chargeType"],
+                temperature=temperature,
+                battery_level=values["batteryLevel"],
+                power=values["chargePower"],
+            ):
+                self.__learned = True
+                self.__last_sample = sample
+
+            if values["batteryLevel"] is None or values["targetBatteryLevel"] is None:
+                self.__set_anchor(None)
+                return
+            hours = self.__model.get_charging_hours(
+                charge_type=values["chargeType"],
+                temperature=temperature,
+                battery_level=values["batteryLevel"],
+                target_level=values["targetBatteryLevel"],
+                capacity=self.__get_capacity(values),
+            )
+            self.__set_anchor(None if hours is None else (time.time(), hours * 60))
+
+    def __set_anchor(self, anchor: tuple) -> None:
+        self.__anchor = anchor
+        self.__publish()
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if anchor is not None and not self.__stopped:
+            self.__timer = Timer(self.__interval, self.__tick)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __tick(self) -> None:
+        with self.__lock:
+            if self.__anchor is None or self.__stopped:
+                return
+            self.__publish()
+            self.__timer = Timer(self.__interval, self.__tick)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __publish(self) -> None:
+        if self.__anchor is None:
+            self.__time_data_property.update_value(None)
+            self.__completion_data_property.update_value(None)
+            return
+        anchor_time, anchor_minutes = self.__anchor
+        now = time.time()
+        # Charging continues along the same curve between the update cycles
+        minutes = max(anchor_minutes - (now - anchor_time) / 60, 0.0)
+        completion = datetime.fromtimestamp(now).astimezone() + timedelta(minutes=minutes)
+        self.__time_data_property.update_value(round(minutes))
+        self.__completion_data_property.update_value(completion.strftime("%H:%M"))
+
+    def stop(self) -> None:
+        '''
+        Stops the estimate updates and saves the learned curves.
+        '''
+
+        with self.__lock:
+            self.__stopped = True
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            if self.__learned:
+                self.__save_model()
+
+    @property
+    def model(self) -> ChargingCurveModel:
+        return self.__model
+
+    @property
+    def data_properties(self) -> tuple:
+        return (self.__time_data_property, self.__completion_data_property)
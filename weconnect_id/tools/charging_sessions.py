@@ -0,0 +1,466 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from electricity_price.spot_price_provider import SpotPriceProvider
+    from weconnect_id.tools.updater import WeConnectUpdater
+    from weconnect_id.vehicle import WeConnectVehicle
+from electricity_price.price_model import SpotPriceModel
+from display.lcd_item import LCDItem
+from weconnect.elements.charging_status import ChargingStatus
+from weconnect.elements.plug_status import PlugStatus
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+import json
+import os
+import time
+import logging
+
+
+LOG = logging.getLogger("charging_sessions")
+
+
+def integrate_power(
+    start: float, start_power: float, end: float, end_power: float, model: SpotPriceModel
+) -> tuple:
+    '''
+    Integrates linearly interpolated charging power between two samples with the trapezoidal rule.
+    The interval is split at the price period boundaries, so each part is priced with its own spot price.
+
+    Args:
+        start (float): POSIX timestamp of the first sample.
+        start_power (float): Charging power of the first sample in kW.
+        end (float): POSIX timestamp of the second sample.
+        end_power (float): Charging power of the second sample in kW.
+        model (SpotPriceModel): Prices of the interval.
+
+    Returns:
+        tuple: Energy in kWh, cost in cents and energy in kWh whose price was not known.
+    '''
+
+    energy = 0.0
+    cost = 0.0
+    unpriced_energy = 0.0
+    duration = end - start
+    if duration <= 0:
+        return energy, cost, unpriced_energy
+
+    moment = start
+    while moment < end:
+        moment_time = datetime.fromtimestamp(moment).astimezone()
+        boundary = min(model.next_boundary(moment_time).timestamp(), end)
+        power_a = start_power + (end_power - start_power) * (moment - start) / duration
+        power_b = start_power + (end_power - start_power) * (boundary - start) / duration
+        part = (power_a + power_b) / 2 * (boundary - moment) / 3600
+        price = model.price_at(moment_time)
+        energy += part
+        if price is None:
+            unpriced_energy += part
+        else:
+            cost += part * price
+        moment = boundary
+    return energy, cost, unpriced_energy
+
+
+class ChargingSession:
+    def __init__(self, start: float, battery_level: float, battery_charge: float, vin: str = None) -> None:
+        '''
+        Accumulates the energy and cost of a charging session sample by sample.
+        Only the totals and the latest sample are kept, so memory use doesn't grow with the session length.
+
+        Args:
+            start (float): POSIX timestamp of the start of the session.
+            battery_level (float): Battery level at the start as percentage.
+            battery_charge (float): Battery charge at the start in kWh.
+            vin (str, optional): VIN of the charged vehicle. Defaults to None.
+        '''
+
+        self.__vin = vin
+        self.__start = start
+        self.__end = start
+        self.__start_level = battery_level
+        self.__end_level = battery_level
+        self.__start_charge = battery_charge
+        self.__end_charge = battery_charge
+        self.__last_power = None
+        self.__energy = 0.0
+        self.__cost = 0.0
+        self.__unpriced_energy = 0.0
+        self.__peak_power = 0.0
+        self.__samples = 0
+        self.__interrupted = False
+
+    def to_state(self) -> dict:
+        '''
+        Gets the totals and the latest sample of an ongoing session, so it can be resumed with from_state.
+        '''
+
+        return {
+            "vin": self.__vin,
+            "start": self.__start,
+            "end": self.__end,
+            "start_level": self.__start_level,
+            "end_level": self.__end_level,
+            "start_charge": self.__start_charge,
+            "end_charge": self.__end_charge,
+            "last_power": self.__last_power,
+            "energy": self.__energy,
+            "cost": self.__cost,
+            "unpriced_energy": self.__unpriced_energy,
+            "peak_power": self.__peak_power,
+            "samples": self.__samples,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict):
+        '''
+        Creates the session saved with to_state.
+
+        Raises:
+            KeyError: Raised if the state is missing fields.
+        '''
+
+        session = cls(
+            start=state["start"],
+            battery_level=state["start_level"],
+            battery_charge=state["start_charge"],
+            vin=state["vin"],
+        )
+        session.__end = state["end"]
+        session.__end_level = state["end_level"]
+        session.__end_charge = state["end_charge"]
+        session.__last_power = state["last_power"]
+        session.__energy = state["energy"]
+        session.__cost = state["cost"]
+        session.__unpriced_energy = state["unpriced_energy"]
+        session.__peak_power = state["peak_power"]
+        session.__samples = state["samples"]
+        return session
+
+    def interrupt(self) -> None:
+        '''
+        Marks the session interrupted, e.g. when tracking stopped before the plug was disconnected.
+        Totals of interrupted sessions don't cover the whole charge.
+        '''
+
+        self.__interrupted = True
+
+    @property
+    def end(self) -> float:
+        return self.__end
+
+    @property
+    def vin(self) -> str:
+        return self.__vin
+
+    def add_sample(
+        self,
+        timestamp: float,
+        power: float,
+        battery_level: float,
+        battery_charge: float,
+        model: SpotPriceModel,
+    ) -> None:
+        '''
+        Adds the energy and cost since the previous sample.
+
+        Args:
+            timestamp (float): POSIX timestamp of the sample.
+            power (float): Charging power in kW. None is handled as 0.
+            battery_level (float): Battery level as percentage.
+            battery_charge (float): Battery charge in kWh.
+            model (SpotPriceModel): Prices used for the cost.
+        '''
+
+        power = 0.0 if power is None else float(power)
+        if self.__last_power is not None and timestamp > self.__end:
+            energy, cost, unpriced_energy = integrate_power(
+                self.__end, self.__last_power, timestamp, power, model
+            )
+            self.__energy += energy
+            self.__cost += cost
+            self.__unpriced_energy += unpriced_energy
+        if self.__last_power is None or timestamp > self.__end:
+            self.__end = timestamp
+            self.__last_power = power
+        self.__peak_power = max(self.__peak_power, power)
+        self.__samples += 1
+        if battery_level is not None:
+            self.__end_level = battery_level
+        if battery_charge is not None:
+            self.__end_charge = battery_charge
+
+    @property
+    def energy(self) -> float:
+        '''
+        Energy integrated from the charging power in kWh.
+        '''
+
+        return self.__energy
+
+    @property
+    def soc_energy(self) -> float:
+        '''
+        Energy calculated from the change of the battery charge in kWh. None if the battery charge is not known.
+        '''
+
+        if self.__start_charge is None or self.__end_charge is None:
+            return None
+        return self.__end_charge - self.__start_charge
+
+    @property
+    def cost(self) -> float:
+        '''
+        Cost of the priced energy in cents.
+        '''
+
+        return self.__cost
+
+    def to_dict(self) -> dict:
+        soc_energy = self.soc_energy
+        return {
+            "vin": self.__vin,
+            "start": datetime.fromtimestamp(self.__start).astimezone().isoformat(timespec="seconds"),
+            "end": datetime.fromtimestamp(self.__end).astimezone().isoformat(timespec="seconds"),
+            "start_level": self.__start_level,
+            "end_level": self.__end_level,
+            "energy_kwh": round(self.__energy, 3),
+            "soc_energy_kwh": None if soc_energy is None else round(soc_energy, 3),
+            "cost_cents": round(self.__cost, 2),
+            "unpriced_energy_kwh": round(self.__unpriced_energy, 3),
+            "average_price": (
+                round(self.__cost / (self.__energy - self.__unpriced_energy), 2)
+                if self.__energy - self.__unpriced_energy > 0
+                else None
+            ),
+            "peak_power_kw": self.__peak_power,
+            "samples": self.__samples,
+            "interrupted": self.__interrupted,
+        }
+
+
+class ChargingSessionTracker:
+    DATA_PROPERTY_IDS = (
+        "batteryLevel",
+        "batteryCharge",
+        "chargePower",
+        "chargeState",
+        "chargingPlugConnectionStatus",
+    )
+    # Ongoing session saved at exit is resumed if the app is started again within this many seconds
+    RESUME_TIMEOUT = 15 * 60
+
+    def __init__(
+        self,
+        path: str,
+        spot_price_provider: SpotPriceProvider,
+        weconnect_updater: WeConnectUpdater,
+    ) -> None:
+        '''
+        Detects charging sessions of the selected vehicle and records their energy and cost.
+
+        A session starts when the vehicle starts charging and ends when the charging plug is disconnected,
+        so pauses made by the charging planner belong to the same session. The charging power is sampled
+        at the end of each update cycle. Finished sessions are appended to a JSON Lines file with the VIN of the vehicle.
+        Ongoing session is saved next to it at exit and resumed at start, so restarting the app doesn't split a charge.
+        Sessions which can't be resumed, or whose vehicle is switched during charging, are recorded as interrupted.
+
+        Args:
+            path (str): Path of the JSON Lines file for the finished sessions.
+            spot_price_provider (SpotPriceProvider): Provides the prices for the cost.
+            weconnect_updater (WeConnectUpdater): Calls the tracker at the end of each update cycle.
+        '''
+
+        LOG.debug("Initializing ChargingSessionTracker")
+        self.__path = Path(path)
+        self.__open_session_path = self.__path.with_name(self.__path.stem + ".open.json")
+        self.__spot_price_provider = spot_price_provider
+        self.__lock = Lock()
+        self.__data_properties = None
+        self.__vin = None
+        self.__session = None
+        self.__session_callbacks = {}
+        self.__item = LCDItem(
+            title="Lataus",
+            id="ITEM_CHARGING_SESSION",
+            content_centering=False,
+            second_title="-",
+        )
+        weconnect_updater.add_update_callback(id="CHARGING_SESSIONS", function=self.update)
+        LOG.debug("Successfully initialized ChargingSessionTracker")
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict,
+        spot_price_provider: SpotPriceProvider,
+        weconnect_updater: WeConnectUpdater,
+    ):
+        '''
+        Creates ChargingSessionTracker if the "charging sessions" config exists, e.g. {"enabled": true}.
+        Sessions are written to the "charging sessions" path, which defaults to charging_sessions.jsonl next to the data logs.
+
+        Returns:
+            ChargingSessionTracker: None if the tracker is not configured.
+        '''
+
+        session_config = config.get("charging sessions")
+        if session_config is None or not session_config.get("enabled", True):
+            return None
+        return cls(
+            path=config["paths"].get(
+                "charging sessions",
+                os.path.join(os.path.dirname(config["paths"]["data_logs"]), "charging_sessions.jsonl"),
+            ),
+            spot_price_provider=spot_price_provider,
+            weconnect_updater=weconnect_updater,
+        )
+
+    def set_vehicle(self, weconnect_vehicle: WeConnectVehicle) -> None:
+        '''
+        Starts tracking the vehicle. Session of the previous vehicle is finished as interrupted,
+        and the session saved at exit is resumed if it belongs to the vehicle.
+        '''
+
+        with self.__lock:
+            if self.__session is not None and self.__session.vin != weconnect_vehicle.vin:
+                self.__session.interrupt()
+                self.__finish_session()
+            self.__vin = weconnect_vehicle.vin
+            if self.__session is None:
+                self.__resume_session()
+            try:
+                self.__data_properties = {
+                    data_id: weconnect_vehicle.get_data_property(data_id)
+                    for data_id in self.DATA_PROPERTY_IDS
+                }
+            except KeyError as e:
+                LOG.error(f"Charging sessions can't be tracked, data property {e} is not available")
+                self.__data_properties = None
+
+    def update(self) -> None:
+        with self.__lock:
+            if self.__data_properties is None:
+                return
+            values = {data_id: data_property.value for data_id, data_property in self.__data_properties.items()}
+            now = time.time()
+            charging = values["chargeState"] == ChargingStatus.ChargingState.CHARGING
+            disconnected = values["chargingPlugConnectionStatus"] == PlugStatus.PlugConnectionState.DISCONNECTED
+
+            if self.__session is None:
+                if not charging or disconnected:
+                    return
+                self.__session = ChargingSession(
+                    start=now,
+                    battery_level=values["batteryLevel"],
+                    battery_charge=values["batteryCharge"],
+                    vin=self.__vin,
+                )
+                LOG.info("Charging session started")
+
+            self.__session.add_sample(
+                timestamp=now,
+                power=values["chargePower"] if charging else 0.0,
+                battery_level=values["batteryLevel"],
+                battery_charge=values["batteryCharge"],
+                model=self.__spot_price_provider.model,
+            )
+            self.__update_item(self.__session)
+            if disconnected:
+                self.__finish_session()
+
+    def __resume_session(self) -> None:
+        if not self.__open_session_path.exists():
+            return
+        try:
+            with open(self.__open_session_path, "r") as session_file:
+                session = ChargingSession.from_state(json.load(session_file))
+            self.__open_session_path.unlink()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOG.error(f"Failed to load the ongoing charging session (Error: {e})")
+            self.__open_session_path.unlink(missing_ok=True)
+            return
+        self.__session = session
+        if session.vin == self.__vin and time.time() - session.end <= self.RESUME_TIMEOUT:
+            LOG.info("Charging session resumed")
+            self.__update_item(session)
+            return
+        session.interrupt()
+        self.__finish_session()
+
+    def __save_session(self) -> None:
+        temporary_path = self.__open_session_path.with_suffix(".tmp")
+        try:
+            self.__open_session_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary_path, "w") as session_file:
+                json.dump(self.__session.to_state(), session_file)
+            os.replace(temporary_path, self.__open_session_path)
+        except OSError as e:
+            LOG.exception(e)
+            self.__session.interrupt()
+            self.__finish_session()
+            return
+        self.__session = None
+        LOG.info("Saved the ongoing charging session")
+
+    def __finish_session(self) -> None:
+        session = self.__session.to_dict()
+        self.__session = None
+        LOG.info(f"Charging session finished (Session: {session})")
+        try:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.__path, "a") as sessions_file:
+                sessions_file.write(json.dumps(session) + "\n")
+        except OSError as e:
+            LOG.exception(e)
+        for callback in list(self.__session_callbacks.values()):
+            try:
+                callback["function"](session, *callback["args"])
+            except Exception as e:
+                LOG.exception(e)
+
+    def add_session_callback(self, id: str, function: callable, args: list = None) -> None:
+        '''
+        Adds callback function which is called when a charging session is finished.
+
+        Args:
+            id (str): ID for the function so it can be removed later.
+            function (callable): Function to be called. The finished session as dict is given as the first argument.
+            args (list, optional): Additional arguments for the given function. Defaults to None.
+        '''
+
+        self.__session_callbacks[id] = {
+            "id": id,
+            "function": function,
+            "args": [] if args is None else args,
+        }
+        LOG.debug(f"Added charging session callback function (ID: {id})")
+
+    def remove_session_callback(self, id: str) -> None:
+        self.__session_callbacks.pop(id, None)
+        LOG.debug(f"Removed charging session callback function (ID: {id})")
+
+    def __update_item(self, session: ChargingSession) -> None:
+        # "€" is not in the character set of the LCD screen
+        self.__item.update_content(second_title=f"{session.energy:.1f}kWh {session.cost / 100:.2f}e")
+
+    def stop(self) -> None:
+        '''
+        Saves the ongoing session when the app is closed, so it is resumed at the next start.
+        '''
+
+        with self.__lock:
+            if self.__session is not None:
+                self.__save_session()
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    @property
+    def session(self) -> ChargingSession:
+        return self.__session
+
+    @property
+    def item(self) -> LCDItem:
+        return self.__item
@@ -0,0 +1,444 @@
+from bisect import bisect_right
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from threading import Lock
+from typing import NamedTuple
+import argparse
+import json
+import os
+import struct
+import time
+import zlib
+import logging
+
+
+LOG = logging.getLogger("event_journal")
+
+
+MAGIC = b"WCJRNL01"
+# payload length, CRC32 of the payload, frame type
+FRAME_HEADER = struct.Struct("<IIB")
+# timestamp, observer flags
+EVENT_HEADER = struct.Struct("<dI")
+# timestamp, amount of entries
+SNAPSHOT_HEADER = struct.Struct("<dI")
+# snapshot timestamp, offset of the snapshot frame in the journal
+INDEX_ENTRY = struct.Struct("<dQ")
+
+FRAME_EVENT = 1
+FRAME_SNAPSHOT = 2
+INDEX_SUFFIX = ".idx"
+
+
+class EventJournalError(Exception):
+    pass
+
+
+class EnumValue(NamedTuple):
+    '''
+    Enum value read from the journal. The enum classes are not imported when reading.
+    Type is in "<module>:<qualified name>" format.
+    '''
+
+    type: str
+    value: object
+
+
+class JournalEntry(NamedTuple):
+    value: object
+    timestamp: float
+    flags: int
+
+
+def _encode_string(string: str) -> bytes:
+    encoded = string.encode()
+    return struct.pack("<I", len(encoded)) + encoded
+
+
+def _decode_string(buffer: bytes, offset: int) -> tuple:
+    (length,) = struct.unpack_from("<I", buffer, offset)
+    offset += 4
+    return buffer[offset : offset + length].decode(), offset + length
+
+
+def encode_value(value) -> bytes:
+    '''
+    Encodes value of a WeConnect-API element into tagged binary format.
+    Values of unsupported types are stored as strings.
+    '''
+
+    if value is None:
+        return b"N"
+    if isinstance(value, Enum):
+        enum_type = type(value)
+        return (
+            b"e"
+            + _encode_string(f"{enum_type.__module__}:{enum_type.__qualname__}")
+            + encode_value(value.value)
+        )
+    if isinstance(value, EnumValue):
+        return b"e" + _encode_string(value.type) + encode_value(value.value)
+    if isinstance(value, bool):
+        return b"?" + struct.pack("<?", value)
+    if isinstance(value, int) and -(2**63) <= value < 2**63:
+        return b"i" + struct.pack("<q", value)
+    if isinstance(value, float):
+        return b"f" + struct.pack("<d", value)
+    if isinstance(value, datetime):
+        return b"t" + _encode_string(value.isoformat())
+    return b"s" + _encode_string(str(value))
+
+
+def decode_value(buffer: bytes, offset: int) -> tuple:
+    '''
+    Decodes value written by encode_value.
+
+    Returns:
+        tuple: Decoded value and offset after it.
+    '''
+
+    tag = buffer[offset : offset + 1]
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag == b"e":
+        type_name, offset = _decode_string(buffer, offset)
+        value, offset = decode_value(buffer, offset)
+        return EnumValue(type_name, value), offset
+    if tag == b"?":
+        return struct.unpack_from("<?", buffer, offset)[0], offset + 1
+    if tag == b"i":
+        return struct.unpack_from("<q", buffer, offset)[0], offset + 8
+    if tag == b"f":
+        return struct.unpack_from("<d", buffer, offset)[0], offset + 8
+    if tag == b"t":
+        string, offset = _decode_string(buffer, offset)
+        return datetime.fromisoformat(string), offset
+    if tag == b"s":
+        return _decode_string(buffer, offset)
+    raise EventJournalError(f"Unknown value tag {tag!r} at {offset - 1}")
+
+
+def decode_event(payload: bytes) -> tuple:
+    '''
+    Returns:
+        tuple: Timestamp, address, value and flags of the event.
+    '''
+
+    timestamp, flags = EVENT_HEADER.unpack_from(payload, 0)
+    address, offset = _decode_string(payload, EVENT_HEADER.size)
+    value, _ = decode_value(payload, offset)
+    return timestamp, address, value, flags
+
+
+def decode_snapshot(payload: bytes) -> tuple:
+    '''
+    Returns:
+        tuple: Timestamp of the snapshot and dict of JournalEntries by address.
+    '''
+
+    timestamp, count = SNAPSHOT_HEADER.unpack_from(payload, 0)
+    offset = SNAPSHOT_HEADER.size
+    state = {}
+    for _ in range(count):
+        address, offset = _decode_string(payload, offset)
+        value, offset = decode_value(payload, offset)
+        entry_timestamp, flags = EVENT_HEADER.unpack_from(payload, offset)
+        offset += EVENT_HEADER.size
+        state[address] = JournalEntry(value, entry_timestamp, flags)
+    return timestamp, state
+
+
+def read_frames(file, offset: int):
+    '''
+    Reads frames starting from the given offset. Stops at the end of the file or at the first torn or corrupted frame.
+
+    Yields:
+        tuple: Offset, type and payload of the frame.
+    '''
+
+    file.seek(offset)
+    while True:
+        header = file.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            return
+        length, checksum, frame_type = FRAME_HEADER.unpack(header)
+        payload = file.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+        yield offset, frame_type, payload
+        offset += FRAME_HEADER.size + length
+
+
+def _read_index(index_path: Path) -> tuple:
+    if not index_path.is_file():
+        return [], []
+    content = index_path.read_bytes()
+    content = content[: len(content) - len(content) % INDEX_ENTRY.size]
+    entries = list(INDEX_ENTRY.iter_unpack(content))
+    return [entry[0] for entry in entries], [entry[1] for entry in entries]
+
+
+class VehicleEventJournal:
+    def __init__(self, path: str, snapshot_interval: int = 1000) -> None:
+        '''
+        Append-only binary journal of the observer events received from the WeConnect-API elements.
+
+        File layout:
+            8 byte magic followed by frames of (payload length u32, CRC32 u32, type u8, payload).
+            Event payload: timestamp f8, observer flags u32, address and tagged value.
+            Snapshot payload: timestamp f8, entry count u32 and the latest (address, value, timestamp, flags) of every address.
+            Snapshot timestamps and offsets are appended to <journal>.idx so replay can start from the closest snapshot.
+
+        Torn frames at the end of the journal, e.g. after power loss, are truncated when the journal is opened.
+
+        Args:
+            path (str): Path of the journal file.
+            snapshot_interval (int, optional): Amount of events between snapshots. Defaults to 1000.
+        '''
+
+        self.__path = Path(path)
+        self.__index_path = self.__path.with_name(self.__path.name + INDEX_SUFFIX)
+        self.__snapshot_interval = snapshot_interval
+        self.__lock = Lock()
+        self.__state = {}
+        self.__events_since_snapshot = 0
+        self.__open()
+
+    def __open(self) -> None:
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.__path.is_file() or self.__path.stat().st_size < len(MAGIC):
+            with open(self.__path, "wb") as file:
+                file.write(MAGIC)
+            self.__index_path.unlink(missing_ok=True)
+
+        with open(self.__path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise EventJournalError(f"File (Path: {self.__path}) is not a vehicle event journal")
+            _, offsets = _read_index(self.__index_path)
+            offset = offsets[-1] if offsets else len(MAGIC)
+            if offset > self.__path.stat().st_size:
+                LOG.warning(f"Vehicle event journal index (Path: {self.__index_path}) is ahead of the journal, ignoring it")
+                offset = len(MAGIC)
+            end = offset
+            for frame_offset, frame_type, payload in read_frames(file, offset):
+                if frame_type == FRAME_SNAPSHOT:
+                    self.__state = decode_snapshot(payload)[1]
+                    self.__events_since_snapshot = 0
+                elif frame_type == FRAME_EVENT:
+                    timestamp, address, value, flags = decode_event(payload)
+                    self.__state[address] = JournalEntry(value, timestamp, flags)
+                    self.__events_since_snapshot += 1
+                end = frame_offset + FRAME_HEADER.size + len(payload)
+
+        self.__file = open(self.__path, "r+b")
+        if end < self.__file.seek(0, os.SEEK_END):
+            LOG.warning(f"Truncating torn tail of vehicle event journal (Path: {self.__path}) at byte {end}")
+            self.__file.truncate(end)
+        self.__drop_index_entries_after(end)
+        self.__file.seek(end)
+        LOG.debug(f"Opened vehicle event journal (Path: {self.__path}) (Addresses: {len(self.__state)})")
+
+    def __drop_index_entries_after(self, end: int) -> None:
+        timestamps, offsets = _read_index(self.__index_path)
+        valid = [(timestamp, offset) for timestamp, offset in zip(timestamps, offsets) if offset < end]
+        torn = self.__index_path.is_file() and self.__index_path.stat().st_size % INDEX_ENTRY.size != 0
+        if len(valid) == len(offsets) and not torn:
+            return
+        # Entries pointing past the end would make replay seek into the next frames written at the same offsets
+        LOG.warning(
+            f"Dropping {len(offsets) - len(valid)} vehicle event journal index entries past the end of the journal (Path: {self.__index_path})"
+        )
+        with open(self.__index_path, "wb") as index_file:
+            index_file.write(b"".join(INDEX_ENTRY.pack(timestamp, offset) for timestamp, offset in valid))
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    def observe(self, element, flags) -> None:
+        '''
+        Observer function for WeConnect-API elements.
+        '''
+
+        try:
+            # ObserverEvent is a Flag, not an IntFlag, so it can't be converted with int()
+            self.record(element.getGlobalAddress(), element.value, flags.value)
+        except Exception as e:
+            LOG.exception(e)
+
+    def record(self, address: str, value, flags: int, timestamp: float = None) -> None:
+        '''
+        Appends event to the journal. Snapshot is written after every snapshot interval events.
+
+        Args:
+            address (str): Global address of the WeConnect-API element.
+            value: Value of the element.
+            flags (int): Observer event flags.
+            timestamp (float, optional): POSIX timestamp of the event. Defaults to time.time().
+        '''
+
+        timestamp = time.time() if timestamp is None else timestamp
+        payload = EVENT_HEADER.pack(timestamp, flags) + _encode_string(address) + encode_value(value)
+        with self.__lock:
+            self.__write_frame(FRAME_EVENT, payload)
+            self.__state[address] = JournalEntry(value, timestamp, flags)
+            self.__events_since_snapshot += 1
+            if self.__events_since_snapshot >= self.__snapshot_interval:
+                self.__write_snapshot(timestamp)
+            self.__file.flush()
+
+    def snapshot(self) -> None:
+        with self.__lock:
+            self.__write_snapshot(time.time())
+            self.__file.flush()
+
+    def __write_snapshot(self, timestamp: float) -> None:
+        parts = [SNAPSHOT_HEADER.pack(timestamp, len(self.__state))]
+        for address, entry in self.__state.items():
+            parts.append(_encode_string(address))
+            parts.append(encode_value(entry.value))
+            parts.append(EVENT_HEADER.pack(entry.timestamp, entry.flags))
+        offset = self.__write_frame(FRAME_SNAPSHOT, b"".join(parts))
+        self.__file.flush()
+        with open(self.__index_path, "ab") as index_file:
+            index_file.write(INDEX_ENTRY.pack(timestamp, offset))
+        self.__events_since_snapshot = 0
+
+    def __write_frame(self, frame_type: int, payload: bytes) -> int:
+        offset = self.__file.tell()
+        self.__file.write(FRAME_HEADER.pack(len(payload), zlib.crc32(payload), frame_type) + payload)
+        return offset
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__file.closed:
+                return
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+            self.__file.close()
+
+
+class EventJournalReader:
+    def __init__(self, path: str) -> None:
+        '''
+        Reads vehicle event journal written by VehicleEventJournal.
+
+        Args:
+            path (str): Path of the journal file.
+        '''
+
+        self.__path = Path(path)
+        self.__index_path = self.__path.with_name(self.__path.name + INDEX_SUFFIX)
+
+    def events(self, start: float = None, end: float = None):
+        '''
+        Iterates events inside the time range. Replay starts from the last snapshot before the start.
+
+        Yields:
+            tuple: Timestamp, address, value and flags of the event.
+        '''
+
+        timestamps, offsets = _read_index(self.__index_path)
+        offset = len(MAGIC)
+        if start is not None:
+            position = bisect_right(timestamps, start)
+            if position > 0:
+                offset = offsets[position - 1]
+
+        with open(self.__path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise EventJournalError(f"File (Path: {self.__path}) is not a vehicle event journal")
+            for _, frame_type, payload in read_frames(file, offset):
+                if frame_type != FRAME_EVENT:
+                    continue
+                event = decode_event(payload)
+                if start is not None and event[0] < start:
+                    continue
+                if end is not None and event[0] >= end:
+                    return
+                yield event
+
+    def state_at(self, moment: float = None) -> dict:
+        '''
+        Rebuilds the state of the WeConnect-API elements at the given moment from the closest earlier snapshot and the events after it.
+
+        Args:
+            moment (float, optional): POSIX timestamp. Defaults to the end of the journal.
+
+        Returns:
+            dict: JournalEntries by address.
+        '''
+
+        timestamps, offsets = _read_index(self.__index_path)
+        offset = len(MAGIC)
+        if moment is None:
+            position = len(offsets)
+        else:
+            position = bisect_right(timestamps, moment)
+        if position > 0:
+            offset = offsets[position - 1]
+
+        state = {}
+        with open(self.__path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise EventJournalError(f"File (Path: {self.__path}) is not a vehicle event journal")
+            for _, frame_type, payload in read_frames(file, offset):
+                if frame_type == FRAME_SNAPSHOT:
+                    snapshot_timestamp, snapshot_state = decode_snapshot(payload)
+                    if moment is not None and snapshot_timestamp > moment:
+                        break
+                    state = snapshot_state
+                elif frame_type == FRAME_EVENT:
+                    timestamp, address, value, flags = decode_event(payload)
+                    if moment is not None and timestamp > moment:
+                        break
+                    state[address] = JournalEntry(value, timestamp, flags)
+        return state
+
+
+def _to_json_value(value):
+    if isinstance(value, EnumValue):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Show vehicle state or events from a vehicle event journal")
+    parser.add_argument("journal", help="Path of the journal file")
+    parser.add_argument("--at", help="Show state at the given time in ISO 8601 format. Defaults to the latest state")
+    parser.add_argument("--events", action="store_true", help="List events instead of the state")
+    parser.add_argument("--start", help="Start time of the listed events in ISO 8601 format")
+    arguments = parser.parse_args(argv)
+
+    reader = EventJournalReader(arguments.journal)
+    if arguments.events:
+        start = None if arguments.start is None else datetime.fromisoformat(arguments.start).timestamp()
+        end = None if arguments.at is None else datetime.fromisoformat(arguments.at).timestamp()
+        for timestamp, address, value, flags in reader.events(start, end):
+            print(f"{datetime.fromtimestamp(timestamp).isoformat()} {address} = {_to_json_value(value)!r} (Flags: {flags})")
+        return
+
+    moment = None if arguments.at is None else datetime.fromisoformat(arguments.at).timestamp()
+    state = reader.state_at(moment)
+    print(
+        json.dumps(
+            {
+                address: {
+                    "value": _to_json_value(entry.value),
+                    "time": datetime.fromtimestamp(entry.timestamp).isoformat(),
+                    "flags": entry.flags,
+                }
+                for address, entry in sorted(state.items())
+            },
+            indent=1,
+            default=str,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+from weconnect_id.tools.log_rotation import INDEX_SUFFIX
+import argparse
+import csv
+import gzip
+import io
+import os
+import logging
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+DEFAULT_TIMEZONE = "Europe/Helsinki"
+LEGACY_HEADERS = {
+    ("value", "time", "date"): ("value", "time"),
+    ("value", "first time", "first date", "last time", "last date"): ("value", "first time", "last time"),
+}
+
+
+class LegacyTimeConverter:
+    def __init__(self, timezone: ZoneInfo) -> None:
+        '''
+        Converts "%H.%M:%S" and "%d.%m.%Y" columns of the old data log format into ISO 8601 time with UTC offset.
+
+        Rows are expected in time order. Local times which occur twice when the clocks are turned back
+        are resolved to the later occurrence if the earlier one would make the time go backwards.
+
+        Args:
+            timezone (ZoneInfo): Timezone the old logs were written in.
+        '''
+
+        self.__timezone = timezone
+        self.__previous = None
+
+    def convert(self, time_string: str, date_string: str) -> str:
+        day, month, year = date_string.split(".")
+        hours, rest = time_string.split(".")
+        minutes, seconds = rest.split(":")
+        local_time = datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hours),
+            int(minutes),
+            int(seconds),
+            tzinfo=self.__timezone,
+        )
+
+        earlier = local_time.replace(fold=0)
+        later = local_time.replace(fold=1)
+        converted = earlier
+        if earlier.utcoffset() != later.utcoffset():
+            if self.__previous is not None and earlier.timestamp() < self.__previous:
+                converted = later
+        self.__previous = converted.timestamp()
+        return converted.isoformat(timespec="seconds")
+
+
+def _open_text(path: Path, mode: str, compressed: bool):
+    if compressed:
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), newline="")
+    return open(path, mode, newline="")
+
+
+def migrate_file(path: Path, timezone: ZoneInfo) -> bool:
+    '''
+    Rewrites data log file in the current format. The file is streamed row by row into temporary file
+    which replaces the original, so memory use doesn't depend on the file size.
+
+    Args:
+        path (Path): Path of the data log file (.csv or .csv.gz).
+        timezone (ZoneInfo): Timezone the file was written in.
+
+    Returns:
+        bool: False if the file was already in the current format.
+    '''
+
+    path = Path(path)
+    compressed = path.name.endswith(".gz")
+    with _open_text(path, "r", compressed) as source:
+        reader = csv.reader(source, delimiter=";")
+        header = tuple(next(reader, ()))
+        if header not in LEGACY_HEADERS:
+            return False
+
+        # Temporary file is written with the compression of the original file, which it replaces.
+        # The ".tmp" ending keeps leftovers of an interrupted migration out of the data log globs.
+        temporary_path = path.with_name(path.name + ".tmp")
+        converter = LegacyTimeConverter(timezone)
+        rows = 0
+        with _open_text(temporary_path, "w", compressed) as target:
+            writer = csv.writer(target, delimiter=";")
+            writer.writerow(LEGACY_HEADERS[header])
+            for row in reader:
+                try:
+                    converted = [row[0]]
+                    for column in range(1, len(row), 2):
+                        converted.append(converter.convert(row[column], row[column + 1]))
+                except (ValueError, IndexError):
+                    LOG.warning(f"Skipping malformed row {row} in (Path: {path})")
+                    continue
+                writer.writerow(converted)
+                rows += 1
+
+    os.replace(temporary_path, path)
+    path.with_name(path.name + INDEX_SUFFIX).unlink(missing_ok=True)
+    LOG.info(f"Migrated data log (Path: {path}) (Rows: {rows})")
+    return True
+
+
+def migrate(data_logs_path: str, timezone: str = DEFAULT_TIMEZONE) -> int:
+    '''
+    Rewrites all data log files of the data logs folder in the current format.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+        timezone (str, optional): Timezone the old logs were written in. Defaults to "Europe/Helsinki".
+
+    Returns:
+        int: Amount of migrated files.
+    '''
+
+    zone = ZoneInfo(timezone)
+    migrated = 0
+    for path in sorted(Path(data_logs_path).glob("*/*.csv*")):
+        if path.name.endswith((".csv", ".csv.gz")) and migrate_file(path, zone):
+            migrated += 1
+    return migrated
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Rewrite data logs written by older versions to use ISO 8601 times with UTC offset"
+    )
+    parser.add_argument("data_logs", help="Path of the data logs folder")
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE, help="Timezone the old logs were written in")
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Migrated {migrate(arguments.data_logs, arguments.timezone)} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from weconnect_id.tools.log_rotation import DataLogManifest, MANIFEST_NAME, INDEX_SUFFIX
+import argparse
+import csv
+import gzip
+import json
+import re
+import sys
+import zlib
+import logging
+import numpy
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+INDEX_VERSION = 2
+# Bytes from the start of the file checked before the index of a grown file is extended
+FINGERPRINT_SIZE = 4096
+AGGREGATES = ("mean", "min", "max", "first", "last", "count", "sum")
+TIERS = ("raw", "5min", "1h")
+INTERVAL_UNITS = {"s": 1, "min": 60, "h": 3600, "d": 86400}
+NUMBER_PATTERN = re.compile(r"^\s*(-?\d+(?:\.\d+)?)")
+
+
+def parse_log_time(time_string: str, date_string: str = None) -> float:
+    '''
+    Parses time column of the data logs into POSIX timestamp.
+    Time is in ISO 8601 format, or in "%H.%M:%S" format with separate "%d.%m.%Y" date column in logs written by older versions.
+    Older logs are interpreted in the local timezone.
+    '''
+
+    if date_string is None:
+        return datetime.fromisoformat(time_string).timestamp()
+    day, month, year = date_string.split(".")
+    hours, rest = time_string.split(".")
+    minutes, seconds = rest.split(":")
+    return datetime(
+        int(year), int(month), int(day), int(hours), int(minutes), int(seconds)
+    ).timestamp()
+
+
+def parse_interval(interval: str) -> float:
+    '''
+    Parses resampling interval such as "30s", "15min", "1h" or "1d" into seconds.
+    '''
+
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)(s|min|h|d)", interval.strip())
+    if match is None:
+        raise ValueError(f"Invalid interval {interval}, expected e.g. 30s, 15min, 1h or 1d")
+    return float(match.group(1)) * INTERVAL_UNITS[match.group(2)]
+
+
+def get_time_columns(header: list, prefix: str = "") -> list:
+    '''
+    Gets indexes of the columns containing the time of a data log row.
+
+    Args:
+        header (list): Header row of the data log file.
+        prefix (str, optional): "first " or "last " for files containing runs. Defaults to "".
+
+    Returns:
+        list: Index of the time column and the index of the date column if the file has one.
+    '''
+
+    columns = [header.index(f"{prefix}time")]
+    if f"{prefix}date" in header:
+        columns.append(header.index(f"{prefix}date"))
+    return columns
+
+
+def _open_log_file(path: Path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+class DataLogIndex:
+    def __init__(self, path: Path) -> None:
+        '''
+        Sidecar index of a data log file containing the timestamp and byte offset of every row.
+        Stored next to the data log file as <file>.idx.npz. Index of a growing uncompressed file is extended
+        from the last indexed row if the start of the file is unchanged, other changed files are indexed again.
+
+        Args:
+            path (Path): Path of the data log file (.csv or .csv.gz).
+        '''
+
+        self.__path = Path(path)
+        self.__index_path = self.__path.with_name(self.__path.name + INDEX_SUFFIX)
+        self.__header = None
+        self.__timestamps = numpy.empty(0, dtype="<f8")
+        self.__offsets = numpy.empty(0, dtype="<u8")
+        self.__end_offset = 0
+        self.__load()
+
+    @property
+    def header(self) -> list:
+        return self.__header
+
+    @property
+    def is_runs(self) -> bool:
+        return self.__header is not None and "first time" in self.__header
+
+    @property
+    def timestamps(self):
+        return self.__timestamps
+
+    def __load(self) -> None:
+        stat = self.__path.stat()
+        if self.__index_path.is_file():
+            try:
+                with numpy.load(self.__index_path) as index:
+                    if int(index["version"]) == INDEX_VERSION:
+                        size, mtime = int(index["size"]), float(index["mtime"])
+                        unchanged = size == stat.st_size and mtime == stat.st_mtime
+                        grown = (
+                            self.__path.suffix != ".gz"
+                            and stat.st_size > size
+                            and int(index["fingerprint"]) == self.__fingerprint(int(index["end_offset"]))
+                        )
+                        if unchanged or grown:
+                            self.__header = json.loads(str(index["header"]))
+                            self.__timestamps = index["timestamps"]
+                            self.__offsets = index["offsets"]
+                            self.__end_offset = int(index["end_offset"])
+                            if unchanged:
+                                return
+            except (OSError, ValueError, KeyError) as e:
+                LOG.warning(f"Rebuilding data log index (Path: {self.__index_path}) ({e})")
+                self.__header = None
+
+        if self.__header is None:
+            self.__timestamps = numpy.empty(0, dtype="<f8")
+            self.__offsets = numpy.empty(0, dtype="<u8")
+            self.__end_offset = 0
+        self.__build(stat)
+
+    def __fingerprint(self, end_offset: int) -> int:
+        with _open_log_file(self.__path) as file:
+            return zlib.crc32(file.read(min(end_offset, FINGERPRINT_SIZE)))
+
+    def __build(self, stat) -> None:
+        timestamps = []
+        offsets = []
+        with _open_log_file(self.__path) as file:
+            if self.__header is None:
+                line = file.readline()
+                self.__header = next(csv.reader([line.decode()], delimiter=";"), [])
+                self.__end_offset = len(line)
+            file.seek(self.__end_offset)
+            offset = self.__end_offset
+            time_columns = get_time_columns(
+                self.__header, "first " if "first time" in self.__header else ""
+            )
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    row = line.decode().rstrip("\r\n").split(";")
+                    timestamps.append(parse_log_time(*[row[column] for column in time_columns]))
+                    offsets.append(offset)
+                except (ValueError, IndexError):
+                    LOG.warning(f"Skipping malformed row in (Path: {self.__path}) at byte {offset}")
+                offset += len(line)
+            self.__end_offset = offset
+
+        self.__timestamps = numpy.concatenate(
+            (self.__timestamps, numpy.asarray(timestamps, dtype="<f8"))
+        )
+        self.__offsets = numpy.concatenate(
+            (self.__offsets, numpy.asarray(offsets, dtype="<u8"))
+        )
+        try:
+            with open(self.__index_path, "wb") as index_file:
+                numpy.savez(
+                    index_file,
+                    version=INDEX_VERSION,
+                    size=stat.st_size,
+                    mtime=stat.st_mtime,
+                    end_offset=self.__end_offset,
+                    fingerprint=self.__fingerprint(self.__end_offset),
+                    header=json.dumps(self.__header),
+                    timestamps=self.__timestamps,
+                    offsets=self.__offsets,
+                )
+        except OSError as e:
+            LOG.warning(f"Could not save data log index (Path: {self.__index_path}) ({e})")
+
+    def find(self, start: float = None, end: float = None) -> tuple:
+        '''
+        Finds rows inside the time range using binary search.
+
+        Args:
+            start (float, optional): Start of the range as POSIX timestamp (inclusive). Defaults to None.
+            end (float, optional): End of the range as POSIX timestamp (exclusive). Defaults to None.
+
+        Returns:
+            tuple: First and last (exclusive) row number.
+        '''
+
+        first = 0 if start is None else int(numpy.searchsorted(self.__timestamps, start, side="left"))
+        last = (
+            len(self.__timestamps)
+            if end is None
+            else int(numpy.searchsorted(self.__timestamps, end, side="left"))
+        )
+        return first, max(first, last)
+
+    def read_rows(self, first: int, last: int) -> list:
+        '''
+        Reads rows of the data log file without parsing the rows outside the given range.
+        Only the rows in the index are read, so malformed rows skipped by the index don't shift
+        the rows against the timestamps.
+
+        Returns:
+            list: Rows as lists of strings, one for each indexed row in the range.
+        '''
+
+        if first >= last:
+            return []
+        start_offset = int(self.__offsets[first])
+        end_offset = int(self.__offsets[last]) if last < len(self.__offsets) else self.__end_offset
+        with _open_log_file(self.__path) as file:
+            file.seek(start_offset)
+            content = file.read(end_offset - start_offset)
+        rows = []
+        for offset in (self.__offsets[first:last] - start_offset).tolist():
+            line = content[offset:content.find(b"\n", offset)].decode().rstrip("\r")
+            rows.append(next(csv.reader([line], delimiter=";"), []))
+        return rows
+
+
+def find_log_files(data_logs_path: str, data_property_id: str, start: float = None, end: float = None) -> list:
+    '''
+    Finds data log files of a WeConnectVehicleDataProperty. Rotated segments whose time range in the manifest
+    doesn't overlap the given range are skipped without opening them. Files missing from the manifest
+    (e.g. logs written before rotation existed) are always included.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+        data_property_id (str): ID of the WeConnectVehicleDataProperty.
+        start (float, optional): Start of the range as POSIX timestamp. Defaults to None.
+        end (float, optional): End of the range as POSIX timestamp. Defaults to None.
+
+    Returns:
+        list: Paths of the data log files.
+    '''
+
+    data_logs_path = Path(data_logs_path)
+    name = re.escape(data_property_id.replace(" ", "_"))
+    pattern = re.compile(rf"^{name}(\.runs)?(\.\d{{4}}-\d{{2}}-\d{{2}}(-\d+)?)?\.csv(\.gz)?$")
+    files = sorted(
+        path
+        for path in data_logs_path.glob("*/*.csv*")
+        if pattern.match(path.name)
+    )
+
+    if not (data_logs_path / MANIFEST_NAME).is_file():
+        return files
+
+    manifest = DataLogManifest(data_logs_path)
+    listed = set()
+    selected = set()
+    for key in manifest.keys():
+        for segment in manifest.get_segments(key):
+            listed.add(segment["file"])
+        for segment in manifest.get_segments(key, start=start, end=end):
+            selected.add(segment["file"])
+
+    return [
+        path
+        for path in files
+        if f"{path.parent.name}/{path.name}" not in listed
+        or f"{path.parent.name}/{path.name}" in selected
+    ]
+
+
+def parse_values(values: list):
+    '''
+    Converts logged value strings into float array if all of them are numbers. Units are dropped.
+    Otherwise the values are returned as strings.
+    '''
+
+    numbers = []
+    for value in values:
+        match = NUMBER_PATTERN.match(value)
+        if match is None:
+            return numpy.asarray(values, dtype=object)
+        numbers.append(float(match.group(1)))
+    return numpy.asarray(numbers, dtype="<f8")
+
+
+def read_log_file(path: Path, start: float = None, end: float = None) -> tuple:
+    '''
+    Reads rows of one data log file inside the time range. Runs of identical values are returned as their first and last point.
+
+    Args:
+        path (Path): Path of the data log file.
+        start (float, optional): Start of the range as POSIX timestamp (inclusive). Defaults to None.
+        end (float, optional): End of the range as POSIX timestamp (exclusive). Defaults to None.
+
+    Returns:
+        tuple: Lists of timestamps and value strings.
+    '''
+
+    index = DataLogIndex(path)
+    if index.is_runs:
+        timestamps = []
+        values = []
+        first, last = index.find(start, end)
+        rows = index.read_rows(max(first - 1, 0), last)
+        first_columns = get_time_columns(index.header, "first ")
+        last_columns = get_time_columns(index.header, "last ")
+        for row in rows:
+            first_timestamp = parse_log_time(*[row[column] for column in first_columns])
+            last_timestamp = parse_log_time(*[row[column] for column in last_columns])
+            for timestamp in sorted({first_timestamp, last_timestamp}):
+                if (start is None or timestamp >= start) and (end is None or timestamp < end):
+                    timestamps.append(timestamp)
+                    values.append(row[0])
+        return timestamps, values
+
+    if numpy.all(numpy.diff(index.timestamps) >= 0):
+        first, last = index.find(start, end)
+        rows = index.read_rows(first, last)
+        selected = index.timestamps[first:last]
+    else:
+        mask = numpy.ones(len(index.timestamps), dtype=bool)
+        if start is not None:
+            mask &= index.timestamps >= start
+        if end is not None:
+            mask &= index.timestamps < end
+        rows = index.read_rows(0, len(index.timestamps))
+        rows = [row for row, keep in zip(rows, mask) if keep]
+        selected = index.timestamps[mask]
+    return selected.tolist(), [row[0] for row in rows]
+
+
+def query(data_logs_path: str, data_property_id: str, start: float = None, end: float = None) -> tuple:
+    '''
+    Reads logged values of a WeConnectVehicleDataProperty. Runs of identical values are returned as their first and last point.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+        data_property_id (str): ID of the WeConnectVehicleDataProperty.
+        start (float, optional): Start of the range as POSIX timestamp (inclusive). Defaults to None.
+        end (float, optional): End of the range as POSIX timestamp (exclusive). Defaults to None.
+
+    Returns:
+        tuple: Arrays of timestamps and values ordered by time.
+    '''
+
+    timestamps = []
+    values = []
+    for path in find_log_files(data_logs_path, data_property_id, start, end):
+        file_timestamps, file_values = read_log_file(path, start, end)
+        timestamps.extend(file_timestamps)
+        values.extend(file_values)
+
+    timestamps = numpy.asarray(timestamps, dtype="<f8")
+    values = parse_values(values)
+    order = numpy.argsort(timestamps, kind="stable")
+    return timestamps[order], values[order]
+
+
+def resample(timestamps, values, interval: float, aggregate: str = "mean", origin: float = None) -> tuple:
+    '''
+    Groups values into fixed size time buckets and aggregates each bucket.
+
+    Args:
+        timestamps: Array of POSIX timestamps ordered by time.
+        values: Array of values.
+        interval (float): Bucket size in seconds.
+        aggregate (str, optional): One of AGGREGATES. Defaults to "mean".
+        origin (float, optional): Timestamp where the buckets start. Defaults to the first timestamp rounded down to the interval.
+
+    Returns:
+        tuple: Arrays of bucket start timestamps and aggregated values.
+    '''
+
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate {aggregate}, expected one of {AGGREGATES}")
+    if len(timestamps) == 0:
+        return timestamps, values
+    if origin is None:
+        origin = numpy.floor(timestamps[0] / interval) * interval
+
+    buckets = numpy.floor((timestamps - origin) / interval).astype(numpy.int64)
+    bucket_ids, starts, counts = numpy.unique(buckets, return_index=True, return_counts=True)
+    bucket_timestamps = origin + bucket_ids * interval
+
+    if aggregate == "count":
+        return bucket_timestamps, counts
+    if aggregate == "first":
+        return bucket_timestamps, values[starts]
+    if aggregate == "last":
+        return bucket_timestamps, values[starts + counts - 1]
+    if values.dtype == object:
+        raise ValueError(f"Aggregate {aggregate} requires numeric values")
+    if aggregate == "sum":
+        return bucket_timestamps, numpy.add.reduceat(values, starts)
+    if aggregate == "mean":
+        return bucket_timestamps, numpy.add.reduceat(values, starts) / counts
+    if aggregate == "min":
+        return bucket_timestamps, numpy.minimum.reduceat(values, starts)
+    return bucket_timestamps, numpy.maximum.reduceat(values, starts)
+
+
+def _query_worker(arguments: tuple) -> tuple:
+    data_logs_path, data_property_id, start, end, interval, aggregate, tier = arguments
+    if tier == "raw":
+        timestamps, values = query(data_logs_path, data_property_id, start, end)
+    else:
+        from weconnect_id.tools.log_retention import query_rollups
+
+        timestamps, columns = query_rollups(data_logs_path, data_property_id, tier, start, end)
+        column = aggregate if aggregate in columns else ("last" if aggregate == "first" else "mean")
+        values = columns[column]
+        if interval is not None and aggregate == "count":
+            aggregate = "sum"
+    if interval is not None:
+        timestamps, values = resample(timestamps, values, interval, aggregate)
+    return data_property_id, timestamps, values
+
+
+def query_many(
+    data_logs_path: str,
+    data_property_ids: list,
+    start: float = None,
+    end: float = None,
+    interval: float = None,
+    aggregate: str = "mean",
+    workers: int = None,
+    tier: str = "raw",
+) -> dict:
+    '''
+    Queries multiple WeConnectVehicleDataProperties in parallel processes.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+        data_property_ids (list): IDs of the WeConnectVehicleDataProperties.
+        start (float, optional): Start of the range as POSIX timestamp. Defaults to None.
+        end (float, optional): End of the range as POSIX timestamp. Defaults to None.
+        interval (float, optional): Resampling interval in seconds. Defaults to None which disables resampling.
+        aggregate (str, optional): Aggregate used when resampling. Defaults to "mean".
+        workers (int, optional): Maximum amount of processes. Defaults to the amount of CPU cores.
+        tier (str, optional): "raw" reads the data logs, "5min" and "1h" read the precomputed rollups
+            using the column matching the aggregate. Defaults to "raw".
+
+    Returns:
+        dict: Tuples of timestamp and value arrays by data property ID.
+    '''
+
+    arguments = [
+        (str(data_logs_path), data_property_id, start, end, interval, aggregate, tier)
+        for data_property_id in data_property_ids
+    ]
+    if len(arguments) == 1 or workers == 1:
+        results = map(_query_worker, arguments)
+        return {data_property_id: (timestamps, values) for data_property_id, timestamps, values in results}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return {
+            data_property_id: (timestamps, values)
+            for data_property_id, timestamps, values in executor.map(_query_worker, arguments)
+        }
+
+
+def _to_json_value(value):
+    return value.item() if isinstance(value, numpy.generic) else value
+
+
+def export_csv(results: dict, file) -> None:
+    '''
+    Writes query results as CSV rows of (id, time, value). Time is in ISO 8601 format.
+    '''
+
+    writer = csv.writer(file, delimiter=";")
+    writer.writerow(("id", "time", "value"))
+    for data_property_id, (timestamps, values) in results.items():
+        for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+            writer.writerow(
+                (data_property_id, datetime.fromtimestamp(timestamp).astimezone().isoformat(), value)
+            )
+
+
+def export_json(results: dict, file) -> None:
+    '''
+    Writes query results as JSON object containing list of [time, value] pairs for each data property.
+    '''
+
+    json.dump(
+        {
+            data_property_id: [
+                [datetime.fromtimestamp(timestamp).astimezone().isoformat(), _to_json_value(value)]
+                for timestamp, value in zip(timestamps.tolist(), values.tolist())
+            ]
+            for data_property_id, (timestamps, values) in results.items()
+        },
+        file,
+        indent=1,
+    )
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Query and export recorded vehicle data")
+    parser.add_argument("data_logs", help="Path of the data logs folder")
+    parser.add_argument("ids", nargs="+", help="IDs of the data properties")
+    parser.add_argument("--start", type=_parse_time, help="Start time in ISO 8601 format")
+    parser.add_argument("--end", type=_parse_time, help="End time in ISO 8601 format")
+    parser.add_argument("--resample", type=parse_interval, help="Resampling interval, e.g. 15min or 1h")
+    parser.add_argument("--aggregate", choices=AGGREGATES, default="mean")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--output", help="Output file. Defaults to stdout")
+    parser.add_argument("--workers", type=int, help="Maximum amount of worker processes")
+    parser.add_argument("--tier", choices=TIERS, default="raw", help="Read raw data or precomputed rollups")
+    arguments = parser.parse_args(argv)
+
+    try:
+        results = query_many(
+            data_logs_path=arguments.data_logs,
+            data_property_ids=arguments.ids,
+            start=arguments.start,
+            end=arguments.end,
+            interval=arguments.resample,
+            aggregate=arguments.aggregate,
+            workers=arguments.workers,
+            tier=arguments.tier,
+        )
+    except ValueError as e:
+        # E.g. numeric aggregate of enum values
+        parser.error(str(e))
+    export = export_json if arguments.format == "json" else export_csv
+    if arguments.output is None:
+        export(results, sys.stdout)
+    else:
+        with open(arguments.output, "w", newline="") as output_file:
+            export(results, output_file)
+
+
+if __name__ == "__main__":
+    main()
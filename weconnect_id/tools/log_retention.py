@@ -0,0 +1,408 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from weconnect_id.tools.parquet_export import DataLogExporter
+from datetime import datetime
+from pathlib import Path
+from weconnect_id.tools.log_rotation import DataLogManifest, INDEX_SUFFIX, get_manifest
+from weconnect_id.tools.log_query import read_log_file, parse_values
+import csv
+import math
+import os
+import re
+import time
+import logging
+import numpy
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+ROLLUPS_FOLDER = "rollups"
+ROLLUP_HEADER = ("time", "min", "mean", "max", "last", "count")
+# Rollup tiers by name: (bucket size in seconds, time format of the file names)
+TIERS = {"5min": (300, "%Y-%m"), "1h": (3600, "%Y")}
+
+
+def reduce_rollup(timestamps, columns: dict, interval: float) -> tuple:
+    '''
+    Groups rows into fixed size time buckets. Raw values can be passed as rows whose min, mean, max and last are the value and count is 1.
+
+    Args:
+        timestamps: Array of POSIX timestamps ordered by time.
+        columns (dict): Arrays of "min", "mean", "max", "last" and "count" columns.
+            min, mean and max are NaN for values which are not numbers.
+        interval (float): Bucket size in seconds.
+
+    Returns:
+        tuple: Array of bucket start timestamps and dict of the aggregated columns.
+    '''
+
+    buckets = numpy.floor(timestamps / interval) * interval
+    bucket_timestamps, starts, rows = numpy.unique(buckets, return_index=True, return_counts=True)
+    count = numpy.add.reduceat(columns["count"], starts)
+    return bucket_timestamps, {
+        "min": numpy.minimum.reduceat(columns["min"], starts),
+        "mean": numpy.add.reduceat(columns["mean"] * columns["count"], starts) / count,
+        "max": numpy.maximum.reduceat(columns["max"], starts),
+        "last": columns["last"][starts + rows - 1],
+        "count": count,
+    }
+
+
+def raw_columns(values) -> dict:
+    '''
+    Converts array of raw values into rollup columns.
+    '''
+
+    numbers = values if values.dtype != object else numpy.full(len(values), numpy.nan)
+    return {
+        "min": numbers,
+        "mean": numbers,
+        "max": numbers,
+        "last": values,
+        "count": numpy.ones(len(values), dtype=numpy.int64),
+    }
+
+
+def get_rollup_path(data_logs_path: str, tier: str, key: str, timestamp: float) -> Path:
+    '''
+    Gets path of the rollup file containing the given time, e.g. rollups/5min/battery/batteryLevel.2026-10.csv.
+    '''
+
+    return (
+        Path(data_logs_path)
+        / ROLLUPS_FOLDER
+        / tier
+        / f"{key}.{datetime.fromtimestamp(timestamp).strftime(TIERS[tier][1])}.csv"
+    )
+
+
+def _pop_last_rollup_row(path: Path, timestamp: float) -> list:
+    '''
+    Removes the last row of the rollup file if it is the bucket starting at the given time.
+
+    Returns:
+        list: The removed row. None if the last row is another bucket.
+    '''
+
+    with open(path, "rb+") as rollup_file:
+        size = rollup_file.seek(0, os.SEEK_END)
+        tail_start = max(size - 4096, 0)
+        rollup_file.seek(tail_start)
+        content = rollup_file.read().rstrip(b"\r\n")
+        line_start = content.rfind(b"\n") + 1
+        if line_start == 0 and tail_start > 0:
+            return None
+        row = next(csv.reader([content[line_start:].decode()], delimiter=";"), [])
+        if len(row) != len(ROLLUP_HEADER) or row[0] == ROLLUP_HEADER[0]:
+            return None
+        if datetime.fromisoformat(row[0]).timestamp() != timestamp:
+            return None
+        rollup_file.truncate(tail_start + line_start)
+    return row
+
+
+def _merge_rollup_row(row: list, columns: dict) -> dict:
+    '''
+    Merges a written rollup row into the first bucket of the columns. The row is earlier data of the same bucket.
+    '''
+
+    columns = {column: numpy.array(values) for column, values in columns.items()}
+    count = int(row[5])
+    total = count + int(columns["count"][0])
+    old = {column: float(row[i]) if row[i] else numpy.nan for i, column in enumerate(ROLLUP_HEADER[1:4], start=1)}
+    if not math.isnan(old["min"]):
+        columns["min"][0] = numpy.fmin(old["min"], columns["min"][0])
+        columns["max"][0] = numpy.fmax(old["max"], columns["max"][0])
+        if math.isnan(columns["mean"][0]):
+            columns["mean"][0] = old["mean"]
+        else:
+            columns["mean"][0] = (old["mean"] * count + columns["mean"][0] * columns["count"][0]) / total
+    columns["count"][0] = total
+    return columns
+
+
+def write_rollup(data_logs_path: str, tier: str, key: str, timestamps, columns: dict) -> None:
+    '''
+    Appends rollup rows into the rollup files of the tier. If the first bucket was already written,
+    e.g. because a size-based rotation split it between two segments, the rows are merged into one.
+    '''
+
+    if len(timestamps) > 0:
+        first_path = get_rollup_path(data_logs_path, tier, key, float(timestamps[0]))
+        if first_path.is_file():
+            row = _pop_last_rollup_row(first_path, float(timestamps[0]))
+            if row is not None:
+                columns = _merge_rollup_row(row, columns)
+
+    rows_by_path = {}
+    for i, timestamp in enumerate(timestamps.tolist()):
+        rows_by_path.setdefault(get_rollup_path(data_logs_path, tier, key, timestamp), []).append(
+            (
+                datetime.fromtimestamp(timestamp).astimezone().isoformat(timespec="seconds"),
+                *[_format_number(columns[column][i]) for column in ("min", "mean", "max")],
+                columns["last"][i],
+                int(columns["count"][i]),
+            )
+        )
+
+    for path, rows in rows_by_path.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        exists = path.is_file()
+        with open(path, "a", newline="") as rollup_file:
+            writer = csv.writer(rollup_file, delimiter=";")
+            if not exists:
+                writer.writerow(ROLLUP_HEADER)
+            writer.writerows(rows)
+
+
+def _format_number(value) -> str:
+    return "" if math.isnan(value) else repr(round(float(value), 6))
+
+
+def read_rollup(path: Path) -> tuple:
+    '''
+    Reads rollup file.
+
+    Returns:
+        tuple: Array of bucket start timestamps and dict of the column arrays.
+    '''
+
+    with open(path, "r", newline="") as rollup_file:
+        reader = csv.reader(rollup_file, delimiter=";")
+        next(reader, None)
+        rows = [row for row in reader if len(row) == len(ROLLUP_HEADER)]
+
+    timestamps = numpy.asarray(
+        [datetime.fromisoformat(row[0]).timestamp() for row in rows], dtype="<f8"
+    )
+    columns = {
+        column: numpy.asarray(
+            [float(row[i]) if row[i] else numpy.nan for row in rows], dtype="<f8"
+        )
+        for i, column in enumerate(ROLLUP_HEADER[1:4], start=1)
+    }
+    columns["last"] = parse_values([row[4] for row in rows])
+    columns["count"] = numpy.asarray([int(row[5]) for row in rows], dtype=numpy.int64)
+    return timestamps, columns
+
+
+def query_rollups(
+    data_logs_path: str, data_property_id: str, tier: str, start: float = None, end: float = None
+) -> tuple:
+    '''
+    Reads rollups of a WeConnectVehicleDataProperty.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+        data_property_id (str): ID of the WeConnectVehicleDataProperty.
+        tier (str): Rollup tier, "5min" or "1h".
+        start (float, optional): Start of the range as POSIX timestamp (inclusive). Defaults to None.
+        end (float, optional): End of the range as POSIX timestamp (exclusive). Defaults to None.
+
+    Returns:
+        tuple: Array of bucket start timestamps and dict of the column arrays ordered by time.
+    '''
+
+    name = re.escape(data_property_id.replace(" ", "_"))
+    pattern = re.compile(rf"^{name}(\.runs)?\.\d{{4}}(-\d{{2}})?\.csv$")
+    parts = [
+        read_rollup(path)
+        for path in sorted((Path(data_logs_path) / ROLLUPS_FOLDER / tier).glob("*/*.csv"))
+        if pattern.match(path.name)
+    ]
+    if not parts:
+        empty = numpy.empty(0, dtype="<f8")
+        return empty, {column: empty for column in ROLLUP_HEADER[1:]}
+
+    timestamps = numpy.concatenate([part[0] for part in parts])
+    columns = {}
+    for column in ROLLUP_HEADER[1:]:
+        arrays = [part[1][column] for part in parts]
+        if any(array.dtype == object for array in arrays):
+            arrays = [array.astype(object) for array in arrays]
+        columns[column] = numpy.concatenate(arrays)
+    order = numpy.argsort(timestamps, kind="stable")
+    mask = numpy.ones(len(timestamps), dtype=bool)
+    if start is not None:
+        mask &= timestamps[order] >= start
+    if end is not None:
+        mask &= timestamps[order] < end
+    order = order[mask]
+    return timestamps[order], {column: values[order] for column, values in columns.items()}
+
+
+class DataLogRetention:
+    def __init__(
+        self,
+        data_logs_path: str,
+        raw_days: int = 30,
+        rollup_months: int = 12,
+        compaction_time: str = "03:30",
+        data_log_exporter: DataLogExporter = None,
+    ) -> None:
+        '''
+        Keeps the size of the data logs bounded. Raw rotated segments older than raw days are rolled up
+        into 5 minute min/mean/max/last/count rows, and 5 minute rollups older than rollup months are rolled up into hourly rows.
+        Hourly rollups are kept. Compaction runs once a day and processes one segment at a time.
+
+        Args:
+            data_logs_path (str): Path of the data logs folder.
+            raw_days (int, optional): Days the raw data is kept. Defaults to 30.
+            rollup_months (int, optional): Months the 5 minute rollups are kept. Defaults to 12.
+            compaction_time (str, optional): Time of the day when compaction runs in "%H:%M" format. Defaults to "03:30".
+            data_log_exporter (DataLogExporter, optional): If given, raw segments are kept until their rows are exported
+                into Parquet. Defaults to None.
+        '''
+
+        self.__data_logs_path = Path(data_logs_path)
+        self.__raw_days = raw_days
+        self.__rollup_months = rollup_months
+        self.__compaction_time = compaction_time
+        self.__data_log_exporter = data_log_exporter
+        self.__scheduler = None
+
+    @classmethod
+    def from_config(cls, config: dict, data_log_exporter: DataLogExporter = None):
+        '''
+        Creates DataLogRetention using the optional "retention" config of the "data logger" config.
+        Raw segments are kept until the given DataLogExporter has exported them.
+
+        Returns:
+            DataLogRetention: None if retention is not configured.
+        '''
+
+        retention_config = config.get("data logger", {}).get("retention")
+        if retention_config is None or not retention_config.get("enabled", True):
+            return None
+        return cls(
+            data_logs_path=config["paths"]["data_logs"],
+            raw_days=retention_config.get("raw days", 30),
+            rollup_months=retention_config.get("rollup months", 12),
+            compaction_time=retention_config.get("compaction time", "03:30"),
+            data_log_exporter=data_log_exporter,
+        )
+
+    def start(self) -> None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        hour, minute = self.__compaction_time.split(":")
+        self.__scheduler = BackgroundScheduler(timezone="Europe/Helsinki")
+        self.__scheduler.add_job(
+            id="DATA_LOG_COMPACTION",
+            func=self.compact,
+            trigger="cron",
+            hour=int(hour),
+            minute=int(minute),
+            max_instances=1,
+            coalesce=True,
+        )
+        self.__scheduler.start()
+        LOG.info(f"Started data log compaction (Time: {self.__compaction_time})")
+
+    def stop(self) -> None:
+        if self.__scheduler is not None:
+            self.__scheduler.shutdown(wait=False)
+            self.__scheduler = None
+
+    def compact(self, now: float = None) -> None:
+        now = time.time() if now is None else now
+        LOG.info(f"Compacting data logs (Path: {self.__data_logs_path})")
+        manifest = get_manifest(self.__data_logs_path)
+        raw_cutoff = now - self.__raw_days * 86400
+        for key in manifest.keys():
+            try:
+                self.__compact_raw(manifest, key, raw_cutoff)
+            except Exception as e:
+                LOG.exception(e)
+
+        today = datetime.fromtimestamp(now)
+        months = today.year * 12 + today.month - 1 - self.__rollup_months
+        cutoff_month = f"{months // 12:04d}-{months % 12 + 1:02d}"
+        try:
+            self.__compact_rollups(manifest, cutoff_month)
+        except Exception as e:
+            LOG.exception(e)
+        manifest.save()
+
+    def __is_exported(self, key: str, segment: dict) -> bool:
+        if self.__data_log_exporter is None:
+            return True
+        category, name = key.split("/", 1)
+        if name.endswith(".runs"):
+            name = name[: -len(".runs")]
+        watermark = self.__data_log_exporter.get_watermark(category, name)
+        return watermark is not None and watermark >= segment["end"]
+
+    def __compact_raw(self, manifest: DataLogManifest, key: str, cutoff: float) -> None:
+        for segment in manifest.get_segments(key, include_active=False):
+            if segment["end"] is None or segment["end"] >= cutoff:
+                continue
+            if not self.__is_exported(key, segment):
+                LOG.warning(f"Keeping data log segment (File: {segment['file']}) until it is exported into Parquet")
+                continue
+            with manifest.segment_lock:
+                self.__compact_segment(manifest, key, segment["start"])
+
+    def __compact_segment(self, manifest: DataLogManifest, key: str, start: float) -> None:
+        # File name may have changed by compression after the segments were listed
+        segment = next(
+            (
+                segment
+                for segment in manifest.get_segments(key, include_active=False)
+                if segment["start"] == start
+            ),
+            None,
+        )
+        if segment is None:
+            return
+
+        path = self.__data_logs_path / segment["file"]
+        if path.is_file():
+            watermark = manifest.get_rollup_watermark("5min", key)
+            timestamps, values = read_log_file(path, start=watermark)
+            timestamps = numpy.asarray(timestamps, dtype="<f8")
+            if watermark is not None:
+                values = [value for timestamp, value in zip(timestamps, values) if timestamp > watermark]
+                timestamps = timestamps[timestamps > watermark]
+            if len(timestamps) > 0:
+                order = numpy.argsort(timestamps, kind="stable")
+                values = parse_values(values)[order]
+                timestamps = timestamps[order]
+                bucket_timestamps, columns = reduce_rollup(
+                    timestamps, raw_columns(values), TIERS["5min"][0]
+                )
+                write_rollup(self.__data_logs_path, "5min", key, bucket_timestamps, columns)
+                manifest.set_rollup_watermark("5min", key, float(timestamps[-1]))
+
+        manifest.remove_segment(key, segment["file"])
+        manifest.save()
+        path.unlink(missing_ok=True)
+        path.with_name(path.name + INDEX_SUFFIX).unlink(missing_ok=True)
+        LOG.debug(f"Rolled up data log segment (Path: {path})")
+
+    def __compact_rollups(self, manifest: DataLogManifest, cutoff_month: str) -> None:
+        pattern = re.compile(r"^(?P<name>.+)\.(?P<month>\d{4}-\d{2})\.csv$")
+        for path in sorted((self.__data_logs_path / ROLLUPS_FOLDER / "5min").glob("*/*.csv")):
+            match = pattern.match(path.name)
+            if match is None or match.group("month") >= cutoff_month:
+                continue
+
+            key = f"{path.parent.name}/{match.group('name')}"
+            watermark = manifest.get_rollup_watermark("1h", key)
+            timestamps, columns = read_rollup(path)
+            if watermark is not None:
+                mask = timestamps >= watermark
+                timestamps = timestamps[mask]
+                columns = {column: values[mask] for column, values in columns.items()}
+            if len(timestamps) > 0:
+                if columns["last"].dtype == object:
+                    columns["min"] = columns["mean"] = columns["max"] = numpy.full(len(timestamps), numpy.nan)
+                bucket_timestamps, hourly_columns = reduce_rollup(timestamps, columns, TIERS["1h"][0])
+                write_rollup(self.__data_logs_path, "1h", key, bucket_timestamps, hourly_columns)
+                manifest.set_rollup_watermark("1h", key, float(bucket_timestamps[-1] + TIERS["1h"][0]))
+
+            manifest.save()
+            path.unlink()
+            LOG.debug(f"Rolled up 5 minute rollups (Path: {path})")
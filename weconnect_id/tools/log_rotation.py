@@ -0,0 +1,238 @@
+from pathlib import Path
+from queue import Queue
+from threading import Thread, Lock
+import gzip
+import json
+import os
+import shutil
+import threading
+import logging
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+MANIFEST_NAME = "manifest.json"
+# Suffix of the timestamp index files kept next to the data log files
+INDEX_SUFFIX = ".idx.npz"
+
+_manifests = {}
+_manifests_lock = Lock()
+
+
+def get_manifest(data_logs_path: str):
+    '''
+    Gets the DataLogManifest of a data logs folder. Writers in the same process share one instance
+    so updates made by them are not lost when the manifest is saved.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+
+    Returns:
+        DataLogManifest
+    '''
+
+    key = Path(data_logs_path).resolve()
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = DataLogManifest(data_logs_path)
+            _manifests[key] = manifest
+        return manifest
+
+
+class DataLogManifest:
+    def __init__(self, data_logs_path: str) -> None:
+        '''
+        Keeps record of the data log segments and the time ranges they contain.
+        Stored as manifest.json in the data logs folder.
+
+        Structure:
+            segments: {"<category>/<id>": [{"file", "start", "end", "rows"}, ...]}
+                Closed segments ordered by time. Times are POSIX timestamps, None if unknown.
+            active: {"<category>/<id>": {"file", "start", "end", "rows"}}
+                Segments which are currently written to.
+            rollups: {"<tier>": {"<category>/<id>": watermark}}
+                Time until which the data has been rolled up into each retention tier.
+
+        Args:
+            data_logs_path (str): Path of the data logs folder.
+        '''
+
+        self.__data_logs_path = Path(data_logs_path)
+        self.__path = self.__data_logs_path / MANIFEST_NAME
+        self.__lock = Lock()
+        self.__save_lock = Lock()
+        self.__segment_lock = Lock()
+        self.__manifest = {"segments": {}, "active": {}, "rollups": {}}
+        if self.__path.is_file():
+            try:
+                with open(self.__path, "r") as manifest_file:
+                    self.__manifest.update(json.load(manifest_file))
+            except (OSError, ValueError) as e:
+                LOG.exception(e)
+
+    @property
+    def data_logs_path(self) -> Path:
+        return self.__data_logs_path
+
+    @property
+    def segment_lock(self) -> Lock:
+        '''
+        Lock held while closed segment files are rewritten or removed.
+        '''
+
+        return self.__segment_lock
+
+    def save(self) -> None:
+        with self.__save_lock:
+            with self.__lock:
+                content = json.dumps(self.__manifest, indent=1)
+            self.__data_logs_path.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.__path.with_suffix(".tmp")
+            try:
+                with open(temporary_path, "w") as manifest_file:
+                    manifest_file.write(content)
+                os.replace(temporary_path, self.__path)
+            except OSError as e:
+                LOG.exception(e)
+
+    def get_active(self, key: str) -> dict:
+        with self.__lock:
+            return self.__manifest["active"].get(key)
+
+    def set_active(self, key: str, segment: dict) -> None:
+        with self.__lock:
+            if segment is None:
+                self.__manifest["active"].pop(key, None)
+            else:
+                self.__manifest["active"][key] = segment
+
+    def add_segment(self, key: str, segment: dict) -> None:
+        with self.__lock:
+            self.__manifest["segments"].setdefault(key, []).append(segment)
+
+    def replace_segment_file(self, key: str, old_file: str, new_file: str) -> None:
+        with self.__lock:
+            for segment in self.__manifest["segments"].get(key, []):
+                if segment["file"] == old_file:
+                    segment["file"] = new_file
+
+    def remove_segment(self, key: str, file: str) -> None:
+        with self.__lock:
+            segments = self.__manifest["segments"].get(key, [])
+            self.__manifest["segments"][key] = [
+                segment for segment in segments if segment["file"] != file
+            ]
+
+    def get_rollup_watermark(self, tier: str, key: str) -> float:
+        with self.__lock:
+            return self.__manifest["rollups"].get(tier, {}).get(key)
+
+    def set_rollup_watermark(self, tier: str, key: str, watermark: float) -> None:
+        with self.__lock:
+            self.__manifest["rollups"].setdefault(tier, {})[key] = watermark
+
+    def keys(self) -> list:
+        with self.__lock:
+            return sorted(
+                set(self.__manifest["segments"]) | set(self.__manifest["active"])
+            )
+
+    def get_segments(
+        self, key: str, start: float = None, end: float = None, include_active: bool = True
+    ) -> list:
+        '''
+        Get segments of a data log which may contain rows inside the given time range.
+        Segments with unknown bounds are always included.
+
+        Args:
+            key (str): Data log key in "<category>/<id>" format.
+            start (float, optional): Start of the time range as POSIX timestamp. Defaults to None.
+            end (float, optional): End of the time range as POSIX timestamp. Defaults to None.
+            include_active (bool, optional): If the active segment should be included. Defaults to True.
+
+        Returns:
+            list: Segment dicts ordered by time.
+        '''
+
+        with self.__lock:
+            segments = [dict(segment) for segment in self.__manifest["segments"].get(key, [])]
+            active = self.__manifest["active"].get(key)
+            if include_active and active is not None:
+                segments.append(dict(active, end=None))
+
+        return [
+            segment
+            for segment in segments
+            if not (
+                (start is not None and segment["end"] is not None and segment["end"] < start)
+                or (end is not None and segment["start"] is not None and segment["start"] >= end)
+            )
+        ]
+
+
+class SegmentCompressor:
+    def __init__(self, niceness: int = 19) -> None:
+        '''
+        Compresses closed data log segments with gzip in a low priority background thread.
+
+        Args:
+            niceness (int, optional): Niceness of the compressor thread. Defaults to 19.
+        '''
+
+        self.__niceness = niceness
+        self.__queue = Queue()
+        self.__thread = Thread(target=self.__run, name="SegmentCompressor", daemon=True)
+        self.__thread.start()
+
+    def compress(self, manifest: DataLogManifest, key: str, file: str) -> None:
+        '''
+        Queues segment to be compressed. Manifest is updated after compression.
+
+        Args:
+            manifest (DataLogManifest): Manifest of the segment.
+            key (str): Data log key of the segment.
+            file (str): Path of the segment relative to the data logs folder.
+        '''
+
+        self.__queue.put((manifest, key, file))
+
+    def close(self, timeout: float = None) -> None:
+        self.__queue.put(None)
+        self.__thread.join(timeout=timeout)
+
+    def __run(self) -> None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.__niceness)
+        except (AttributeError, OSError) as e:
+            LOG.debug(f"Could not lower SegmentCompressor priority ({e!r})")
+
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+            manifest, key, file = item
+            try:
+                self.__compress(manifest, key, file)
+            except Exception as e:
+                LOG.exception(e)
+
+    def __compress(self, manifest: DataLogManifest, key: str, file: str) -> None:
+        source = manifest.data_logs_path / file
+        target = source.with_name(source.name + ".gz")
+        with manifest.segment_lock:
+            if not source.is_file() or not any(
+                segment["file"] == file
+                for segment in manifest.get_segments(key, include_active=False)
+            ):
+                return
+            LOG.debug(f"Compressing data log segment (Path: {source})")
+            temporary_target = target.with_name(target.name + ".tmp")
+            with open(source, "rb") as source_file, gzip.open(temporary_target, "wb") as target_file:
+                shutil.copyfileobj(source_file, target_file)
+            os.replace(temporary_target, target)
+            manifest.replace_segment_file(key, file, file + ".gz")
+            manifest.save()
+            source.unlink()
+            source.with_name(source.name + INDEX_SUFFIX).unlink(missing_ok=True)
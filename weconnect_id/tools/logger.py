@@ -2,9 +2,16 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from weconnect_id.data_providers.vehicle_data_property import WeConnectVehicleDataProperty
-import csv
+from collections import OrderedDict
+from queue import Queue, Empty, Full
+from threading import Thread, Lock
+from weakref import WeakSet
 from pathlib import Path
+from datetime import datetime
+from weconnect_id.tools.log_rotation import DataLogManifest, SegmentCompressor, INDEX_SUFFIX, get_manifest
+import csv
 import os
+import time
 import logging
 
 
@@ -15,37 +22,691 @@ class WeConnectLoggerError(Exception):
 LOG = logging.getLogger("vehicle_data_logger")
 
 
-def log(data_property: WeConnectVehicleDataProperty) -> None:
+LOG_MODES = ("every", "changes", "runs")
+
+
+def format_log_time(timestamp: float) -> str:
     '''
-    Used to log data from WeConnectVehicleDataProperties
+    Formats POSIX timestamp into the time column of the data logs.
 
-    Args:
-        data_property (WeConnectVehicleDataProperty): WeConnectVehicleDataProperty where the data is logged from.
-    '''
-    
-    path = data_property.logger_path
-    LOG.debug(
-        f"Logging data from WeconnectVehicleDataProperty (ID: {data_property.id})"
-    )
-    dir_path = Path(path + f"/{data_property.category}")
-    if not dir_path.is_dir():
-        try:
+    Returns:
+        str: Local time in ISO 8601 format including the UTC offset, e.g. 2026-03-29T03:00:00+03:00.
+    '''
+
+    return datetime.fromtimestamp(timestamp).astimezone().isoformat(timespec="seconds")
+
+
+class DataLogRecord:
+    __slots__ = ("id", "category", "path", "row", "value", "timestamp", "end_timestamp")
+
+    def __init__(
+        self,
+        id: str,
+        category: str,
+        path: str,
+        row: tuple,
+        value,
+        timestamp: float,
+        end_timestamp: float = None,
+    ) -> None:
+        '''
+        Single logged value of a WeConnectVehicleDataProperty.
+
+        Args:
+            id (str): ID of the WeConnectVehicleDataProperty.
+            category (str): Category of the WeConnectVehicleDataProperty.
+            path (str): Path of the folder where the data logs are saved.
+            row (tuple): Row written to the CSV log.
+            value: Value of the WeConnectVehicleDataProperty.
+            timestamp (float): Time of the value as POSIX timestamp.
+            end_timestamp (float, optional): Last time the value was seen if the record is a run of identical values.
+                Defaults to None.
+        '''
+
+        self.id = id
+        self.category = category
+        self.path = path
+        self.row = row
+        self.value = value
+        self.timestamp = timestamp
+        self.end_timestamp = end_timestamp
+
+    @property
+    def is_run(self) -> bool:
+        return self.end_timestamp is not None
+
+
+class DataLogPolicy:
+    def __init__(self, mode: str = "every", heartbeat_interval: float = None) -> None:
+        '''
+        Decides which observed values of a WeConnectVehicleDataProperty are written to the data logs.
+
+        Modes:
+            every: Every observed value is written.
+            changes: Only values which differ from the last written value are written.
+            runs: Identical consecutive values are collapsed into (value, first seen, last seen) runs
+                which are written when the value changes.
+
+        Args:
+            mode (str, optional): One of LOG_MODES. Defaults to "every".
+            heartbeat_interval (float, optional): Seconds after which the current value is written again even if it hasn't changed.
+                In runs mode the open run is written and a new one started. Defaults to None.
+
+        Raises:
+            ValueError: Raised if the mode is unknown.
+        '''
+
+        if mode not in LOG_MODES:
+            raise ValueError(f"Unknown data log mode {mode}, expected one of {LOG_MODES}")
+        self.__mode = mode
+        self.__heartbeat_interval = heartbeat_interval
+        self.__lock = Lock()
+        self.__logged = False
+        self.__last_value = None
+        self.__last_written = None
+        self.__run = None
+        _policies.add(self)
+
+    @classmethod
+    def from_config(cls, config: dict, data_property_id: str):
+        '''
+        Creates DataLogPolicy using the optional "log mode", "log modes" and "heartbeat interval" keys of the "data logger" config.
+        "log modes" can override the mode for single WeConnectVehicleDataProperties.
+
+        Args:
+            config (dict): App configuration.
+            data_property_id (str): ID of the WeConnectVehicleDataProperty.
+
+        Returns:
+            DataLogPolicy
+        '''
+
+        logger_config = config.get("data logger", {})
+        return cls(
+            mode=logger_config.get("log modes", {}).get(
+                data_property_id, logger_config.get("log mode", "every")
+            ),
+            heartbeat_interval=logger_config.get("heartbeat interval"),
+        )
+
+    @property
+    def mode(self) -> str:
+        return self.__mode
+
+    def observe(self, data_property: WeConnectVehicleDataProperty) -> list:
+        '''
+        Registers observed value of the WeConnectVehicleDataProperty.
+
+        Returns:
+            list: DataLogRecords which should be written.
+        '''
+
+        value = data_property.value
+        timestamp = data_property.last_update_timestamp
+        with self.__lock:
+            if self.__mode == "runs":
+                return self.__observe_run(data_property, value, timestamp)
+
+            if self.__mode == "changes" and self.__logged and value == self.__last_value:
+                return []
+            self.__logged = True
+            self.__last_value = value
+            self.__last_written = timestamp
+            return [
+                DataLogRecord(
+                    id=data_property.id,
+                    category=data_property.category,
+                    path=data_property.logger_path,
+                    row=data_property.logger_value_format,
+                    value=value,
+                    timestamp=timestamp,
+                )
+            ]
+
+    def heartbeat(self, data_property: WeConnectVehicleDataProperty, now: float = None) -> list:
+        '''
+        Writes the current value again if heartbeat interval has passed since it was last written.
+
+        Args:
+            data_property (WeConnectVehicleDataProperty): WeConnectVehicleDataProperty the policy belongs to.
+            now (float, optional): Current POSIX timestamp. Defaults to time.time().
+
+        Returns:
+            list: DataLogRecords which should be written.
+        '''
+
+        now = time.time() if now is None else now
+        with self.__lock:
+            if self.__heartbeat_interval is None:
+                return []
+
+            if self.__mode == "runs":
+                if self.__run is None or now - self.__run.timestamp < self.__heartbeat_interval:
+                    return []
+                self.__run.end_timestamp = now
+                record = self.__close_run()
+                self.__start_run(data_property, data_property.value, now)
+                return [record]
+
+            if not self.__logged or now - self.__last_written < self.__heartbeat_interval:
+                return []
+            self.__last_written = now
+            return [
+                DataLogRecord(
+                    id=data_property.id,
+                    category=data_property.category,
+                    path=data_property.logger_path,
+                    row=(
+                        data_property.custom_value_format(translate=False, include_unit=True),
+                        format_log_time(now),
+                    ),
+                    value=data_property.value,
+                    timestamp=now,
+                )
+            ]
+
+    def close(self) -> list:
+        '''
+        Closes the open run.
+
+        Returns:
+            list: DataLogRecords which should be written.
+        '''
+
+        with self.__lock:
+            if self.__run is None:
+                return []
+            return [self.__close_run()]
+
+    def __observe_run(self, data_property: WeConnectVehicleDataProperty, value, timestamp: float) -> list:
+        if self.__run is not None and self.__run.value == value:
+            self.__run.end_timestamp = max(self.__run.end_timestamp, timestamp)
+            return []
+
+        records = [] if self.__run is None else [self.__close_run()]
+        self.__start_run(data_property, value, timestamp)
+        return records
+
+    def __start_run(self, data_property: WeConnectVehicleDataProperty, value, timestamp: float) -> None:
+        self.__run = DataLogRecord(
+            id=data_property.id,
+            category=data_property.category,
+            path=data_property.logger_path,
+            row=(data_property.custom_value_format(translate=False, include_unit=True),),
+            value=value,
+            timestamp=timestamp,
+            end_timestamp=timestamp,
+        )
+
+    def __close_run(self) -> DataLogRecord:
+        run, self.__run = self.__run, None
+        run.row = (
+            *run.row,
+            format_log_time(run.timestamp),
+            format_log_time(run.end_timestamp),
+        )
+        return run
+
+
+class CSVDataLogBackend:
+    HEADER = ("value", "time")
+    RUN_HEADER = ("value", "first time", "last time")
+
+    def __init__(
+        self,
+        max_open_files: int = 64,
+        fsync: str = "never",
+        rotation: str = "daily",
+        max_segment_size: int = 4 * 1024**2,
+        compress: bool = True,
+    ) -> None:
+        '''
+        Writes data logs into <category>/<id>.csv files and runs of identical values into <category>/<id>.runs.csv files.
+        Opened files are kept open between writes.
+        Files are rotated into <category>/<id>.<date>.csv segments which are listed in the manifest of the data logs folder
+        and compressed in the background.
+
+        Args:
+            max_open_files (int, optional): Maximum amount of files kept open. Defaults to 64.
+            fsync (str, optional): "never" leaves syncing to the OS, "flush" syncs files after each batch
+                and "close" syncs files when they are closed. Defaults to "never".
+            rotation (str, optional): "daily" starts new segment when the day changes,
+                "size" when the segment grows over max segment size and "none" disables rotation. Defaults to "daily".
+                Files written in an older format are always rotated before writing to them.
+            max_segment_size (int, optional): Segment size in bytes used by size based rotation. Defaults to 4 MiB.
+            compress (bool, optional): If the rotated segments should be compressed. Defaults to True.
+        '''
+
+        self.__max_open_files = max_open_files
+        self.__fsync = fsync
+        self.__rotation = rotation
+        self.__max_segment_size = max_segment_size
+        self.__compressor = SegmentCompressor() if compress else None
+        self.__files = OrderedDict()
+        self.__manifests = {}
+        self.__segments = {}
+
+    def write(self, records: list) -> None:
+        for record in records:
+            file_path = self.__get_file_path(record)
+            try:
+                writer = self.__get_writer(file_path, record)
+                if self.__rotation_needed(file_path, record):
+                    self.__rotate(file_path)
+                    writer = self.__get_writer(file_path, record)
+                writer.writerow(record.row)
+                segment = self.__segments[file_path]["segment"]
+                if segment["start"] is None or record.timestamp < segment["start"]:
+                    segment["start"] = record.timestamp
+                segment["end"] = record.end_timestamp if record.is_run else record.timestamp
+                segment["rows"] += 1
+            except Exception as e:
+                LOG.exception(e)
+                self.__close_file(file_path)
+
+    def flush(self) -> None:
+        for file_path in list(self.__files):
+            file, _ = self.__files[file_path]
+            try:
+                file.flush()
+                if self.__fsync == "flush":
+                    os.fsync(file.fileno())
+            except OSError as e:
+                LOG.exception(e)
+                self.__close_file(file_path)
+
+    def close(self) -> None:
+        for file_path in list(self.__files):
+            self.__close_file(file_path)
+        for manifest in self.__manifests.values():
+            manifest.save()
+        if self.__compressor is not None:
+            self.__compressor.close(timeout=0)
+
+    def __get_file_path(self, record: DataLogRecord) -> Path:
+        name = record.id.replace(" ", "_")
+        if record.is_run:
+            name += ".runs"
+        return Path(record.path) / record.category / f"{name}.csv"
+
+    def __get_manifest(self, data_logs_path: str) -> DataLogManifest:
+        manifest = self.__manifests.get(data_logs_path)
+        if manifest is None:
+            manifest = get_manifest(data_logs_path)
+            self.__manifests[data_logs_path] = manifest
+            if self.__compressor is not None:
+                for key in manifest.keys():
+                    for segment in manifest.get_segments(key, include_active=False):
+                        if not segment["file"].endswith(".gz"):
+                            self.__compressor.compress(manifest, key, segment["file"])
+        return manifest
+
+    def __load_segment(self, file_path: Path, record: DataLogRecord, exists: bool) -> None:
+        manifest = self.__get_manifest(record.path)
+        key = f"{record.category}/{file_path.stem}"
+        file = f"{record.category}/{file_path.name}"
+        segment = manifest.get_active(key)
+        if segment is None or segment["file"] != file:
+            segment = {
+                "file": file,
+                "start": None if exists else record.timestamp,
+                "end": None,
+                "rows": 0,
+            }
+            manifest.set_active(key, segment)
+            manifest.save()
+
+        if segment["start"] is not None:
+            day = datetime.fromtimestamp(segment["start"]).date()
+        else:
+            day = datetime.fromtimestamp(file_path.stat().st_mtime).date()
+        self.__segments[file_path] = {
+            "manifest": manifest,
+            "key": key,
+            "segment": segment,
+            "day": day,
+            "outdated": exists and not self.__has_header(file_path, record),
+        }
+
+    def __has_header(self, file_path: Path, record: DataLogRecord) -> bool:
+        with open(file_path, "r", newline="") as file:
+            header = next(csv.reader(file, delimiter=";"), [])
+        return tuple(header) == (self.RUN_HEADER if record.is_run else self.HEADER)
+
+    def __rotation_needed(self, file_path: Path, record: DataLogRecord) -> bool:
+        if self.__segments[file_path]["outdated"]:
+            return True
+        if self.__rotation == "daily":
+            return datetime.fromtimestamp(record.timestamp).date() != self.__segments[file_path]["day"]
+        if self.__rotation == "size":
+            return self.__files[file_path][0].tell() >= self.__max_segment_size
+        return False
+
+    def __rotate(self, file_path: Path) -> None:
+        self.__close_file(file_path)
+        state = self.__segments.pop(file_path)
+        manifest = state["manifest"]
+        segment = state["segment"]
+
+        target = file_path.with_name(f"{file_path.stem}.{state['day'].isoformat()}.csv")
+        number = 1
+        while target.exists() or target.with_name(target.name + ".gz").exists():
+            target = file_path.with_name(f"{file_path.stem}.{state['day'].isoformat()}-{number}.csv")
+            number += 1
+        os.replace(file_path, target)
+        # Index of the rotated file would otherwise be taken for the index of the new active file
+        file_path.with_name(file_path.name + INDEX_SUFFIX).unlink(missing_ok=True)
+        LOG.info(f"Rotated data log (Path: {file_path}) to (Path: {target})")
+
+        file = f"{file_path.parent.name}/{target.name}"
+        manifest.add_segment(state["key"], dict(segment, file=file))
+        manifest.set_active(state["key"], None)
+        manifest.save()
+        if self.__compressor is not None:
+            self.__compressor.compress(manifest, state["key"], file)
+
+    def __get_writer(self, file_path: Path, record: DataLogRecord):
+        if file_path in self.__files:
+            self.__files.move_to_end(file_path)
+            return self.__files[file_path][1]
+
+        while len(self.__files) >= self.__max_open_files:
+            self.__close_file(next(iter(self.__files)))
+
+        dir_path = file_path.parent
+        if not dir_path.is_dir():
             LOG.info(f"Creating new folder (PATH: {dir_path})")
-            os.mkdir(dir_path)
+            dir_path.mkdir(parents=True, exist_ok=True)
+
+        exists = file_path.is_file()
+        if file_path not in self.__segments:
+            self.__load_segment(file_path, record, exists)
+        file = open(file_path, "a", newline="")
+        writer = csv.writer(file, delimiter=";")
+        if not exists:
+            writer.writerow(self.RUN_HEADER if record.is_run else self.HEADER)
+        self.__files[file_path] = (file, writer)
+        return writer
+
+    def __close_file(self, file_path: Path) -> None:
+        file, _ = self.__files.pop(file_path, (None, None))
+        if file is None:
+            return
+        try:
+            file.flush()
+            if self.__fsync in ("flush", "close"):
+                os.fsync(file.fileno())
+            file.close()
         except OSError as e:
             LOG.exception(e)
 
-    file_path = Path(str(dir_path) + f"/{data_property.id.replace(' ', '_')}.csv")
-    exists = file_path.is_file()
 
-    try:
-        with open(file_path, "a") as csv_file:
-            writer = csv.writer(csv_file, delimiter=";")
-            if not exists:
-                writer.writerow(("value", "time", "date"))
-            LOG.debug(
-                f"Writing data from WeconnectVehicleDataProperty (ID: {data_property.id}) to (Path: {file_path})"
+class DataLogWriter:
+    __FLUSH = object()
+    __STOP = object()
+    __SET_SINK = object()
+
+    def __init__(
+        self,
+        backend=None,
+        queue_size: int = 10000,
+        flush_size: int = 200,
+        flush_interval: float = 30,
+    ) -> None:
+        '''
+        Writes data logs in a background thread. Records are queued and written in batches
+        when flush size or flush interval is reached or when a flush is requested.
+
+        Args:
+            backend (optional): Backend where the records are written to. Defaults to CSVDataLogBackend.
+            queue_size (int, optional): Maximum amount of queued records. Defaults to 10000.
+            flush_size (int, optional): Amount of pending records which triggers a write. Defaults to 200.
+            flush_interval (float, optional): Maximum time in seconds records are kept pending. Defaults to 30.
+        '''
+
+        LOG.debug("Initializing DataLogWriter")
+        self.__backend = CSVDataLogBackend() if backend is None else backend
+        self.__queue = Queue(maxsize=queue_size)
+        self.__flush_size = flush_size
+        self.__flush_interval = flush_interval
+        self.__dropped_records = 0
+        # Changed only on the writer thread, so batches and sink changes are handled in queue order
+        self.__sinks = {}
+        self.__thread = Thread(target=self.__run, name="DataLogWriter", daemon=True)
+        self.__thread.start()
+
+    @classmethod
+    def from_config(cls, config: dict):
+        '''
+        Creates DataLogWriter using the optional "data logger" config.
+
+        Args:
+            config (dict): App configuration.
+
+        Returns:
+            DataLogWriter
+        '''
+
+        logger_config = config.get("data logger", {})
+        if logger_config.get("backend", "csv") == "sqlite":
+            from weconnect_id.tools.sqlite_log_backend import SQLiteDataLogBackend
+
+            backend = SQLiteDataLogBackend(
+                database_path=logger_config.get("database"),
+                synchronous=logger_config.get("synchronous", "NORMAL"),
             )
-            writer.writerow(data_property.logger_value_format)
-    except Exception as e:
-        LOG.exception(e)
+        else:
+            backend = CSVDataLogBackend(
+                max_open_files=logger_config.get("max open files", 64),
+                fsync=logger_config.get("fsync", "never"),
+                rotation=logger_config.get("rotation", "daily"),
+                max_segment_size=logger_config.get("max segment size", 4 * 1024**2),
+                compress=logger_config.get("compress", True),
+            )
+        return cls(
+            backend=backend,
+            queue_size=logger_config.get("queue size", 10000),
+            flush_size=logger_config.get("flush size", 200),
+            flush_interval=logger_config.get("flush interval", 30),
+        )
+
+    def add_sink(self, id: str, sink) -> None:
+        '''
+        Adds sink which receives the same batches of records as the backend. Records queued before the sink
+        are not written to it. Sink with same ID is replaced and the old one closed after the records queued before it.
+
+        Args:
+            id (str): ID for the sink so it can be removed later.
+            sink: Object with write(records), flush() and close() methods.
+        '''
+
+        self.__queue.put((self.__SET_SINK, id, sink))
+        LOG.debug(f"Added data log sink (ID: {id})")
+
+    def remove_sink(self, id: str) -> None:
+        self.__queue.put((self.__SET_SINK, id, None))
+        LOG.debug(f"Removed data log sink (ID: {id})")
+
+    def __set_sink(self, id: str, sink) -> None:
+        old_sink = self.__sinks.pop(id, None)
+        if sink is not None:
+            self.__sinks[id] = sink
+        if old_sink is not None and old_sink is not sink:
+            try:
+                old_sink.close()
+            except Exception as e:
+                LOG.exception(e)
+
+    def write(self, record: DataLogRecord) -> None:
+        '''
+        Queues record to be written. Never blocks, so a slow disk can't stall the update thread.
+
+        Raises:
+            WeConnectLoggerError: Raised if the queue is full and the record is dropped.
+        '''
+
+        try:
+            self.__queue.put_nowait(record)
+        except Full:
+            self.__dropped_records += 1
+            raise WeConnectLoggerError(
+                f"Data log queue is full, dropped record of WeConnectVehicleDataProperty (ID: {record.id}) "
+                f"(Dropped records: {self.__dropped_records})"
+            )
+
+    @property
+    def dropped_records(self) -> int:
+        return self.__dropped_records
+
+    def flush(self) -> None:
+        '''
+        Requests pending records to be written without waiting for it.
+        '''
+
+        try:
+            self.__queue.put_nowait(self.__FLUSH)
+        except Full:
+            pass
+
+    def close(self, timeout: float = 10) -> None:
+        '''
+        Writes pending records, closes the backend and stops the writer thread.
+
+        Args:
+            timeout (float, optional): Maximum time to wait for the writer thread. Defaults to 10.
+        '''
+
+        LOG.debug("Closing DataLogWriter")
+        self.__queue.put(self.__STOP)
+        self.__thread.join(timeout=timeout)
+
+    def __run(self) -> None:
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.__queue.get(timeout=timeout)
+            except Empty:
+                item = self.__FLUSH
+
+            if item is self.__STOP:
+                self.__write(pending)
+                for target in [self.__backend, *self.__sinks.values()]:
+                    try:
+                        target.close()
+                    except Exception as e:
+                        LOG.exception(e)
+                return
+
+            if isinstance(item, tuple) and item[0] is self.__SET_SINK:
+                self.__write(pending)
+                pending = []
+                deadline = None
+                self.__set_sink(*item[1:])
+                continue
+
+            if item is not self.__FLUSH:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.__flush_interval
+                if len(pending) < self.__flush_size:
+                    continue
+
+            self.__write(pending)
+            pending = []
+            deadline = None
+
+    def __write(self, records: list) -> None:
+        if not records:
+            return
+        for target in [self.__backend, *self.__sinks.values()]:
+            try:
+                target.write(records)
+                target.flush()
+            except Exception as e:
+                LOG.exception(e)
+
+
+_writer = None
+_writer_lock = Lock()
+_policies = WeakSet()
+
+
+def start_data_logger(config: dict) -> DataLogWriter:
+    '''
+    Starts the background writer used to log data from WeConnectVehicleDataProperties.
+
+    Args:
+        config (dict): App configuration.
+
+    Returns:
+        DataLogWriter
+    '''
+
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DataLogWriter.from_config(config)
+        return _writer
+
+
+def stop_data_logger() -> None:
+    '''
+    Writes pending data logs and stops the background writer.
+    '''
+
+    close_data_log_policies()
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def close_data_log_policies() -> None:
+    '''
+    Writes the open runs of all DataLogPolicies.
+    '''
+
+    for policy in list(_policies):
+        for record in policy.close():
+            try:
+                log_record(record)
+            except WeConnectLoggerError as e:
+                LOG.exception(e)
+
+
+def add_data_log_sink(id: str, sink) -> None:
+    '''
+    Adds sink which receives all logged records.
+
+    Args:
+        id (str): ID for the sink.
+        sink: Object with write(records), flush() and close() methods.
+    '''
+
+    writer = _writer if _writer is not None else start_data_logger({})
+    writer.add_sink(id, sink)
+
+
+def flush_data_logger() -> None:
+    '''
+    Requests pending data logs to be written.
+    '''
+
+    writer = _writer
+    if writer is not None:
+        writer.flush()
+
+
+def log_record(record: DataLogRecord) -> None:
+    '''
+    Queues DataLogRecord to be written by the background writer.
+
+    Raises:
+        WeConnectLoggerError: Raised if the record is dropped.
+    '''
+
+    writer = _writer if _writer is not None else start_data_logger({})
+    writer.write(record)
@@ -0,0 +1,299 @@
+from datetime import datetime
+from pathlib import Path
+from weconnect_id.tools.log_rotation import MANIFEST_NAME, get_manifest
+from weconnect_id.tools.log_query import query
+import argparse
+import json
+import os
+import re
+import time
+import logging
+import numpy
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+WATERMARKS_NAME = "_watermarks.json"
+LOG_FILE_PATTERN = re.compile(r"^(?P<name>[^.]+)(\.runs)?(\.\d{4}-\d{2}-\d{2}(-\d+)?)?\.csv(\.gz)?$")
+
+
+class DataLogExportError(Exception):
+    pass
+
+
+def _import_pyarrow() -> tuple:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise DataLogExportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+    return pyarrow, pyarrow.parquet
+
+
+def find_data_logs(data_logs_path: str) -> list:
+    '''
+    Lists the logged WeConnectVehicleDataProperties from the data log file names.
+
+    Args:
+        data_logs_path (str): Path of the data logs folder.
+
+    Returns:
+        list: Sorted (category, data log name) tuples.
+    '''
+
+    logs = set()
+    for path in Path(data_logs_path).glob("*/*.csv*"):
+        match = LOG_FILE_PATTERN.match(path.name)
+        if match is not None:
+            logs.add((path.parent.name, match.group("name")))
+    return sorted(logs)
+
+
+def split_by_month(timestamps) -> list:
+    '''
+    Splits timestamps ordered by time into local calendar months.
+
+    Args:
+        timestamps: Array of POSIX timestamps ordered by time.
+
+    Returns:
+        list: (month in "%Y-%m" format, first row, last row) tuples. Last row is exclusive.
+    '''
+
+    if len(timestamps) == 0:
+        return []
+
+    first = datetime.fromtimestamp(timestamps[0])
+    last = datetime.fromtimestamp(timestamps[-1])
+    months = []
+    bounds = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        bounds.append(datetime(year, month, 1).timestamp())
+
+    ends = numpy.searchsorted(timestamps, bounds, side="left")
+    starts = numpy.concatenate(([0], ends[:-1]))
+    return [
+        (month, int(start), int(end))
+        for month, start, end in zip(months, starts, ends)
+        if end > start
+    ]
+
+
+class DataLogExporter:
+    def __init__(
+        self,
+        data_logs_path: str,
+        export_path: str,
+        delay: float = 300,
+        compression: str = "zstd",
+        export_time: str = "04:00",
+    ) -> None:
+        '''
+        Converts data logs into Parquet files partitioned by category and month:
+        <export path>/category=<category>/month=<%Y-%m>/<id>.<first timestamp>.parquet
+
+        The data logs are shared by all vehicles, so the rows are not partitioned by vehicle.
+
+        All files share the same columns: "time" as UTC timestamp, dictionary encoded "id", "value" as float64
+        for data logs whose values are numbers and dictionary encoded "state" for the others (e.g. enums like chargeState).
+        Exports are incremental, only rows newer than the watermark of the data log are read.
+        Watermarks are stored in _watermarks.json in the export folder.
+
+        Args:
+            data_logs_path (str): Path of the data logs folder.
+            export_path (str): Path of the Parquet dataset folder.
+            delay (float, optional): Rows newer than this many seconds are left for the next export,
+                so rows still queued in the DataLogWriter are not skipped. Defaults to 300.
+            compression (str, optional): Parquet compression codec. Defaults to "zstd".
+            export_time (str, optional): Time of the day when the scheduled export runs in "%H:%M" format. Defaults to "04:00".
+        '''
+
+        self.__data_logs_path = Path(data_logs_path)
+        self.__export_path = Path(export_path)
+        self.__delay = delay
+        self.__compression = compression
+        self.__export_time = export_time
+        self.__scheduler = None
+        self.__watermarks_path = self.__export_path / WATERMARKS_NAME
+        self.__watermarks = {}
+        if self.__watermarks_path.is_file():
+            with open(self.__watermarks_path, "r") as watermarks_file:
+                for key, watermark in json.load(watermarks_file).items():
+                    # Keys of older versions were prefixed with the VIN of the selected vehicle
+                    key = "/".join(key.split("/")[-2:])
+                    self.__watermarks[key] = max(watermark, self.__watermarks.get(key, watermark))
+
+    @classmethod
+    def from_config(cls, config: dict):
+        '''
+        Creates DataLogExporter using the optional "parquet export" config of the "data logger" config.
+
+        Returns:
+            DataLogExporter: None if Parquet export is not configured.
+        '''
+
+        export_config = config.get("data logger", {}).get("parquet export")
+        if export_config is None or not export_config.get("enabled", True):
+            return None
+        return cls(
+            data_logs_path=config["paths"]["data_logs"],
+            export_path=export_config.get(
+                "path", str(Path(config["paths"]["data_logs"]).parent / "parquet")
+            ),
+            delay=export_config.get("delay", 300),
+            compression=export_config.get("compression", "zstd"),
+            export_time=export_config.get("export time", "04:00"),
+        )
+
+    def get_watermark(self, category: str, name: str) -> float:
+        '''
+        Gets the time of the last exported row of a data log.
+
+        Args:
+            category (str): Category of the data log.
+            name (str): Name of the data log, i.e. the ID of the WeConnectVehicleDataProperty.
+
+        Returns:
+            float: POSIX timestamp. None if nothing is exported yet.
+        '''
+
+        return self.__watermarks.get(f"{category}/{name}")
+
+    def start(self) -> None:
+        _import_pyarrow()
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        hour, minute = self.__export_time.split(":")
+        self.__scheduler = BackgroundScheduler(timezone="Europe/Helsinki")
+        self.__scheduler.add_job(
+            id="DATA_LOG_PARQUET_EXPORT",
+            func=self.export,
+            trigger="cron",
+            hour=int(hour),
+            minute=int(minute),
+            max_instances=1,
+            coalesce=True,
+        )
+        self.__scheduler.start()
+        LOG.info(f"Started Parquet export (Path: {self.__export_path}) (Time: {self.__export_time})")
+
+    def stop(self) -> None:
+        if self.__scheduler is not None:
+            self.__scheduler.shutdown(wait=False)
+            self.__scheduler = None
+
+    def export(self, now: float = None) -> int:
+        '''
+        Exports rows logged after the watermarks.
+
+        Args:
+            now (float, optional): POSIX timestamp used as the current time. Defaults to time.time().
+
+        Returns:
+            int: Amount of exported rows.
+        '''
+
+        pyarrow, parquet = _import_pyarrow()
+        end = (time.time() if now is None else now) - self.__delay
+        LOG.info(f"Exporting data logs (Path: {self.__data_logs_path}) into Parquet (Path: {self.__export_path})")
+
+        manifest = None
+        if (self.__data_logs_path / MANIFEST_NAME).is_file():
+            manifest = get_manifest(self.__data_logs_path)
+
+        exported = 0
+        for category, name in find_data_logs(self.__data_logs_path):
+            try:
+                exported += self.__export_log(pyarrow, parquet, manifest, category, name, end)
+            except Exception as e:
+                LOG.exception(e)
+        LOG.info(f"Exported {exported} rows into Parquet (Path: {self.__export_path})")
+        return exported
+
+    def __export_log(self, pyarrow, parquet, manifest, category: str, name: str, end: float) -> int:
+        key = f"{category}/{name}"
+        watermark = self.__watermarks.get(key)
+        if manifest is not None:
+            # Keeps the retention compaction from removing segments while they are read
+            with manifest.segment_lock:
+                timestamps, values = query(self.__data_logs_path, name, start=watermark, end=end)
+        else:
+            timestamps, values = query(self.__data_logs_path, name, start=watermark, end=end)
+        if watermark is not None:
+            mask = timestamps > watermark
+            timestamps = timestamps[mask]
+            values = values[mask]
+        if len(timestamps) == 0:
+            return 0
+
+        for month, first, last in split_by_month(timestamps):
+            table = self.__create_table(pyarrow, name, timestamps[first:last], values[first:last])
+            partition = self.__export_path / f"category={category}" / f"month={month}"
+            partition.mkdir(parents=True, exist_ok=True)
+            # File name only depends on the data, so a run interrupted before saving the watermark
+            # overwrites the same file instead of duplicating the rows.
+            path = partition / f"{name}.{int(timestamps[first])}.parquet"
+            temporary_path = path.with_suffix(".tmp")
+            parquet.write_table(table, temporary_path, compression=self.__compression)
+            os.replace(temporary_path, path)
+
+        self.__watermarks[key] = float(timestamps[-1])
+        self.__save_watermarks()
+        LOG.debug(f"Exported {len(timestamps)} rows of data log (Key: {key})")
+        return len(timestamps)
+
+    def __create_table(self, pyarrow, name: str, timestamps, values):
+        rows = len(timestamps)
+        time_column = pyarrow.array(
+            numpy.round(timestamps * 1_000_000).astype("<i8"),
+            type=pyarrow.timestamp("us", tz="UTC"),
+        )
+        id_column = pyarrow.DictionaryArray.from_arrays(
+            pyarrow.array(numpy.zeros(rows, dtype="<i4")), pyarrow.array([name])
+        )
+        if values.dtype == object:
+            value_column = pyarrow.nulls(rows, type=pyarrow.float64())
+            state_column = pyarrow.array(values.astype(str), type=pyarrow.string()).dictionary_encode()
+        else:
+            value_column = pyarrow.array(values, type=pyarrow.float64())
+            state_column = pyarrow.DictionaryArray.from_arrays(
+                pyarrow.nulls(rows, type=pyarrow.int32()), pyarrow.array([], type=pyarrow.string())
+            )
+        return pyarrow.table(
+            {"time": time_column, "id": id_column, "value": value_column, "state": state_column}
+        )
+
+    def __save_watermarks(self) -> None:
+        self.__export_path.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.__watermarks_path.with_suffix(".tmp")
+        with open(temporary_path, "w") as watermarks_file:
+            json.dump(self.__watermarks, watermarks_file, indent=1)
+        os.replace(temporary_path, self.__watermarks_path)
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Export data logs into Parquet files partitioned by category and month"
+    )
+    parser.add_argument("data_logs", help="Path of the data logs folder")
+    parser.add_argument("export", help="Path of the Parquet dataset folder")
+    parser.add_argument("--delay", type=float, default=0, help="Leave rows newer than this many seconds for the next export")
+    parser.add_argument("--compression", default="zstd", help="Parquet compression codec")
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    exporter = DataLogExporter(
+        data_logs_path=arguments.data_logs,
+        export_path=arguments.export,
+        delay=arguments.delay,
+        compression=arguments.compression,
+    )
+    print(f"Exported {exporter.export()} rows")
+
+
+if __name__ == "__main__":
+    main()
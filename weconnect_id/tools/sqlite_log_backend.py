@@ -0,0 +1,187 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from weconnect_id.tools.logger import DataLogRecord
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+import sqlite3
+import logging
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+DATABASE_NAME = "vehicle_data.sqlite3"
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS properties (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        category TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS samples (
+        property_id INTEGER NOT NULL REFERENCES properties (id),
+        ts REAL NOT NULL,
+        value
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS samples_property_ts ON samples (property_id, ts)",
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        property_id INTEGER NOT NULL REFERENCES properties (id),
+        first_ts REAL NOT NULL,
+        last_ts REAL NOT NULL,
+        value
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS runs_property_ts ON runs (property_id, first_ts)",
+)
+
+
+def to_sql_value(value):
+    '''
+    Converts WeConnectVehicleDataProperty value into a value which can be stored in SQLite.
+    Numbers are stored as numbers, enums as their values and other values as strings.
+    '''
+
+    if isinstance(value, Enum):
+        value = value.value
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+class SQLiteDataLogBackend:
+    def __init__(self, database_path: str = None, synchronous: str = "NORMAL") -> None:
+        '''
+        Writes data logs into SQLite database in WAL mode. Each batch of records is written in one transaction.
+        Runs of identical values are written into the runs table.
+
+        Args:
+            database_path (str, optional): Path of the database file.
+                Defaults to vehicle_data.sqlite3 in the data logs folder of the first record.
+            synchronous (str, optional): Value for SQLite synchronous pragma. Defaults to "NORMAL".
+        '''
+
+        self.__database_path = database_path
+        self.__synchronous = synchronous
+        self.__connection = None
+        self.__property_ids = {}
+
+    def write(self, records: list) -> None:
+        if self.__connection is None:
+            self.__connect(records[0].path)
+
+        # IDs of properties inserted in this transaction are cached only after commit,
+        # so a rolled back batch doesn't leave IDs in the cache which don't exist in the table
+        new_property_ids = {}
+        with self.__connection:
+            self.__connection.executemany(
+                "INSERT INTO samples (property_id, ts, value) VALUES (?, ?, ?)",
+                [
+                    (
+                        self.__get_property_id(record, new_property_ids),
+                        record.timestamp,
+                        to_sql_value(record.value),
+                    )
+                    for record in records
+                    if not record.is_run
+                ],
+            )
+            self.__connection.executemany(
+                "INSERT INTO runs (property_id, first_ts, last_ts, value) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        self.__get_property_id(record, new_property_ids),
+                        record.timestamp,
+                        record.end_timestamp,
+                        to_sql_value(record.value),
+                    )
+                    for record in records
+                    if record.is_run
+                ],
+            )
+        self.__property_ids.update(new_property_ids)
+        LOG.debug(f"Wrote {len(records)} records to (Path: {self.__database_path})")
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self.__connection is None:
+            return
+        try:
+            self.__connection.close()
+        except sqlite3.Error as e:
+            LOG.exception(e)
+        self.__connection = None
+
+    def __connect(self, data_logs_path: str) -> None:
+        if self.__database_path is None:
+            self.__database_path = str(Path(data_logs_path) / DATABASE_NAME)
+        Path(self.__database_path).parent.mkdir(parents=True, exist_ok=True)
+
+        LOG.info(f"Opening data log database (Path: {self.__database_path})")
+        self.__connection = sqlite3.connect(self.__database_path)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(f"PRAGMA synchronous={self.__synchronous}")
+        with self.__connection:
+            for statement in SCHEMA:
+                self.__connection.execute(statement)
+        self.__property_ids = dict(
+            self.__connection.execute("SELECT name, id FROM properties")
+        )
+
+    def __get_property_id(self, record: DataLogRecord, new_property_ids: dict) -> int:
+        property_id = self.__property_ids.get(record.id, new_property_ids.get(record.id))
+        if property_id is None:
+            property_id = self.__connection.execute(
+                "INSERT INTO properties (name, category) VALUES (?, ?)",
+                (record.id, record.category),
+            ).lastrowid
+            new_property_ids[record.id] = property_id
+        return property_id
+
+
+def query(
+    database_path: str,
+    data_property_id: str,
+    start: datetime = None,
+    end: datetime = None,
+) -> list:
+    '''
+    Reads logged values of a WeConnectVehicleDataProperty from the database.
+
+    Args:
+        database_path (str): Path of the database file.
+        data_property_id (str): ID of the WeConnectVehicleDataProperty.
+        start (datetime, optional): Start of the time range (inclusive). Defaults to None.
+        end (datetime, optional): End of the time range (exclusive). Defaults to None.
+
+    Returns:
+        list: List of (timestamp, value) tuples ordered by time.
+    '''
+
+    statement = (
+        "SELECT samples.ts, samples.value FROM samples "
+        "JOIN properties ON properties.id = samples.property_id "
+        "WHERE properties.name = ?"
+    )
+    parameters = [data_property_id]
+    if start is not None:
+        statement += " AND samples.ts >= ?"
+        parameters.append(start.timestamp())
+    if end is not None:
+        statement += " AND samples.ts < ?"
+        parameters.append(end.timestamp())
+    statement += " ORDER BY samples.ts"
+
+    connection = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    try:
+        return connection.execute(statement, parameters).fetchall()
+    finally:
+        connection.close()
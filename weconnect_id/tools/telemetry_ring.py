@@ -0,0 +1,246 @@
+from enum import Enum
+from pathlib import Path
+from threading import Lock
+import json
+import mmap
+import struct
+import logging
+import numpy
+
+
+LOG = logging.getLogger("vehicle_data_logger")
+
+
+MAGIC = b"WCRING01"
+HEADER_SIZE = 4096
+# magic, version, record size, capacity, write count, schema length
+HEADER_FORMAT = "<8sIIQQI"
+WRITE_COUNT_OFFSET = 24
+SCHEMA_OFFSET = 64
+RECORD_DTYPE = numpy.dtype(
+    [("timestamp", "<f8"), ("index", "<u4"), ("value", "<f8")]
+)
+
+
+class TelemetryRingError(Exception):
+    pass
+
+
+class TelemetryRingFile:
+    VERSION = 1
+
+    def __init__(self, path: str, capacity: int = 500000) -> None:
+        '''
+        Fixed size memory-mapped ring file containing recent numeric telemetry.
+
+        File layout:
+            Header of 4096 bytes containing magic, version, record size, capacity,
+            write count and the schema (JSON list of data property IDs).
+            Capacity amount of packed (timestamp f8, property index u4, value f8) records.
+            The record of write number n is stored in slot n % capacity.
+
+        Args:
+            path (str): Path of the ring file. Existing file with same capacity is continued.
+            capacity (int, optional): Amount of records kept in the file. Defaults to 500000.
+        '''
+
+        self.__path = Path(path)
+        self.__capacity = capacity
+        self.__lock = Lock()
+        self.__open()
+        LOG.debug(
+            f"Opened telemetry ring file (Path: {self.__path}) (Capacity: {self.__capacity}) "
+            f"(Records written: {int(self.__write_count[0])})"
+        )
+
+    def __open(self) -> None:
+        size = HEADER_SIZE + self.__capacity * RECORD_DTYPE.itemsize
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        reuse = self.__path.is_file() and self.__path.stat().st_size == size
+        with open(self.__path, "r+b" if reuse else "w+b") as file:
+            if not reuse:
+                file.truncate(size)
+            self.__mmap = mmap.mmap(file.fileno(), size)
+
+        schema = []
+        if reuse:
+            try:
+                schema = _read_header(self.__mmap)[1]
+            except TelemetryRingError as e:
+                LOG.warning(f"Resetting telemetry ring file (Path: {self.__path}) ({e})")
+                reuse = False
+
+        if not reuse:
+            self.__mmap[:HEADER_SIZE] = bytes(HEADER_SIZE)
+            struct.pack_into(
+                HEADER_FORMAT,
+                self.__mmap,
+                0,
+                MAGIC,
+                self.VERSION,
+                RECORD_DTYPE.itemsize,
+                self.__capacity,
+                0,
+                0,
+            )
+
+        self.__write_count = numpy.ndarray(
+            (1,), dtype="<u8", buffer=self.__mmap, offset=WRITE_COUNT_OFFSET
+        )
+        self.__records = numpy.ndarray(
+            (self.__capacity,), dtype=RECORD_DTYPE, buffer=self.__mmap, offset=HEADER_SIZE
+        )
+        self.__schema = schema
+        self.__indexes = {data_property_id: i for i, data_property_id in enumerate(schema)}
+        if not reuse:
+            self.__write_schema()
+
+    def __write_schema(self) -> None:
+        schema = json.dumps(self.__schema).encode()
+        if SCHEMA_OFFSET + len(schema) > HEADER_SIZE:
+            raise TelemetryRingError("Telemetry ring schema doesn't fit into the header")
+        self.__mmap[SCHEMA_OFFSET : SCHEMA_OFFSET + len(schema)] = schema
+        struct.pack_into("<I", self.__mmap, 32, len(schema))
+
+    def __get_index(self, data_property_id: str) -> int:
+        index = self.__indexes.get(data_property_id)
+        if index is None:
+            self.__schema.append(data_property_id)
+            try:
+                self.__write_schema()
+            except TelemetryRingError:
+                self.__schema.pop()
+                raise
+            index = len(self.__schema) - 1
+            self.__indexes[data_property_id] = index
+        return index
+
+    def append(self, data_property_id: str, timestamp: float, value) -> bool:
+        '''
+        Writes value directly into the mapped file. Values which can't be represented as float are skipped.
+
+        Returns:
+            bool: True if the value was written.
+        '''
+
+        if isinstance(value, Enum) or value is None:
+            return False
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+
+        with self.__lock:
+            index = self.__get_index(data_property_id)
+            write_count = int(self.__write_count[0])
+            self.__records[write_count % self.__capacity] = (timestamp, index, value)
+            self.__write_count[0] = write_count + 1
+        return True
+
+    def write(self, records: list) -> None:
+        for record in records:
+            try:
+                self.append(record.id, record.timestamp, record.value)
+            except TelemetryRingError as e:
+                LOG.exception(e)
+
+    def flush(self) -> None:
+        self.__mmap.flush()
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__mmap.closed:
+                return
+            self.__mmap.flush()
+            del self.__records
+            del self.__write_count
+            self.__mmap.close()
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+
+def _read_header(buffer) -> tuple:
+    magic, version, record_size, capacity, write_count, schema_length = struct.unpack_from(
+        HEADER_FORMAT, buffer, 0
+    )
+    if magic != MAGIC:
+        raise TelemetryRingError("File is not a telemetry ring file")
+    if record_size != RECORD_DTYPE.itemsize:
+        raise TelemetryRingError(f"Unsupported record size {record_size}")
+    schema = json.loads(bytes(buffer[SCHEMA_OFFSET : SCHEMA_OFFSET + schema_length]) or b"[]")
+    return capacity, schema
+
+
+class TelemetryRingReader:
+    def __init__(self, path: str) -> None:
+        '''
+        Read-only view of a telemetry ring file. The records are NumPy views of the mapped file, no data is parsed or copied.
+
+        Args:
+            path (str): Path of the ring file.
+        '''
+
+        self.__memmap = numpy.memmap(path, dtype=numpy.uint8, mode="r")
+        self.__capacity, self.__schema = _read_header(self.__memmap)
+        self.__write_count = numpy.ndarray(
+            (1,), dtype="<u8", buffer=self.__memmap, offset=WRITE_COUNT_OFFSET
+        )
+        self.__records = numpy.ndarray(
+            (self.__capacity,), dtype=RECORD_DTYPE, buffer=self.__memmap, offset=HEADER_SIZE
+        )
+
+    @property
+    def schema(self) -> list:
+        '''
+        Data property IDs. The index field of the records points to this list.
+        Re-read by refresh_schema when the writer adds new data properties.
+        '''
+
+        return self.__schema
+
+    def refresh_schema(self) -> list:
+        self.__schema = _read_header(self.__memmap)[1]
+        return self.__schema
+
+    @property
+    def write_count(self) -> int:
+        return int(self.__write_count[0])
+
+    def segments(self) -> tuple:
+        '''
+        Get the written records as zero-copy views ordered from oldest to newest.
+
+        Returns:
+            tuple: One or two structured arrays. Concatenated they form the records in write order.
+        '''
+
+        write_count = self.write_count
+        if write_count <= self.__capacity:
+            return (self.__records[:write_count],)
+        cursor = write_count % self.__capacity
+        return (self.__records[cursor:], self.__records[:cursor])
+
+    def records(self):
+        '''
+        Get the written records in write order. Copies the data if the ring has wrapped around.
+        '''
+
+        segments = self.segments()
+        return segments[0] if len(segments) == 1 else numpy.concatenate(segments)
+
+    def series(self, data_property_id: str) -> tuple:
+        '''
+        Get timestamps and values of one data property.
+
+        Returns:
+            tuple: Arrays of timestamps and values.
+        '''
+
+        if data_property_id not in self.__schema:
+            self.refresh_schema()
+        index = self.__schema.index(data_property_id)
+        records = self.records()
+        selected = records[records["index"] == index]
+        return selected["timestamp"], selected["value"]
@@ -35,6 +35,7 @@ class WeConnectUpdater:
             default_frequency=10,
         )
 
+        self.__update_callbacks = {}
         self.__base_job_running = {}
         self.__executions_skipped = 0
         self.__job_restarts = 0
@@ -44,6 +45,7 @@ class WeConnectUpdater:
 
         self.__update_rate = config["update rate"]
         self.__silent_main_update = config["silent main update"]
+        self.__domains = list(self.DOMAINS)
 
         self.update(domains=[Domain.ALL])
 
@@ -74,6 +76,21 @@ class WeConnectUpdater:
         if run_immediately:
             self.update(domains=domains, silent=silent)
 
+    def set_domains(self, domains: list) -> None:
+        """
+        Sets the domains which are fetched by the main update scheduler.
+
+        Args:
+            domains (list): Domains needed by the app. If empty, the default domains are used.
+        """
+
+        domains = list(domains) if domains else list(self.DOMAINS)
+        if domains == self.__domains:
+            return
+        LOG.info(f"Setting main update scheduler domains (Domains: {domains})")
+        self.__domains = domains
+        self.__start_main_update_scheduler()
+
     def remove_scheduler(self, id: str) -> None:
         LOG.debug(f"Removing WeConnectUpdater scheduler (ID: {id})")
         try:
@@ -124,12 +141,39 @@ class WeConnectUpdater:
 
         LOG.debug(f"Successfully updated WeConnect data (Domains: {domains})")
 
+        for callback in list(self.__update_callbacks.values()):
+            try:
+                callback["function"](*callback["args"])
+            except Exception as e:
+                LOG.exception(e)
+
+    def add_update_callback(self, id: str, function: callable, args: list = None) -> None:
+        """
+        Adds callback function which is called at the end of each successful update cycle.
+
+        Args:
+            id (str): ID for the function so it can be removed later.
+            function (callable): Function to be called after the update.
+            args (list, optional): Arguments for the given function. Defaults to None.
+        """
+
+        self.__update_callbacks[id] = {
+            "id": id,
+            "function": function,
+            "args": [] if args is None else args,
+        }
+        LOG.debug(f"Added WeConnectUpdater update callback function (ID: {id})")
+
+    def remove_update_callback(self, id: str) -> None:
+        self.__update_callbacks.pop(id, None)
+        LOG.debug(f"Removed WeConnectUpdater update callback function (ID: {id})")
+
     def __start_main_update_scheduler(self) -> None:
         self.__base_job_running["MAIN_UPDATE_SCHEDULER"] = False
         self.__scheduler.add_job(
             id="MAIN_UPDATE_SCHEDULER",
             func=self.update,
-            args=[self.DOMAINS, self.__silent_main_update, "MAIN_UPDATE_SCHEDULER"],
+            args=[self.__domains, self.__silent_main_update, "MAIN_UPDATE_SCHEDULER"],
             trigger="interval",
             seconds=self.__update_rate,
             max_instances=999,
@@ -171,6 +215,10 @@ class WeConnectUpdater:
             LOG.info("Rebooting system due too many restarted jobs")
             os.system("sudo reboot")
 
+    @property
+    def domains(self) -> list:
+        return self.__domains
+
     @property
     def weconnect(self) -> WeConnect:
         return self.__weconnect
@@ -4,7 +4,18 @@ if TYPE_CHECKING:
     from display.lcd_scene_controller import LCDSceneController
     from weconnect_id.tools.updater import WeConnectUpdater
     from build_tools.scene_builder import SceneBuilder
+    from electricity_price.cheapest_window import CheapestWindows
+    from electricity_price.spot_price_provider import SpotPriceProvider
 from weconnect_id.vehicle import WeConnectVehicle
+from weconnect_id.controllers.climate_controller import ClimateController
+from weconnect_id.controllers.charging_planner import ChargingPlanner
+from weconnect_id.tools.charging_sessions import ChargingSessionTracker
+from weconnect_id.tools.battery_capacity import BatteryCapacityEstimator
+from weconnect_id.tools.charging_curves import ChargeTimeEstimator
+from display.lcd_status_bar import LCDStatusBar
+from display.custom_scenes.climate_controller_temperature_scene import (
+    ClimateControllerTemperatureScene,
+)
 from button.push_button import PushButton
 import json
 from led.led_driver import load_automated_leds
@@ -22,6 +33,11 @@ class WeConnectVehicleLoader:
         weconnect_updater: WeConnectUpdater,
         config: dict,
         scene_builder: SceneBuilder,
+        cheapest_windows: CheapestWindows = None,
+        spot_price_provider: SpotPriceProvider = None,
+        charging_session_tracker: ChargingSessionTracker = None,
+        battery_capacity_estimator: BatteryCapacityEstimator = None,
+        charge_time_estimator: ChargeTimeEstimator = None,
     ) -> None:
         """
         Used to load vehicle based items.
@@ -31,30 +47,98 @@ class WeConnectVehicleLoader:
             weconnect_updater (WeConnectUpdater): Used to initialize new objects for the app.
             config (dict): Used to initialize new objects for the app.
             scene_builder (SceneBuilder): Used to build new scenes.
+            cheapest_windows (CheapestWindows, optional): Adds the cheapest window data properties to the vehicle. Defaults to None.
+            spot_price_provider (SpotPriceProvider, optional): Provides the price data properties and the prices for the charging planner.
+                Defaults to None.
+            charging_session_tracker (ChargingSessionTracker, optional): Tracks the charging sessions of the selected vehicle. Defaults to None.
+            battery_capacity_estimator (BatteryCapacityEstimator, optional): Provides the estimated battery capacity
+                for batteryCharge. Defaults to None.
+            charge_time_estimator (ChargeTimeEstimator, optional): Estimates the charging time of the selected vehicle. Defaults to None.
         """
 
         LOG.debug("Initializing WeConnectVehicleLoader")
         self.__lcd_scene_controller = lcd_scene_controller
         self.__lcd_controller = lcd_scene_controller.lcd_controller
         self.__vehicle_change_allowed = True
+        self.__weconnect_vehicle = None
         self.__weconnect_updater = weconnect_updater
         self.__weconnect = weconnect_updater.weconnect
         self.__config = config
         self.__scene_builder = scene_builder
+        self.__cheapest_windows = cheapest_windows
+        self.__spot_price_provider = spot_price_provider
+        self.__charging_planner = None
+        self.__charging_session_tracker = charging_session_tracker
+        self.__battery_capacity_estimator = battery_capacity_estimator
+        self.__charge_time_estimator = charge_time_estimator
+
+    def __get_referenced_data_property_ids(self) -> set:
+        if "all" in self.__config["log data"]:
+            return None
+
+        data_property_ids = set(self.__config["log data"])
+        data_property_ids.update(LCDStatusBar.DATA_PROPERTY_IDS)
+        data_property_ids.update(ClimateController.DATA_PROPERTY_IDS)
+        data_property_ids.update(ClimateControllerTemperatureScene.DATA_PROPERTY_IDS)
+        if "charging planner" in self.__config:
+            data_property_ids.update(ChargingPlanner.DATA_PROPERTY_IDS)
+        if self.__charging_session_tracker is not None:
+            data_property_ids.update(ChargingSessionTracker.DATA_PROPERTY_IDS)
+        if self.__charge_time_estimator is not None:
+            data_property_ids.update(ChargeTimeEstimator.DATA_PROPERTY_IDS)
+        data_property_ids.update(
+            item["data provider id"]
+            for item in self.__config["lcd items"]
+            if item["type"] == "WeConnectLCDItem"
+        )
+        data_property_ids.update(
+            led_config["trigger"]["data id"]
+            for led_config in self.__config["automated leds"]
+        )
+        data_property_ids.update(
+            message_config["data provider id"]
+            for message_config in self.__config["automated messages"]
+        )
+        LOG.debug(f"WeConnectVehicleDataProperties referenced in config: {data_property_ids}")
+        return data_property_ids
 
     def load_vehicle_dependent_items(self, vin: str) -> None:
         LOG.debug(f"Loading vehicle dependent items (Vehicle VIN: {vin})")
         self.__lcd_controller.display_message("Importing Vehicle Data")
         for vehicle_vin, vehicle in self.__weconnect.vehicles.items():
             if vehicle_vin == vin:
+                if self.__weconnect_vehicle is not None:
+                    self.__weconnect_vehicle.close_event_journal()
                 self.__weconnect_vehicle = WeConnectVehicle(
-                    vehicle=vehicle, config=self.__config
+                    vehicle=vehicle,
+                    config=self.__config,
+                    data_property_ids=self.__get_referenced_data_property_ids(),
                 )
+                if self.__spot_price_provider is not None:
+                    for data_property in self.__spot_price_provider.data_properties:
+                        self.__weconnect_vehicle.add_external_data_property(data_property)
+                if self.__cheapest_windows is not None:
+                    self.__cheapest_windows.add_data_properties(self.__weconnect_vehicle)
+                if self.__charging_session_tracker is not None:
+                    self.__charging_session_tracker.set_vehicle(self.__weconnect_vehicle)
+                if self.__battery_capacity_estimator is not None:
+                    self.__battery_capacity_estimator.set_vehicle(self.__weconnect_vehicle)
+                if self.__charge_time_estimator is not None:
+                    self.__charge_time_estimator.set_vehicle(self.__weconnect_vehicle)
                 self.__weconnect_vehicle.setup_climate_controller(
                     weconnect_updater=self.__weconnect_updater,
                     lcd_controller=self.__lcd_controller,
                     weconnect_vehicle_loader=self,
                 )
+                self.__weconnect_updater.set_domains(self.__weconnect_vehicle.domains)
+                self.__weconnect_updater.add_update_callback(
+                    id="VEHICLE_SNAPSHOT",
+                    function=self.__weconnect_vehicle.publish_snapshot,
+                )
+                self.__weconnect_updater.add_update_callback(
+                    id="DATA_LOG_HEARTBEAT",
+                    function=self.__weconnect_vehicle.log_heartbeats,
+                )
 
         try:
             with open(self.__config["paths"]["config"], "w") as config_file:
@@ -63,6 +147,8 @@ class WeConnectVehicleLoader:
         except FileNotFoundError as e:
             LOG.exception(e)
 
+        self.__setup_charging_planner()
+
         button_climate = PushButton(
             pin=self.__config["pin layout"]["button climate"],
             id="CLIMATE",
@@ -84,6 +170,21 @@ class WeConnectVehicleLoader:
         self.__lcd_scene_controller.set_home_scene(scene=scenes["SCENE_MENU"])
         self.__lcd_scene_controller.load_scene(scene=scenes["SCENE_MENU"])
 
+    def __setup_charging_planner(self) -> None:
+        if self.__charging_planner is not None:
+            self.__charging_planner.stop()
+            self.__charging_planner = None
+        if self.__spot_price_provider is None:
+            return
+        try:
+            self.__charging_planner = ChargingPlanner.from_config(
+                config=self.__config,
+                weconnect_vehicle=self.__weconnect_vehicle,
+                spot_price_provider=self.__spot_price_provider,
+            )
+        except Exception as e:
+            LOG.exception(e)
+
     @property
     def selected_vehicle(self) -> WeConnectVehicle:
         return self.__weconnect_vehicle
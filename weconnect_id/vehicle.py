@@ -1,17 +1,23 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 import logging
+from collections import deque
+from datetime import datetime
+from threading import Lock
+import time
 from weconnect.elements.vehicle import Vehicle
+from weconnect.addressable import AddressableLeaf
 from display.lcd_controller import LCDController
 from weconnect_id.controllers.climate_controller import ClimateController
-from weconnect_id.data_providers.battery_data import WeConnectBatteryData
-from weconnect_id.data_providers.climatisation_data import WeConnectClimateData
-from weconnect_id.data_providers.readiness_data import WeConnectReadinessData
-from weconnect_id.data_providers.measurement_data import WeConnectMeasurementData
+from weconnect_id.data_providers.vehicle_data import WeConnectVehicleData
+from weconnect_id.data_providers.vehicle_snapshot import WeConnectVehicleSnapshot
+from weconnect_id.data_providers.data_property_filter import DataPropertyChangeFilter
 from weconnect_id.data_providers.vehicle_data_property import (
     WeConnectVehicleDataProperty,
 )
 from weconnect_id.tools.updater import WeConnectUpdater
+from weconnect_id.tools.logger import add_data_log_sink, DataLogPolicy
+from pathlib import Path
 
 if TYPE_CHECKING:
     from weconnect_id.tools.vehicle_loader import WeConnectVehicleLoader
@@ -23,28 +29,32 @@ LOG = logging.getLogger("vehicle")
 class WeConnectVehicle:
 
     CAR_BRANDS = {"WCAR": "Volkswagen"}
+    CHANGE_HISTORY_LENGTH = 256
 
-    def __init__(self, vehicle: Vehicle, config: dict) -> None:
+    def __init__(
+        self, vehicle: Vehicle, config: dict, data_property_ids: set = None
+    ) -> None:
         '''
         Contains all data related to the selected vehicle and used to interact with climate controls.
 
         Args:
             vehicle (Vehicle): Used to provide data to the WeConnectVehicleDataProperties, to enable features and interact with climate controller.
             config (dict): Provides configurations for WeConnectVehicleDataProperties.
+            data_property_ids (set, optional): IDs of the WeConnectVehicleDataProperties used by the app.
+                Only these are created and subscribed to. If None, all WeConnectVehicleDataProperties are created. Defaults to None.
         '''
         LOG.debug(f"Initializing WeConnectVehicle (Vehicle: {vehicle.nickname})")
         self.__import_vehicle_properties(vehicle=vehicle)
         self.__api_vehicle.enableTracker()
+        self.__config = config
 
-        self.__battery_data_provider = WeConnectBatteryData(vehicle=vehicle)
-        self.__climatisation_data_provider = WeConnectClimateData(vehicle=vehicle)
-        self.__readiness_data_provider = WeConnectReadinessData(vehicle=vehicle)
-        self.__measurements_data_provider = WeConnectMeasurementData(vehicle=vehicle)
-
-        self.__import_vehicle_data()
+        self.__import_vehicle_data(data_property_ids=data_property_ids)
 
         self.__add_data_property_translations(config=config)
+        self.__setup_data_property_filters(config=config)
         self.__setup_data_property_loggers(config=config)
+        self.__setup_event_journal(config=config)
+        self.__setup_snapshots()
 
         self.__climate_controller = None
 
@@ -80,25 +90,248 @@ class WeConnectVehicle:
         self.__brand_code = vehicle.brandCode
         self.__nickname = vehicle.nickname
 
-    def __import_vehicle_data(self) -> None:
+    def __import_vehicle_data(self, data_property_ids: set) -> None:
         LOG.debug(f"Importing vehicle data (Vehicle: {self.nickname})")
-        self.__data = {}
-        self.__data.update(self.__battery_data_provider.get_data())
-        self.__data.update(self.__climatisation_data_provider.get_data())
-        self.__data.update(self.__readiness_data_provider.get_data())
-        self.__data.update(self.__measurements_data_provider.get_data())
+        self.__data = WeConnectVehicleData(
+            vehicle=self.__api_vehicle, data_property_ids=data_property_ids
+        )
+        LOG.debug(
+            f"Imported {len(self.__data)} WeConnectVehicleDataProperties (Vehicle: {self.nickname})"
+        )
 
     def __add_data_property_translations(self, config: dict) -> None:
         for data_id, translations in config["translations"].items():
-            self.__data[data_id].add_translations(translations=translations)
+            if data_id not in self.__data:
+                continue
+            self.__data.get(data_id).add_translations(translations=translations)
+
+    def __setup_data_property_filters(self, config: dict) -> None:
+        for data_id, filter_config in config.get("data filters", {}).items():
+            if data_id not in self.__data:
+                continue
+            self.__data.get(data_id).set_change_filter(
+                DataPropertyChangeFilter.from_config(filter_config)
+            )
 
     def __setup_data_property_loggers(self, config: dict) -> None:
+        ring_config = config.get("data logger", {}).get("telemetry ring")
+        if ring_config is not None and ring_config.get("enabled", True):
+            from weconnect_id.tools.telemetry_ring import TelemetryRingFile
+
+            try:
+                add_data_log_sink(
+                    "TELEMETRY_RING",
+                    TelemetryRingFile(
+                        path=Path(config["paths"]["data_logs"]) / f"{self.__vin}.ring",
+                        capacity=ring_config.get("capacity", 500000),
+                    ),
+                )
+            except OSError as e:
+                LOG.exception(e)
+
         if "all" in config["log data"]:
-            for data_property in self.__data.values():
-                data_property.set_logging(True, config["paths"]["data_logs"])
+            data_properties = self.__data.data_properties
         else:
-            for data_id in config["log data"]:
-                self.__data[data_id].set_logging(True, config["paths"]["data_logs"])
+            # External data properties are not added yet, their logging is set up when they are added
+            data_properties = [
+                self.__data.get(data_id) for data_id in config["log data"] if data_id in self.__data
+            ]
+        for data_property in data_properties:
+            self.__enable_data_property_logging(data_property, config)
+
+    def __enable_data_property_logging(self, data_property: WeConnectVehicleDataProperty, config: dict) -> None:
+        data_property.set_logging(
+            True,
+            config["paths"]["data_logs"],
+            DataLogPolicy.from_config(config=config, data_property_id=data_property.id),
+        )
+
+    def __setup_event_journal(self, config: dict) -> None:
+        self.__event_journal = None
+        journal_config = config.get("data logger", {}).get("event journal")
+        if journal_config is None or not journal_config.get("enabled", True):
+            return
+
+        from weconnect_id.tools.event_journal import VehicleEventJournal, EventJournalError
+
+        try:
+            self.__event_journal = VehicleEventJournal(
+                path=Path(config["paths"]["data_logs"]) / f"{self.__vin}.journal",
+                snapshot_interval=journal_config.get("snapshot interval", 1000),
+            )
+        except (OSError, EventJournalError) as e:
+            LOG.exception(e)
+            return
+
+        for address, element in self.__data.elements.items():
+            self.__event_journal.record(address, element.value, 0)
+            element.addObserver(
+                observer=self.__on_journal_event,
+                flag=AddressableLeaf.ObserverEvent.ENABLED
+                | AddressableLeaf.ObserverEvent.DISABLED
+                | AddressableLeaf.ObserverEvent.VALUE_CHANGED,
+                priority=AddressableLeaf.ObserverPriority.INTERNAL_HIGH,
+            )
+        self.__event_journal.snapshot()
+        LOG.info(f"Recording vehicle events to (Path: {self.__event_journal.path})")
+
+    def __on_journal_event(self, element, flags) -> None:
+        event_journal = self.__event_journal
+        if event_journal is not None:
+            event_journal.observe(element, flags)
+
+    def close_event_journal(self) -> None:
+        '''
+        Closes the event journal and detaches it from the WeConnect-API elements.
+        Should be called before the vehicle is replaced, so the same journal isn't opened by two WeConnectVehicles.
+        '''
+
+        event_journal, self.__event_journal = self.__event_journal, None
+        if event_journal is None:
+            return
+        # removeObserver of the WeConnect-API keeps only the matching observers, so the observers are
+        # left in place and stop forwarding events once the journal is detached
+        event_journal.close()
+
+    def __setup_snapshots(self) -> None:
+        self.__snapshot_lock = Lock()
+        self.__changed_ids = set()
+        self.__change_history = deque(maxlen=self.CHANGE_HISTORY_LENGTH)
+        self.__snapshot_callbacks = {}
+        values = {}
+        for data_property in self.__data.data_properties:
+            values[data_property.id] = data_property.value
+            data_property.add_callback_function(
+                id="VEHICLE_SNAPSHOT",
+                function=self.__on_data_update,
+                args=[data_property.id],
+            )
+        self.__snapshot = WeConnectVehicleSnapshot(
+            version=0,
+            values=values,
+            changed_ids=frozenset(values),
+            time=datetime.now(),
+        )
+
+    def add_external_data_property(self, data_property: WeConnectVehicleDataProperty) -> None:
+        '''
+        Adds data property which doesn't receive data from the WeConnect-API, so it can be used like the vehicle data.
+        Translations, change filter and logging are configured like for the vehicle data.
+        Its value is included in the snapshots from the next published snapshot.
+
+        Args:
+            data_property (WeConnectVehicleDataProperty): The data property, e.g. ExternalDataProperty.
+        '''
+
+        LOG.debug(f"Adding external data property (ID: {data_property.id}) (Vehicle: {self.nickname})")
+        self.__data.add(data_property)
+        config = self.__config
+        if data_property.id in config["translations"]:
+            data_property.add_translations(translations=config["translations"][data_property.id])
+        if data_property.id in config.get("data filters", {}):
+            data_property.set_change_filter(
+                DataPropertyChangeFilter.from_config(config["data filters"][data_property.id])
+            )
+        if "all" in config["log data"] or data_property.id in config["log data"]:
+            self.__enable_data_property_logging(data_property, config)
+        data_property.add_callback_function(
+            id="VEHICLE_SNAPSHOT",
+            function=self.__on_data_update,
+            args=[data_property.id],
+        )
+        self.__on_data_update(data_property.id)
+
+    def __on_data_update(self, data_property_id: str) -> None:
+        with self.__snapshot_lock:
+            self.__changed_ids.add(data_property_id)
+
+    def log_heartbeats(self) -> None:
+        '''
+        Writes heartbeat rows of the logged WeConnectVehicleDataProperties whose heartbeat interval has passed.
+        Should be called at the end of each update cycle.
+        '''
+
+        now = time.time()
+        for data_property in self.__data.data_properties:
+            data_property.log_heartbeat(now)
+
+    def publish_snapshot(self) -> WeConnectVehicleSnapshot:
+        '''
+        Publishes new snapshot of the WeConnectVehicleDataProperty values if any of them changed since the last snapshot.
+        Should be called at the end of each update cycle.
+
+        Returns:
+            WeConnectVehicleSnapshot: Latest snapshot.
+        '''
+
+        with self.__snapshot_lock:
+            changed_ids, self.__changed_ids = self.__changed_ids, set()
+            previous = self.__snapshot
+            changes = {}
+            for data_property_id in changed_ids:
+                value = self.__data.get(data_property_id).value
+                if data_property_id not in previous or previous[data_property_id] != value:
+                    changes[data_property_id] = value
+            snapshot = previous.derive(changes=changes, time=datetime.now())
+            if snapshot is previous:
+                return previous
+            self.__change_history.append((snapshot.version, snapshot.changed_ids))
+            self.__snapshot = snapshot
+
+        LOG.debug(
+            f"Published snapshot (Version: {snapshot.version}) (Changed: {sorted(snapshot.changed_ids)}) (Vehicle: {self.nickname})"
+        )
+        for callback in list(self.__snapshot_callbacks.values()):
+            try:
+                callback["function"](snapshot, *callback["args"])
+            except Exception as e:
+                LOG.exception(e)
+        return snapshot
+
+    def changes_since(self, version: int) -> frozenset:
+        '''
+        Get IDs of the WeConnectVehicleDataProperties which changed after given snapshot version.
+
+        Args:
+            version (int): Snapshot version known by the caller.
+
+        Returns:
+            frozenset: IDs of the changed WeConnectVehicleDataProperties.
+                If the version is older than the kept change history, IDs of all WeConnectVehicleDataProperties are returned.
+        '''
+
+        with self.__snapshot_lock:
+            snapshot = self.__snapshot
+            history = list(self.__change_history)
+
+        if version >= snapshot.version:
+            return frozenset()
+        if version < 0 or not history or history[0][0] > version + 1:
+            return frozenset(snapshot.values)
+        return frozenset().union(
+            *(changed_ids for history_version, changed_ids in history if history_version > version)
+        )
+
+    def add_snapshot_callback(self, id, function: callable, args: list = None) -> None:
+        '''
+        Adds callback function which is called with the new WeConnectVehicleSnapshot when one is published.
+
+        Args:
+            id: ID for the function so it can be removed later.
+            function (callable): Function to be called. The snapshot is given as the first argument.
+            args (list, optional): Additional arguments for the given function. Defaults to None.
+        '''
+
+        self.__snapshot_callbacks[id] = {
+            "id": id,
+            "function": function,
+            "args": [] if args is None else args,
+        }
+        LOG.debug(f"Added snapshot callback function (ID: {id}) (Vehicle: {self.nickname})")
+
+    def remove_snapshot_callback(self, id) -> None:
+        self.__snapshot_callbacks.pop(id)
+        LOG.debug(f"Removed snapshot callback function (ID: {id}) (Vehicle: {self.nickname})")
 
     def start_climate_control(self) -> None:
         '''
@@ -168,7 +401,34 @@ class WeConnectVehicle:
             WeConnectVehicleDataProperty
         '''
         
-        return self.__data[data_property_id]
+        return self.__data.get(data_property_id)
+
+    def get_data_properties(self, category: str = None) -> list:
+        '''
+        Get WeConnectVehicleDataProperties of the vehicle.
+
+        Args:
+            category (str, optional): If given, only WeConnectVehicleDataProperties of the category are returned. Defaults to None.
+
+        Returns:
+            list: List of WeConnectVehicleDataProperties.
+        '''
+
+        if category is None:
+            return self.__data.data_properties
+        return self.__data.get_category(category)
+
+    @property
+    def snapshot(self) -> WeConnectVehicleSnapshot:
+        return self.__snapshot
+
+    @property
+    def domains(self) -> list:
+        '''
+        WeConnect domains which provide data to the created WeConnectVehicleDataProperties.
+        '''
+
+        return self.__data.domains
 
     @property
     def api_vehicle(self) -> Vehicle: